@@ -7,13 +7,21 @@ AI-Powered Project Risk & Resource Management
 # Aligns with AI4SE Phase 12: Resource Planning & Optimization
 """
  
+import io
 import os
+import re
+import asyncio
+import threading
 import pandas as pd
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, AsyncIterator, Iterator, Union
 from datetime import datetime
 from dotenv import load_dotenv
 import autogen
 from autogen import AssistantAgent, UserProxyAgent, GroupChat, GroupChatManager
+from llm_cache import LLMResponseCache, get_response_cache
+from agents_simple import load_project_metrics, calculate_project_metrics
  
 load_dotenv()
  
@@ -25,8 +33,62 @@ class ProjectManagementAgents:
     1. Risk Analysis Agent
     2. Resource Optimization Agent  
     3. Decision Synthesis Agent
+    By default a combined panel agent answers all three roles in one call;
+    the individual agents are used if that reply is incomplete.
     """
    
+    # Max number of agent LLM calls in flight at once (HF rate limits)
+    MAX_CONCURRENT_AGENT_CALLS = 2
+   
+    # Report sections: (batched-reply marker, report title, label for errors)
+    REPORT_SECTIONS = [
+        ("RISK", "🔴 RISK ANALYSIS", "Risk Analysis"),
+        ("RESOURCE", "👥 RESOURCE OPTIMIZATION", "Resource Analysis"),
+        ("DECISION", "💡 EXECUTIVE RECOMMENDATIONS", "Decision Synthesis"),
+    ]
+   
+    # Shared agent prompt; filled with str.format_map in _build_metrics_prompt
+    ANALYSIS_PROMPT_TEMPLATE = """
+Analyze this project management scenario:
+ 
+PROJECT OVERVIEW:
+- Total Tasks: {total_tasks}
+- Total Duration: {total_duration} days
+- Total Budget: ${total_cost:,.2f}
+- Resources: {num_resources}
+- Tasks with Dependencies: {num_dependencies}
+ 
+RISK DISTRIBUTION:
+- High Risk: {high_risk_count} tasks ({high_risk_pct:.1f}%)
+- Medium Risk: {med_risk_count} tasks ({med_risk_pct:.1f}%)
+- Low Risk: {low_risk_count} tasks ({low_risk_pct:.1f}%)
+- Complex Dependencies (>1 predecessor): {complex_task_count} tasks
+ 
+RESOURCE INDICATORS:
+- Overloaded Resources (>150% avg workload): {overloaded_count}
+- Underutilized Resources (<50% avg workload): {underutilized_count}
+ 
+TASK: Provide comprehensive analysis from your specialized perspective.
+"""
+   
+    # Closing banner and fallback text of the streamed report
+    REPORT_FOOTER = """
+ 
+═══════════════════════════════════════════════════════════════
+Multi-Agent Analysis Complete | AutoGen Framework Active
+═══════════════════════════════════════════════════════════════
+"""
+   
+    UNAVAILABLE_MESSAGE = """
+⚠️ MULTI-AGENT ANALYSIS UNAVAILABLE
+ 
+The multi-agent system could not complete the analysis.
+Please check:
+1. HF_API_TOKEN is set in .env
+2. HuggingFace API is accessible
+3. Model is available (current: meta-llama/Meta-Llama-3-8B-Instruct)
+"""
+   
     def __init__(self):
         # Configure LLM for HuggingFace
         self.llm_config = {
@@ -46,8 +108,31 @@ class ProjectManagementAgents:
         self.risk_agent = self._create_risk_agent()
         self.resource_agent = self._create_resource_agent()
         self.decision_agent = self._create_decision_agent()
+        self.combined_agent = self._create_combined_agent()
         self.user_proxy = self._create_user_proxy()
        
+        # One combined LLM call by default; RISKMGMT_AGENT_MODE=multi forces
+        # the three separate agent calls
+        self.batched = os.getenv("RISKMGMT_AGENT_MODE", "batched").lower() != "multi"
+       
+        # Optional background ping to pre-open the HTTPS pool and wake the model
+        self._warmup_thread = None
+        if os.getenv("RISKMGMT_LLM_WARMUP", "").lower() in ("1", "true", "yes"):
+            self._warmup_thread = threading.Thread(target=self._warmup, daemon=True)
+            self._warmup_thread.start()
+       
+    def _warmup(self) -> None:
+        """Send a 1-token request so the first real analysis skips cold-start latency"""
+        agent = self.combined_agent if self.batched else self.risk_agent
+        try:
+            agent.client.create(
+                messages=[{"role": "user", "content": "ok"}],
+                max_tokens=1,
+                cache_seed=None
+            )
+        except Exception as e:
+            print(f"⚠️ LLM warm-up failed: {e}")
+   
     def _create_risk_agent(self) -> AssistantAgent:
         """Create Risk Analysis Agent"""
         return AssistantAgent(
@@ -108,6 +193,30 @@ class ProjectManagementAgents:
             llm_config=self.llm_config,
         )
    
+    def _create_combined_agent(self) -> AssistantAgent:
+        """Create a single agent that plays all three roles in one reply"""
+        llm_config = {**self.llm_config, "config_list": [
+            {**self.llm_config["config_list"][0], "max_tokens": 2000}
+        ]}
+        return AssistantAgent(
+            name="ProjectAnalysisPanel",
+            system_message="""
+            You are three project management specialists answering together:
+            (1) a Senior Project Risk Analyst, (2) a Resource Planning and
+            Optimization Specialist, and (3) a Project Management Decision Advisor.
+           
+            Reply with exactly three sections, each starting on its own line
+            with its marker:
+            ###RISK###      - risks, bottlenecks, failure points and risk scores
+            ###RESOURCE###  - workload balance, cost impact, reallocation advice
+            ###DECISION###  - top 3 critical actions, risk mitigation priorities,
+                              resource strategy and expected outcomes
+           
+            Be concise, data-driven and actionable.
+            """,
+            llm_config=llm_config,
+        )
+   
     def _create_user_proxy(self) -> UserProxyAgent:
         """Create User Proxy for interaction"""
         return UserProxyAgent(
@@ -122,57 +231,51 @@ class ProjectManagementAgents:
         Analyze project using pre-calculated metrics.
         This is called by agents_simple.py hybrid system.
         """
-        analysis_prompt = f"""
-Analyze this project management scenario:
- 
-PROJECT OVERVIEW:
-- Total Tasks: {metrics['total_tasks']}
-- Total Duration: {metrics['total_duration']} days
-- Total Budget: ${metrics['total_cost']:,.2f}
-- Resources: {metrics['num_resources']}
-- Tasks with Dependencies: {metrics['num_dependencies']}
- 
-RISK DISTRIBUTION:
-- High Risk: {metrics['high_risk_count']} tasks ({metrics['high_risk_count']/metrics['total_tasks']*100:.1f}%)
-- Medium Risk: {metrics['med_risk_count']} tasks ({metrics['med_risk_count']/metrics['total_tasks']*100:.1f}%)
-- Low Risk: {metrics['low_risk_count']} tasks ({metrics['low_risk_count']/metrics['total_tasks']*100:.1f}%)
-- Complex Dependencies (>1 predecessor): {metrics['complex_task_count']} tasks
- 
-RESOURCE INDICATORS:
-- Overloaded Resources (>150% avg workload): {len(metrics['overloaded_resources'])}
-- Underutilized Resources (<50% avg workload): {len(metrics['underutilized_resources'])}
- 
-TASK: Provide comprehensive analysis from your specialized perspective.
-"""
-       
-        return self._run_agent_workflow(analysis_prompt)
+        return self._run_agent_workflow(self._build_metrics_prompt(metrics))
    
-    def analyze_project(self, csv_file_path: str) -> Dict[str, Any]:
+    def stream_with_metrics(self, metrics: Dict) -> Iterator[str]:
+        """
+        Streaming variant of analyze_with_metrics.
+        Yields the report section by section as each agent finishes, so the
+        first results are visible before the whole workflow completes.
+        """
+        return self._stream_agent_workflow(self._build_metrics_prompt(metrics))
+   
+    def _build_metrics_prompt(self, metrics: Dict) -> str:
+        """Prepare the shared agent prompt from pre-calculated metrics"""
+        total_tasks = metrics['total_tasks']
+        return self.ANALYSIS_PROMPT_TEMPLATE.format_map({
+            **metrics,
+            'high_risk_pct': metrics['high_risk_count'] / total_tasks * 100,
+            'med_risk_pct': metrics['med_risk_count'] / total_tasks * 100,
+            'low_risk_pct': metrics['low_risk_count'] / total_tasks * 100,
+            'overloaded_count': len(metrics['overloaded_resources']),
+            'underutilized_count': len(metrics['underutilized_resources']),
+        })
+   
+    def analyze_project(self, csv_file_path: Union[str, os.PathLike, pd.DataFrame]) -> Dict[str, Any]:
         """
         Run multi-agent analysis on project data.
        
         Args:
-            csv_file_path: Path to project CSV file
+            csv_file_path: Path to project CSV file, or an already loaded DataFrame
            
         Returns:
             Dictionary with analysis results from all agents
         """
         try:
-            # Load and process project data
-            df = pd.read_csv(csv_file_path)
-           
-            # Calculate key metrics
-            metrics = self._calculate_metrics(df)
-           
-            # Prepare analysis prompt
-            analysis_prompt = self._prepare_analysis_prompt(df, metrics)
+            # Load project data and calculate key metrics (shared with the hybrid system)
+            if isinstance(csv_file_path, pd.DataFrame):
+                metrics = calculate_project_metrics(csv_file_path)
+            else:
+                metrics = load_project_metrics(csv_file_path)
            
             # Run multi-agent conversation
             print("\n" + "="*60)
             print("🤖 Starting Multi-Agent Analysis...")
             print("="*60)
            
-            results = self._run_agent_workflow(analysis_prompt)
+            results = self.analyze_with_metrics(metrics)
            
             return {
                 'status': 'success',
@@ -194,100 +297,74 @@ TASK: Provide comprehensive analysis from your specialized perspective.
                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
    
-    def _calculate_metrics(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Calculate project metrics for agent analysis"""
-        # Risk analysis
-        high_risk = df[df['Risk_Level'] == 'High']
-        med_risk = df[df['Risk_Level'] == 'Med']
-        low_risk = df[df['Risk_Level'] == 'Low']
-       
-        # Complexity
-        df['Complexity'] = df['Predecessors'].apply(
-            lambda x: len(str(x).split(',')) if pd.notna(x) and str(x).strip() else 0
+    async def _agent_reply_async(self, agent: AssistantAgent, content: str,
+                                 semaphore: asyncio.Semaphore) -> Optional[str]:
+        """
+        Run a blocking ``generate_reply`` call on a worker thread.
+        Identical calls are served from the shared response cache.
+        """
+        cache = get_response_cache()
+        cache_key = LLMResponseCache.make_key(
+            self.llm_config["config_list"][0]["model"],
+            getattr(agent, "name", ""),
+            getattr(agent, "system_message", ""),
+            content
         )
-        complex_tasks = df[df['Complexity'] > 1]
-       
-        # Resource stats
-        resource_stats = df.groupby('Resource_Name').agg({
-            'Task_ID': 'count',
-            'Duration_Days': 'sum',
-            'Cost_Per_Day': 'first'
-        }).reset_index()
-        resource_stats.columns = ['Resource', 'Task_Count', 'Total_Days', 'Cost_Per_Day']
-        resource_stats['Total_Cost'] = resource_stats['Total_Days'] * resource_stats['Cost_Per_Day']
+        # Disk-backed lookups are file I/O, so keep them off the event loop
+        if cache.persistent:
+            cached = await asyncio.to_thread(cache.get, cache_key)
+        else:
+            cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
        
-        avg_tasks = resource_stats['Task_Count'].mean()
-        overloaded = resource_stats[resource_stats['Task_Count'] > avg_tasks * 1.5]
-        underutilized = resource_stats[resource_stats['Task_Count'] < avg_tasks * 0.5]
+        async with semaphore:
+            response = await asyncio.to_thread(
+                agent.generate_reply,
+                messages=[{"role": "user", "content": content}]
+            )
        
-        return {
-            'total_tasks': len(df),
-            'total_duration': df['Duration_Days'].sum(),
-            'total_cost': (df['Duration_Days'] * df['Cost_Per_Day']).sum(),
-            'resources': df['Resource_Name'].nunique(),
-            'dependencies': len(df[df['Predecessors'].notna()]),
-            'high_risk_count': len(high_risk),
-            'med_risk_count': len(med_risk),
-            'low_risk_count': len(low_risk),
-            'complex_tasks_count': len(complex_tasks),
-            'overloaded_resources': len(overloaded),
-            'underutilized_resources': len(underutilized),
-            'resource_breakdown': resource_stats.to_dict('records')
-        }
+        # Only plain-text replies are cacheable; dict replies carry tool calls
+        if isinstance(response, str):
+            if cache.persistent:
+                await asyncio.to_thread(cache.set, cache_key, response)
+            else:
+                cache.set(cache_key, response)
+        return response
    
-    def _prepare_analysis_prompt(self, df: pd.DataFrame, metrics: Dict) -> str:
-        """Prepare comprehensive prompt for agents"""
-        return f"""
-        Analyze this project management scenario:
-       
-        PROJECT OVERVIEW:
-        - Total Tasks: {metrics['total_tasks']}
-        - Total Duration: {metrics['total_duration']} days
-        - Total Budget: ${metrics['total_cost']:,.2f}
-        - Resources: {metrics['resources']}
-        - Tasks with Dependencies: {metrics['dependencies']}
-       
-        RISK DISTRIBUTION:
-        - High Risk: {metrics['high_risk_count']} tasks ({metrics['high_risk_count']/metrics['total_tasks']*100:.1f}%)
-        - Medium Risk: {metrics['med_risk_count']} tasks ({metrics['med_risk_count']/metrics['total_tasks']*100:.1f}%)
-        - Low Risk: {metrics['low_risk_count']} tasks ({metrics['low_risk_count']/metrics['total_tasks']*100:.1f}%)
-        - Complex Dependencies (>1 predecessor): {metrics['complex_tasks_count']} tasks
-       
-        RESOURCE INDICATORS:
-        - Overloaded Resources (>150% avg workload): {metrics['overloaded_resources']}
-        - Underutilized Resources (<50% avg workload): {metrics['underutilized_resources']}
-       
-        TASK: Provide comprehensive analysis from your specialized perspective.
+    async def _stream_agent_workflow_async(self, prompt: str) -> AsyncIterator[str]:
         """
-   
-    def _run_agent_workflow(self, prompt: str) -> str:
-        """Execute multi-agent workflow with sequential analysis"""
-        results = []
+        Execute the multi-agent workflow, yielding the report piece by piece.
+        Risk and Resource analyses are independent, so they run concurrently;
+        each section is yielded as soon as it is ready, and the Decision
+        Synthesizer runs once both have finished.
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_AGENT_CALLS)
+        header_sent = False
        
-        # Step 1: Risk Analysis
-        try:
-            print("\n🔴 Risk Analyst analyzing...")
-            risk_response = self.risk_agent.generate_reply(
-                messages=[{"role": "user", "content": prompt}]
-            )
-            if risk_response:
-                results.append(f"\n{'='*60}\n🔴 RISK ANALYSIS\n{'='*60}\n{risk_response}")
-        except Exception as e:
-            results.append(f"\n⚠️ Risk Analysis unavailable: {str(e)}")
+        # Fast path: all three analyses from a single LLM call
+        if self.batched:
+            sections = await self._batched_sections_async(prompt, semaphore)
+            if sections:
+                yield self._report_header()
+                for (_, title, _), text in zip(self.REPORT_SECTIONS, sections):
+                    yield f"\n{'='*60}\n{title}\n{'='*60}\n{text}"
+                yield self.REPORT_FOOTER
+                return
+            print("\n⚠️ Combined analysis incomplete, falling back to individual agents...")
        
-        # Step 2: Resource Optimization
-        try:
-            print("\n👥 Resource Optimizer analyzing...")
-            resource_response = self.resource_agent.generate_reply(
-                messages=[{"role": "user", "content": prompt}]
-            )
-            if resource_response:
-                results.append(f"\n{'='*60}\n👥 RESOURCE OPTIMIZATION\n{'='*60}\n{resource_response}")
-        except Exception as e:
-            results.append(f"\n⚠️ Resource Analysis unavailable: {str(e)}")
+        # Steps 1 & 2: Risk Analysis and Resource Optimization (concurrent)
+        print("\n🔴 Risk Analyst analyzing...")
+        print("\n👥 Resource Optimizer analyzing...")
+        risk_task = asyncio.ensure_future(
+            self._agent_reply_async(self.risk_agent, prompt, semaphore)
+        )
+        resource_task = asyncio.ensure_future(
+            self._agent_reply_async(self.resource_agent, prompt, semaphore)
+        )
        
-        # Step 3: Decision Synthesis
-        try:
+        # Step 3: Decision Synthesis (dispatched after steps 1 & 2)
+        async def decision_reply():
             print("\n💡 Decision Synthesizer consolidating...")
             synthesis_prompt = f"""
             Based on the following analyses, provide executive recommendations:
@@ -300,48 +377,135 @@ TASK: Provide comprehensive analysis from your specialized perspective.
             3. Resource Optimization Strategy
             4. Expected Outcomes
             """
-            decision_response = self.decision_agent.generate_reply(
-                messages=[{"role": "user", "content": synthesis_prompt}]
-            )
-            if decision_response:
-                results.append(f"\n{'='*60}\n💡 EXECUTIVE RECOMMENDATIONS\n{'='*60}\n{decision_response}")
+            await asyncio.wait([risk_task, resource_task])
+            return await self._agent_reply_async(self.decision_agent, synthesis_prompt, semaphore)
+       
+        steps = zip([lambda: risk_task, lambda: resource_task, decision_reply], self.REPORT_SECTIONS)
+       
+        for step, (_, title, label) in steps:
+            try:
+                response = await step()
+                section = f"\n{'='*60}\n{title}\n{'='*60}\n{response}" if response else None
+            except Exception as e:
+                section = f"\n⚠️ {label} unavailable: {str(e)}"
+           
+            if section:
+                if not header_sent:
+                    header_sent = True
+                    yield self._report_header()
+                yield section
+       
+        if header_sent:
+            yield self.REPORT_FOOTER
+        else:
+            yield self.UNAVAILABLE_MESSAGE
+   
+    async def _batched_sections_async(self, prompt: str,
+                                      semaphore: asyncio.Semaphore) -> Optional[List[str]]:
+        """
+        Ask the combined agent for all three sections in one reply.
+        Returns the section texts in REPORT_SECTIONS order, or None if the
+        call failed or any section is missing.
+        """
+        print("\n🧠 Analysis panel (risk, resource, decision) analyzing...")
+        try:
+            reply = await self._agent_reply_async(self.combined_agent, prompt, semaphore)
         except Exception as e:
-            results.append(f"\n⚠️ Decision Synthesis unavailable: {str(e)}")
+            print(f"⚠️ Combined analysis failed: {e}")
+            return None
+        return self._split_batched_reply(reply)
+   
+    @classmethod
+    def _split_batched_reply(cls, reply: Any) -> Optional[List[str]]:
+        """Split a ###RISK### / ###RESOURCE### / ###DECISION### reply."""
+        if not isinstance(reply, str):
+            return None
        
-        # Combine all results
-        if results:
-            final_report = f"""
+        parts = re.split(r"^\s*#{3}\s*(RISK|RESOURCE|DECISION)\s*#{3}\s*$", reply, flags=re.MULTILINE)
+        found = {marker: text.strip() for marker, text in zip(parts[1::2], parts[2::2])}
+        sections = [found.get(marker) for marker, _, _ in cls.REPORT_SECTIONS]
+        return sections if all(sections) else None
+   
+    async def _run_agent_workflow_async(self, prompt: str) -> str:
+        """Execute the multi-agent workflow and return the full report."""
+        report = io.StringIO()
+        async for chunk in self._stream_agent_workflow_async(prompt):
+            report.write(chunk)
+        return report.getvalue()
+   
+    @staticmethod
+    def _report_header() -> str:
+        return f"""
 ╔═══════════════════════════════════════════════════════════════╗
 ║   MULTI-AGENT PROJECT ANALYSIS REPORT                         ║
 ║   Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}                              ║
 ║   System: AutoGen Multi-Agent Framework                       ║
 ╚═══════════════════════════════════════════════════════════════╝
  
-{''.join(results)}
- 
-═══════════════════════════════════════════════════════════════
-Multi-Agent Analysis Complete | AutoGen Framework Active
-═══════════════════════════════════════════════════════════════
 """
-            return final_report
-        else:
-            return """
-⚠️ MULTI-AGENT ANALYSIS UNAVAILABLE
+   
+    def _run_agent_workflow(self, prompt: str) -> str:
+        """Synchronous entry point for the multi-agent workflow."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._run_agent_workflow_async(prompt))
+       
+        # Called from inside a running event loop (e.g. a FastAPI handler):
+        # asyncio.run() would fail here, so drive the workflow on a worker thread.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self._run_agent_workflow_async(prompt)).result()
+   
+    def _stream_agent_workflow(self, prompt: str) -> Iterator[str]:
+        """
+        Synchronous generator over the report chunks of the workflow.
+        Must be consumed outside a running event loop (e.g. from a worker
+        thread, as Starlette does for sync StreamingResponse bodies).
+        """
+        loop = asyncio.new_event_loop()
+        chunks = self._stream_agent_workflow_async(prompt)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(chunks.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            # Consumer may stop early: cancel outstanding agent calls
+            loop.run_until_complete(chunks.aclose())
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
  
-The multi-agent system could not complete the analysis.
-Please check:
-1. HF_API_TOKEN is set in .env
-2. HuggingFace API is accessible
-3. Model is available (current: meta-llama/Meta-Llama-3-8B-Instruct)
-"""
+ 
+def get_shared_agents() -> ProjectManagementAgents:
+    """
+    Return a process-wide ProjectManagementAgents instance.
+    Agent construction is paid once; a new instance is built only when
+    HF_MODEL or HF_API_TOKEN change.
+    """
+    return _shared_agents(
+        ProjectManagementAgents,
+        os.getenv("HF_MODEL", "meta-llama/Meta-Llama-3-8B-Instruct"),
+        os.getenv("HF_API_TOKEN")
+    )
+ 
+ 
+@lru_cache(maxsize=1)
+def _shared_agents(agents_cls, model: str, api_key: Optional[str]) -> ProjectManagementAgents:
+    return agents_cls()
  
  
-def analyze_project(csv_file_path: str, *, use_llm: bool = True) -> Dict[str, Any]:
+def analyze_project(csv_file_path: Union[str, os.PathLike, pd.DataFrame], *,
+                    use_llm: bool = True) -> Dict[str, Any]:
     """
     Main entry point for project analysis using AutoGen multi-agent system.
    
     Args:
-        csv_file_path: Path to the project CSV file
+        csv_file_path: Path to the project CSV file, or an already loaded DataFrame
         use_llm: Whether to use LLM agents (requires HF_API_TOKEN)
        
     Returns:
@@ -353,7 +517,7 @@ def analyze_project(csv_file_path: str, *, use_llm: bool = True) -> Dict[str, An
         return simple_analyze(csv_file_path, use_llm=False)
    
     # Use AutoGen multi-agent system
-    agents = ProjectManagementAgents()
+    agents = get_shared_agents()
     return agents.analyze_project(csv_file_path)
  
  
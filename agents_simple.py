@@ -6,10 +6,114 @@ AI-Powered Project Risk & Resource Management
 # Aligns with AI4SE Phase 12: Resource Planning & Optimization
 """
  
+import io
+import os
+import copy
+import pickle
+import hashlib
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple, Union
 from datetime import datetime
-from llm_client import LLMClient
+from llm_client import get_llm_client
+ 
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+ 
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+    POLARS_CSV_SCHEMA = {
+        'Task_Name': pl.String,
+        'Duration_Days': pl.Float64,
+        'Resource_Name': pl.String,
+        'Cost_Per_Day': pl.Float64,
+        'Predecessors': pl.String,
+        'Risk_Level': pl.String,
+    }
+except ImportError:
+    POLARS_AVAILABLE = False
+ 
+# Known project CSV schema (Cost_Per_Day stays float64 so budget totals are exact;
+# Duration_Days is float so fractional and blank durations load). Task_ID is
+# None, i.e. inferred: numeric IDs stay integers and IDs like 'T1' load as text
+PROJECT_CSV_DTYPES = {
+    'Task_ID': None,
+    'Task_Name': 'string',
+    'Duration_Days': 'float64',
+    'Resource_Name': 'category',
+    'Cost_Per_Day': 'float64',
+    'Predecessors': 'string',
+    'Risk_Level': 'category',
+}
+ 
+# Loaded when present but not required: the metrics never read it
+OPTIONAL_CSV_COLUMNS = frozenset({'Task_Name'})
+ 
+# Files larger than this are aggregated chunk by chunk instead of loaded whole
+LARGE_CSV_BYTES = int(os.getenv('RISKMGMT_LARGE_CSV_MB', '512')) << 20
+CSV_CHUNK_ROWS = 250_000
+ 
+ 
+def read_project_csv(csv_file_path, chunksize: Optional[int] = None,
+                     columns: Optional[Iterable[str]] = None):
+    """
+    Read a project CSV with the known column dtypes.
+    Categorical Resource_Name/Risk_Level make groupbys and equality
+    filters work on integer codes instead of Python strings.
+   
+    Args:
+        csv_file_path: Path (or open file) of the project CSV
+        chunksize: If given, return an iterator of DataFrames with this many
+            rows each (C engine; pyarrow cannot stream)
+        columns: Schema columns to load, all required (default: every schema
+            column, with OPTIONAL_CSV_COLUMNS loaded only when present)
+       
+    Returns:
+        DataFrame with the project columns, or an iterator of them
+       
+    Raises:
+        ValueError: If a required column is missing or a value does not parse
+    """
+    usecols = _checked_columns(csv_file_path, columns)
+    return pd.read_csv(
+        csv_file_path,
+        usecols=usecols,
+        dtype={col: PROJECT_CSV_DTYPES[col] for col in usecols if PROJECT_CSV_DTYPES[col] is not None},
+        engine='c' if chunksize else CSV_ENGINE,
+        chunksize=chunksize
+    )
+ 
+ 
+def _checked_columns(csv_file_path, columns: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Schema columns to load from a CSV, in schema order.
+   
+    Raises:
+        ValueError: If a required column is missing from the header
+    """
+    wanted = list(PROJECT_CSV_DTYPES) if columns is None else list(columns)
+    present = set(_csv_header(csv_file_path))
+    missing = [col for col in wanted if col not in present
+               and (columns is not None or col not in OPTIONAL_CSV_COLUMNS)]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    return [col for col in wanted if col in present]
+ 
+ 
+def _csv_header(csv_file_path) -> List[str]:
+    """Column names of a CSV; an open file is rewound to where it was."""
+    if not hasattr(csv_file_path, 'read'):
+        return list(pd.read_csv(csv_file_path, nrows=0).columns)
+    position = csv_file_path.tell()
+    try:
+        return list(pd.read_csv(csv_file_path, nrows=0).columns)
+    finally:
+        csv_file_path.seek(position)
  
  
 def calculate_project_metrics(df: pd.DataFrame) -> Dict[str, Any]:
@@ -17,65 +121,255 @@ def calculate_project_metrics(df: pd.DataFrame) -> Dict[str, Any]:
     Calculate deterministic project metrics (fast, always works).
     This is the foundation that AutoGen agents will analyze.
    
+    Returns only scalars and small lists of records, so the result is
+    cheap to cache and serialize. The input DataFrame is not modified.
+   
     # Aligns with AI4SE Phase 2: Data Modeling & Analysis
     """
+    counts, resource_stats = _partial_metrics(df)
+    return _finalize_metrics(counts, resource_stats)
+ 
+ 
+def calculate_project_metrics_chunked(chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+    """
+    Same metrics as calculate_project_metrics, accumulated over chunks of
+    the project so peak memory is one chunk rather than the whole file.
+   
+    Args:
+        chunks: DataFrames covering the project, e.g. read_project_csv(path, chunksize=...)
+       
+    Returns:
+        Metrics dictionary as produced by calculate_project_metrics
+    """
+    totals = None
+    partial_stats = []
+    for chunk in chunks:
+        counts, resource_stats = _partial_metrics(chunk)
+        totals = counts if totals is None else {k: totals[k] + counts[k] for k in totals}
+        partial_stats.append(resource_stats)
+   
+    if totals is None:
+        raise ValueError("No project data")
+   
+    resource_stats = pd.concat(partial_stats, ignore_index=True).groupby('Resource', sort=False).agg(
+        Task_Count=('Task_Count', 'sum'),
+        Total_Days=('Total_Days', 'sum'),
+        Cost_Per_Day=('Cost_Per_Day', 'first'),
+        Total_Cost=('Total_Cost', 'sum')
+    ).reset_index()
+    return _finalize_metrics(totals, resource_stats)
+ 
+ 
+def _partial_metrics(df: pd.DataFrame) -> Tuple[Dict[str, int], pd.DataFrame]:
+    """Additive counts and per-resource aggregates for one slice of the project."""
+    # Frames not loaded via read_project_csv: convert the two label columns to
+    # categoricals once so the scans below work on integer codes
+    to_category = {col: 'category' for col in ('Risk_Level', 'Resource_Name')
+                   if not isinstance(df[col].dtype, pd.CategoricalDtype)}
+    if to_category:
+        df = df.astype(to_category)
+   
     # === RISK ANALYSIS ===
-    high_risk_tasks = df[df['Risk_Level'] == 'High']
-    med_risk_tasks = df[df['Risk_Level'] == 'Med']
-    low_risk_tasks = df[df['Risk_Level'] == 'Low']
+    risk_counts = df['Risk_Level'].value_counts()
    
-    # Calculate complexity based on dependencies
-    df['Complexity'] = df['Predecessors'].apply(
-        lambda x: len(str(x).split(',')) if pd.notna(x) and str(x).strip() else 0
-    )
-    complex_tasks = df[df['Complexity'] > 1]
+    # Calculate complexity based on dependencies; NaN, '' and whitespace all mean "none"
+    predecessors = df['Predecessors'].fillna('').astype(str).str.strip()
+    complexity = np.where(predecessors.eq(''), 0, predecessors.str.count(',') + 1)
    
     # === RESOURCE STATISTICS ===
-    resource_stats = df.groupby('Resource_Name').agg({
-        'Task_ID': 'count',
-        'Duration_Days': 'sum',
-        'Cost_Per_Day': 'first'
-    }).reset_index()
+    task_cost = df['Duration_Days'] * df['Cost_Per_Day']
+    resource_stats = df.assign(Task_Cost=task_cost).groupby('Resource_Name', sort=False, observed=True).agg(
+        Task_Count=('Task_ID', 'size'),
+        Total_Days=('Duration_Days', 'sum'),
+        Cost_Per_Day=('Cost_Per_Day', 'first'),
+        Total_Cost=('Task_Cost', 'sum')
+    ).reset_index().rename(columns={'Resource_Name': 'Resource'})
+    resource_stats['Resource'] = resource_stats['Resource'].astype(str)
    
-    resource_stats.columns = ['Resource', 'Task_Count', 'Total_Days', 'Cost_Per_Day']
-    resource_stats['Total_Cost'] = resource_stats['Total_Days'] * resource_stats['Cost_Per_Day']
-   
-    # Calculate workload distribution
-    avg_tasks = resource_stats['Task_Count'].mean()
-    avg_days = resource_stats['Total_Days'].mean()
+    counts = {
+        'total_tasks': len(df),
+        'total_duration': _plain_number(df['Duration_Days'].sum()),
+        'num_dependencies': int(np.count_nonzero(complexity)),
+        'high_risk_count': int(risk_counts.get('High', 0)),
+        'med_risk_count': int(risk_counts.get('Med', 0)),
+        'low_risk_count': int(risk_counts.get('Low', 0)),
+        'complex_task_count': int(np.count_nonzero(complexity > 1)),
+    }
+    return counts, resource_stats
+ 
+ 
+def _plain_number(value) -> Union[int, float]:
+    """A Python int for whole numbers (e.g. day totals), else a float."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+ 
+ 
+def _finalize_metrics(counts: Dict[str, int], resource_stats: pd.DataFrame) -> Dict[str, Any]:
+    """Combine project-wide counts and resource aggregates into the metrics dictionary."""
+    # Calculate workload distribution (thresholds on plain NumPy arrays)
+    resource_records = resource_stats.to_dict('records')
+    task_counts = resource_stats['Task_Count'].to_numpy()
+    avg_tasks = task_counts.mean()
+    avg_days = resource_stats['Total_Days'].to_numpy().mean()
    
-    overloaded = resource_stats[resource_stats['Task_Count'] > avg_tasks * 1.5]
-    underutilized = resource_stats[resource_stats['Task_Count'] < avg_tasks * 0.5]
+    overloaded = [resource_records[i] for i in np.flatnonzero(task_counts > avg_tasks * 1.5)]
+    underutilized = [resource_records[i] for i in np.flatnonzero(task_counts < avg_tasks * 0.5)]
    
     # === PROJECT SUMMARY ===
-    total_duration = df['Duration_Days'].sum()
-    total_cost = (df['Duration_Days'] * df['Cost_Per_Day']).sum()
-   
     return {
-        'dataframe': df,
-        'total_tasks': len(df),
-        'total_duration': total_duration,
-        'total_cost': total_cost,
-        'num_resources': df['Resource_Name'].nunique(),
-        'num_dependencies': len(df[df['Predecessors'].notna()]),
-        'num_independent': len(df[df['Predecessors'].isna()]),
-        'high_risk_count': len(high_risk_tasks),
-        'med_risk_count': len(med_risk_tasks),
-        'low_risk_count': len(low_risk_tasks),
-        'complex_task_count': len(complex_tasks),
-        'resource_stats': resource_stats,
-        'avg_tasks_per_resource': avg_tasks,
-        'avg_days_per_resource': avg_days,
+        'total_tasks': counts['total_tasks'],
+        'total_duration': counts['total_duration'],
+        'total_cost': float(resource_stats['Total_Cost'].sum()),
+        'num_resources': len(resource_stats),
+        'num_dependencies': counts['num_dependencies'],
+        'num_independent': counts['total_tasks'] - counts['num_dependencies'],
+        'high_risk_count': counts['high_risk_count'],
+        'med_risk_count': counts['med_risk_count'],
+        'low_risk_count': counts['low_risk_count'],
+        'complex_task_count': counts['complex_task_count'],
+        'resource_stats': resource_records,
+        'avg_tasks_per_resource': float(avg_tasks),
+        'avg_days_per_resource': float(avg_days),
         'overloaded_resources': overloaded,
-        'underutilized_resources': underutilized,
-        'high_risk_tasks': high_risk_tasks,
-        'med_risk_tasks': med_risk_tasks,
-        'low_risk_tasks': low_risk_tasks,
-        'complex_tasks': complex_tasks
+        'underutilized_resources': underutilized
     }
  
  
-def analyze_project(csv_file_path: str, *, use_llm: bool = True, use_autogen: bool = True) -> Dict[str, Any]:
+def _calculate_metrics_polars(csv_file_path: str) -> Dict[str, Any]:
+    """
+    Polars implementation of calculate_project_metrics for CSV input.
+    Reads and aggregates in one lazy plan on Polars' multi-threaded engine;
+    returns exactly the same dictionary as the pandas path.
+   
+    Raises:
+        ValueError: If a required column is missing, as read_project_csv does
+    """
+    _checked_columns(csv_file_path)
+    lf = pl.scan_csv(csv_file_path, schema_overrides=POLARS_CSV_SCHEMA)
+    predecessors = pl.col('Predecessors').str.strip_chars().fill_null('')
+    complexity = pl.when(predecessors == '').then(0).otherwise(predecessors.str.count_matches(',') + 1)
+   
+    summary, resource_stats = pl.collect_all([
+        lf.select(
+            pl.len().alias('total_tasks'),
+            pl.col('Duration_Days').sum().alias('total_duration'),
+            (complexity > 0).sum().alias('num_dependencies'),
+            (pl.col('Risk_Level') == 'High').sum().alias('high_risk_count'),
+            (pl.col('Risk_Level') == 'Med').sum().alias('med_risk_count'),
+            (pl.col('Risk_Level') == 'Low').sum().alias('low_risk_count'),
+            (complexity > 1).sum().alias('complex_task_count'),
+        ),
+        lf.filter(pl.col('Resource_Name').is_not_null())
+        .group_by('Resource_Name', maintain_order=True)
+        .agg(
+            pl.len().alias('Task_Count'),
+            pl.col('Duration_Days').sum().alias('Total_Days'),
+            pl.col('Cost_Per_Day').first().alias('Cost_Per_Day'),
+            (pl.col('Duration_Days') * pl.col('Cost_Per_Day')).sum().alias('Total_Cost'),
+        )
+        .rename({'Resource_Name': 'Resource'}),
+    ])
+    summary = summary.row(0, named=True)
+   
+    avg_tasks = resource_stats['Task_Count'].mean()
+    avg_days = resource_stats['Total_Days'].mean()
+    overloaded = resource_stats.filter(pl.col('Task_Count') > avg_tasks * 1.5)
+    underutilized = resource_stats.filter(pl.col('Task_Count') < avg_tasks * 0.5)
+   
+    return {
+        'total_tasks': summary['total_tasks'],
+        'total_duration': _plain_number(summary['total_duration']),
+        'total_cost': float(resource_stats['Total_Cost'].sum()),
+        'num_resources': resource_stats.height,
+        'num_dependencies': summary['num_dependencies'],
+        'num_independent': summary['total_tasks'] - summary['num_dependencies'],
+        'high_risk_count': summary['high_risk_count'],
+        'med_risk_count': summary['med_risk_count'],
+        'low_risk_count': summary['low_risk_count'],
+        'complex_task_count': summary['complex_task_count'],
+        'resource_stats': resource_stats.to_dicts(),
+        'avg_tasks_per_resource': float(avg_tasks),
+        'avg_days_per_resource': float(avg_days),
+        'overloaded_resources': overloaded.to_dicts(),
+        'underutilized_resources': underutilized.to_dicts()
+    }
+ 
+ 
+def load_project_metrics(csv_file_path: str) -> Dict[str, Any]:
+    """
+    Read a project CSV and calculate its metrics, reusing cached results.
+   
+    Results are cached in memory keyed by (path, mtime, size), so an edited
+    file is always re-read. Set RISKMGMT_CACHE_DIR to also reuse them across
+    processes.
+   
+    Args:
+        csv_file_path: Path to the project CSV file
+       
+    Returns:
+        Metrics dictionary as produced by calculate_project_metrics
+    """
+    path = os.path.abspath(csv_file_path)
+    stat = os.stat(path)
+    # Deep copy: the nested resource lists are shared with the cache entry
+    return copy.deepcopy(_load_and_compute(path, stat.st_mtime_ns, stat.st_size))
+ 
+ 
+@lru_cache(maxsize=32)
+def _load_and_compute(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Compute metrics for one version of a CSV file (memoized)."""
+    fingerprint = (mtime_ns, size)
+    cache_file = None
+   
+    cache_dir = os.getenv('RISKMGMT_CACHE_DIR')
+    if cache_dir:
+        metrics_dir = os.path.join(cache_dir, 'metrics')
+        cache_file = os.path.join(metrics_dir, hashlib.sha1(path.encode('utf-8')).hexdigest() + '.pkl')
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('fingerprint') == fingerprint:
+                return cached['metrics']
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass
+   
+    if POLARS_AVAILABLE:
+        metrics = _calculate_metrics_polars(path)
+    elif size > LARGE_CSV_BYTES:
+        metrics = calculate_project_metrics_chunked(read_project_csv(path, chunksize=CSV_CHUNK_ROWS))
+    else:
+        metrics = calculate_project_metrics(read_project_csv(path))
+   
+    if cache_file:
+        try:
+            os.makedirs(metrics_dir, exist_ok=True)
+            with open(cache_file, 'wb') as f:
+                pickle.dump({'fingerprint': fingerprint, 'metrics': metrics}, f)
+        except OSError as e:
+            print(f"⚠️  Could not write metrics cache: {e}")
+   
+    return metrics
+ 
+ 
+def llm_skip_reason(metrics: Dict[str, Any]) -> Optional[str]:
+    """
+    Decide whether a project is too simple to be worth an LLM call.
+    Projects below RISKMGMT_LLM_MIN_TASKS tasks (default 5), or with no
+    high-risk and no multi-dependency tasks, get a metrics-only report.
+   
+    Returns:
+        Human-readable reason to skip, or None if the LLM should run
+    """
+    min_tasks = int(os.getenv('RISKMGMT_LLM_MIN_TASKS', '5'))
+    if metrics['total_tasks'] < min_tasks:
+        return f"Project has only {metrics['total_tasks']} tasks (threshold: {min_tasks})"
+    if metrics['high_risk_count'] == 0 and metrics['complex_task_count'] == 0:
+        return "Project has no high-risk tasks and no complex dependencies"
+    return None
+ 
+ 
+def analyze_project(csv_file_path: Union[str, os.PathLike, pd.DataFrame], *, use_llm: bool = True,
+                    use_autogen: bool = True) -> Dict[str, Any]:
     """
     Analyze project data using hybrid approach:
     1. Calculate metrics (deterministic, fast)
@@ -85,24 +379,73 @@ def analyze_project(csv_file_path: str, *, use_llm: bool = True, use_autogen: bo
     # Aligns with AI4SE Phase 9: Multi-Agent Architecture
    
     Args:
-        csv_file_path: Path to the project CSV file
+        csv_file_path: Path to the project CSV file, or an already loaded DataFrame
         use_llm: Whether to use LLM for additional insights
         use_autogen: Whether to use AutoGen multi-agent system
        
     Returns:
         Dictionary containing analysis results
     """
+    if isinstance(csv_file_path, pd.DataFrame):
+        return analyze_project_df(csv_file_path, use_llm=use_llm, use_autogen=use_autogen)
+    return _run_analysis(lambda: load_project_metrics(csv_file_path), csv_file_path,
+                         use_llm=use_llm, use_autogen=use_autogen)
+ 
+ 
+def analyze_project_df(df: pd.DataFrame, *, use_llm: bool = True, use_autogen: bool = True) -> Dict[str, Any]:
+    """
+    Same as analyze_project, for project data that is already loaded
+    (e.g. an API upload that is also passed to the optimizer and simulator).
+   
+    Args:
+        df: DataFrame with project data
+        use_llm: Whether to use LLM for additional insights
+        use_autogen: Whether to use AutoGen multi-agent system
+       
+    Returns:
+        Dictionary containing analysis results
+    """
+    return _run_analysis(lambda: calculate_project_metrics(df), 'uploaded data',
+                         use_llm=use_llm, use_autogen=use_autogen)
+ 
+ 
+def analyze_project_chunks(chunks: Iterable[pd.DataFrame], *, use_llm: bool = True,
+                           use_autogen: bool = True) -> Dict[str, Any]:
+    """
+    Same as analyze_project_df, for project data streamed in chunks
+    (metrics via calculate_project_metrics_chunked).
+   
+    Args:
+        chunks: DataFrames covering the project
+        use_llm: Whether to use LLM for additional insights
+        use_autogen: Whether to use AutoGen multi-agent system
+       
+    Returns:
+        Dictionary containing analysis results
+    """
+    return _run_analysis(lambda: calculate_project_metrics_chunked(chunks), 'uploaded data',
+                         use_llm=use_llm, use_autogen=use_autogen)
+ 
+ 
+def _run_analysis(compute_metrics: Callable[[], Dict[str, Any]], source: str, *,
+                  use_llm: bool, use_autogen: bool) -> Dict[str, Any]:
+    """Shared analysis pipeline behind analyze_project and analyze_project_df."""
     try:
         # === STEP 1: CALCULATE METRICS (Always works) ===
         print("\\n" + "="*60)
         print("📊 STEP 1: Calculating Project Metrics...")
         print("="*60)
        
-        df = pd.read_csv(csv_file_path)
-        metrics = calculate_project_metrics(df)
+        metrics = compute_metrics()
        
         print(f"✅ Metrics calculated: {metrics['total_tasks']} tasks, {metrics['num_resources']} resources")
        
+        # Small/low-risk projects: the metrics already say everything
+        skip_reason = llm_skip_reason(metrics) if (use_autogen or use_llm) else None
+        if skip_reason:
+            print(f"⚡ Skipping AI analysis: {skip_reason}")
+            use_autogen = use_llm = False
+       
         # === STEP 2: TRY AUTOGEN MULTI-AGENT ANALYSIS ===
         autogen_analysis = None
         if use_autogen:
@@ -111,8 +454,8 @@ def analyze_project(csv_file_path: str, *, use_llm: bool = True, use_autogen: bo
                 print("🤖 STEP 2: Running AutoGen Multi-Agent Analysis...")
                 print("="*60)
                
-                from agents_autogen import ProjectManagementAgents
-                agents = ProjectManagementAgents()
+                from agents_autogen import get_shared_agents
+                agents = get_shared_agents()
                 autogen_result = agents.analyze_with_metrics(metrics)
                 autogen_analysis = autogen_result
                 print("✅ AutoGen analysis complete!")
@@ -129,7 +472,7 @@ def analyze_project(csv_file_path: str, *, use_llm: bool = True, use_autogen: bo
             print("🔄 STEP 3: Fallback to Simple LLM Analysis...")
             print("="*60)
            
-            client = LLMClient()
+            client = get_llm_client()
             if client.available():
                 prompt = (
                     "You are an AI project analyst. Provide a comprehensive project analysis.\\n\\n"
@@ -141,14 +484,14 @@ def analyze_project(csv_file_path: str, *, use_llm: bool = True, use_autogen: bo
                     f"Dependencies: {metrics['num_dependencies']}\\n\\n"
                     f"RISK: High={metrics['high_risk_count']}, Med={metrics['med_risk_count']}, Low={metrics['low_risk_count']}\\n"
                     f"Complex tasks: {metrics['complex_task_count']}\\n\\n"
-                    f"RESOURCES:\\n{metrics['resource_stats'].to_string(index=False)}\\n\\n"
+                    f"RESOURCES:\\n{pd.DataFrame(metrics['resource_stats']).to_string(index=False)}\\n\\n"
                     "Provide detailed analysis with actionable recommendations."
                 )
                 simple_llm_analysis = client.generate(prompt, max_tokens=800, temperature=0.3)
                 print("✅ Simple LLM analysis complete!")
        
         # === BUILD FINAL REPORT ===
-        final_output = build_report(metrics, autogen_analysis, simple_llm_analysis)
+        final_output = build_report(metrics, autogen_analysis, simple_llm_analysis, skip_reason=skip_reason)
        
         return {
             'status': 'success',
@@ -160,7 +503,7 @@ def analyze_project(csv_file_path: str, *, use_llm: bool = True, use_autogen: bo
     except FileNotFoundError:
         return {
             'status': 'error',
-            'error_message': f'File not found: {csv_file_path}',
+            'error_message': f'File not found: {source}',
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
     except Exception as e:
@@ -171,7 +514,8 @@ def analyze_project(csv_file_path: str, *, use_llm: bool = True, use_autogen: bo
         }
  
  
-def build_report(metrics: Dict, autogen_analysis: Optional[str], simple_analysis: Optional[str]) -> str:
+def build_report(metrics: Dict, autogen_analysis: Optional[str], simple_analysis: Optional[str],
+                 skip_reason: Optional[str] = None) -> str:
     """Build the final analysis report combining all sources."""
    
     header = f"""
@@ -213,6 +557,13 @@ Underutilized Resources: {len(metrics['underutilized_resources'])}
 ═══════════════════════════════════════════════════════════════
 {simple_analysis}
 ═══════════════════════════════════════════════════════════════
+"""
+    elif skip_reason:
+        ai_section = f"""
+⚡ AI ANALYSIS SKIPPED
+═══════════════════════════════════════════════════════════════
+{skip_reason}. The metrics above cover this project.
+═══════════════════════════════════════════════════════════════
 """
     else:
         ai_section = """
@@ -226,11 +577,16 @@ LLM integration is not configured. To enable:
 """
    
     footer = f"""
-Analysis Mode: {'✅ AutoGen Multi-Agent' if autogen_analysis else '✅ Simple LLM' if simple_analysis else '⚠️  Metrics Only'}
+Analysis Mode: {'✅ AutoGen Multi-Agent' if autogen_analysis else '✅ Simple LLM' if simple_analysis else '⚡ Metrics Only (fast path)' if skip_reason else '⚠️  Metrics Only'}
 ═══════════════════════════════════════════════════════════════
 """
    
-    return header + metrics_section + ai_section + footer
+    report = io.StringIO()
+    report.write(header)
+    report.write(metrics_section)
+    report.write(ai_section)
+    report.write(footer)
+    return report.getvalue()
  
  
 if __name__ == "__main__":
@@ -6,50 +6,347 @@ Provides RESTful API for programmatic access to analysis engine
 # Enables automated project analysis in development pipelines
 """
  
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Query
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, Annotated
 import pandas as pd
 import numpy as np
-import tempfile
+import io
+import asyncio
+import logging
 import os
-import json
+import time
+import hashlib
+import orjson
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime
  
 # Import analysis modules
-from agents_simple import analyze_project, calculate_project_metrics
-from resource_optimizer import optimize_resources
-from risk_simulator import simulate_project_risk
- 
- 
-def convert_to_serializable(obj):
-    """Convert numpy/pandas types to JSON-serializable Python types."""
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, pd.Series):
-        return obj.tolist()
-    elif isinstance(obj, pd.DataFrame):
+from agents_simple import analyze_project_df, analyze_project_chunks, read_project_csv, CSV_CHUNK_ROWS, PROJECT_CSV_DTYPES
+from resource_optimizer import ResourceOptimizer, optimize_resources
+from risk_simulator import RiskSimulator, simulate_project_risk, NUMBA_AVAILABLE, _mc_kernel
+ 
+ 
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+ 
+ 
+def _orjson_default(obj):
+    """Encode the pandas types orjson does not handle natively."""
+    if isinstance(obj, pd.DataFrame):
         return obj.to_dict(orient='records')
-    elif isinstance(obj, dict):
-        return {key: convert_to_serializable(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_to_serializable(item) for item in obj]
-    elif isinstance(obj, tuple):
-        return tuple(convert_to_serializable(item) for item in obj)
-    else:
-        return obj
+    if isinstance(obj, pd.Series):
+        return obj.tolist()
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+ 
+ 
+def json_response(content: Any) -> Response:
+    """Serialize results (numpy, pandas, dataclasses) in one orjson pass."""
+    return Response(
+        content=orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS),
+        media_type="application/json"
+    )
+ 
+ 
+# Uploads are read in 1 MB chunks
+UPLOAD_CHUNK_SIZE = 1 << 20
+ 
+# Uploads up to this size are also kept in memory while hashing, so parsing
+# does not read the spooled file a second time
+IN_MEMORY_UPLOAD_LIMIT = int(os.getenv("RISKMGMT_IN_MEMORY_UPLOAD_MB", "200")) << 20
+ 
+ 
+async def upload_digest(upload: UploadFile, keep_limit: int = 0) -> Tuple[str, Optional[io.BytesIO]]:
+    """
+    Hash an uploaded file chunk by chunk and rewind it for parsing.
+   
+    Args:
+        upload: Uploaded file
+        keep_limit: Also return the content as an in-memory buffer when it
+            is at most this many bytes (0 disables)
+       
+    Returns:
+        Tuple of (hex digest, buffer or None)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    buffer = io.BytesIO() if keep_limit > 0 else None
+    await upload.seek(0)
+    while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+        digest.update(chunk)
+        if buffer is not None:
+            if buffer.tell() + len(chunk) > keep_limit:
+                buffer = None
+            else:
+                buffer.write(chunk)
+    await upload.seek(0)
+    if buffer is not None:
+        buffer.seek(0)
+    return digest.hexdigest(), buffer
+ 
+ 
+class ResponseCache:
+    """
+    LRU cache of serialized responses with a time-to-live.
+    Keys combine the endpoint, the upload's content hash and the request
+    parameters, so re-posting the same CSV skips parsing and analysis.
+    """
+   
+    def __init__(self, max_size: int = 128, ttl: float = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+   
+    @staticmethod
+    def make_key(endpoint: str, digest: str, **params) -> str:
+        """Build the cache key for one request."""
+        options = ":".join(f"{name}={value}" for name, value in sorted(params.items()))
+        return f"{endpoint}:{digest}:{options}"
+   
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached body for key, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, body = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return body
+   
+    def set(self, key: str, body: bytes) -> None:
+        """Cache a response body."""
+        self._entries[key] = (time.monotonic() + self.ttl, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+   
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._entries.clear()
+   
+    def __len__(self) -> int:
+        return len(self._entries)
+ 
+ 
+# Process-local; only touched from the event loop thread, so no lock needed
+RESPONSE_CACHE = ResponseCache(
+    max_size=int(os.getenv("RISKMGMT_RESPONSE_CACHE_SIZE", "128")),
+    ttl=float(os.getenv("RISKMGMT_RESPONSE_CACHE_TTL", "3600"))
+)
+ 
+ 
+def cached_json_response(key: str) -> Optional[Response]:
+    """Return the cached response for key, if any."""
+    body = RESPONSE_CACHE.get(key)
+    if body is None:
+        return None
+    return Response(content=body, media_type="application/json")
+ 
+ 
+# Result statuses whose responses are stored ('heuristic': the optimizer's deterministic LPT schedule)
+CACHEABLE_STATUSES = frozenset({'success', 'heuristic'})
+ 
+ 
+def cache_json_response(key: str, content: Dict[str, Any], status: Optional[str]) -> Response:
+    """Serialize content, caching the body when the analysis succeeded."""
+    response = json_response(content)
+    if status in CACHEABLE_STATUSES:
+        RESPONSE_CACHE.set(key, response.body)
+    return response
+ 
+ 
+# Bytes inspected to decide whether an upload is a CSV file
+CSV_SNIFF_BYTES = 4096
+ 
+ 
+def looks_like_csv(head: bytes) -> bool:
+    """Content check on the start of an upload: UTF-8 text with a comma-separated header."""
+    head = head.removeprefix(b"\xef\xbb\xbf")
+    if not head or b"\x00" in head:
+        return False
+    try:
+        text = head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut at the sniff boundary is still valid text
+        if e.start < len(head) - 3:
+            return False
+        text = head[:e.start].decode("utf-8")
+    lines = text.splitlines()
+    return bool(lines) and "," in lines[0]
+ 
+ 
+@dataclass
+class CSVUpload:
+    """A validated CSV upload, its content hash and (if small enough) its bytes."""
+    file: UploadFile
+    digest: str
+    data: Optional[io.BytesIO] = None
+ 
+ 
+async def csv_upload(file: UploadFile = File(...)) -> CSVUpload:
+    """
+    Shared endpoint dependency: validate the upload by content (not by
+    filename) and hash it for the response cache.
+    """
+    await file.seek(0)
+    if not looks_like_csv(await file.read(CSV_SNIFF_BYTES)):
+        raise HTTPException(status_code=400, detail="Only CSV files are supported")
+    digest, data = await upload_digest(file, keep_limit=IN_MEMORY_UPLOAD_LIMIT)
+    return CSVUpload(file=file, digest=digest, data=data)
+ 
+ 
+def parse_project_csv(source, **options):
+    """read_project_csv, with missing columns and unparsable values reported as 400 Bad Request."""
+    try:
+        return read_project_csv(source, **options)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid project CSV: {e}")
+ 
+ 
+async def read_upload_csv(upload: CSVUpload, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Parse an uploaded CSV off the event loop, from the in-memory copy when
+    there is one and otherwise from the spooled file.
+    Uses the known project schema (and pyarrow when installed) instead of
+    per-column type inference; columns limits the parse (and the required
+    columns) to what the endpoint's consumer reads.
+    """
+    if upload.data is not None:
+        upload.data.seek(0)
+        return await run_in_threadpool(parse_project_csv, upload.data, columns=columns)
+    await upload.file.seek(0)
+    return await run_in_threadpool(parse_project_csv, upload.file.file, columns=columns)
+ 
+ 
+# Monte Carlo iterations accepted per request, validated by FastAPI before the handler runs
+MIN_SIMULATIONS, MAX_SIMULATIONS = 100, 100_000
+NumSimulations = Annotated[int, Query(ge=MIN_SIMULATIONS, le=MAX_SIMULATIONS)]
+ 
+ 
+# LP solves / simulations allowed at once; more would only time-slice the same cores
+CPU_CONCURRENCY = int(os.getenv("RISKMGMT_CPU_CONCURRENCY", str(max(1, (os.cpu_count() or 2) - 1))))
+# Each solve gets its share of the cores, so concurrent solves don't oversubscribe them
+SOLVER_THREADS = max(1, (os.cpu_count() or 1) // CPU_CONCURRENCY)
+ 
+ 
+async def run_cpu_bound(func, *args, **kwargs):
+    """
+    Run CPU-heavy work in the thread pool, at most CPU_CONCURRENCY at a time.
+    The limit is app.state.cpu_semaphore, which lifespan creates on the
+    server's event loop; calls made while no lifespan is running (direct
+    handler calls) are not throttled.
+    """
+    semaphore = getattr(app.state, 'cpu_semaphore', None)
+    if semaphore is None:
+        return await run_in_threadpool(func, *args, **kwargs)
+    async with semaphore:
+        return await run_in_threadpool(func, *args, **kwargs)
+ 
+ 
+async def run_simulation(df: pd.DataFrame, num_simulations: int) -> Dict[str, Any]:
+    """
+    simulate_project_risk through run_cpu_bound. With numba installed, large
+    runs use the prange kernel on every core, so app.state.simulation_semaphore
+    (created by lifespan) lets only one simulation run at a time.
+    """
+    semaphore = getattr(app.state, 'simulation_semaphore', None)
+    if semaphore is None:
+        return await run_cpu_bound(simulate_project_risk, df, num_simulations)
+    async with semaphore:
+        return await run_cpu_bound(simulate_project_risk, df, num_simulations)
+ 
+ 
+# Tiny project used to exercise every code path once at startup
+WARMUP_CSV = b"""Task_ID,Task_Name,Duration_Days,Resource_Name,Cost_Per_Day,Predecessors,Risk_Level
+1,Design,3,Alice,500,,High
+2,Build,5,Bob,400,1,Med
+3,Test,2,Alice,500,"1,2",Low
+"""
+ 
+ 
+def warm_up() -> None:
+    """
+    Run the parser, analysis, optimizer and simulator once on a tiny
+    project so one-time costs (lazy imports, CBC solver start-up, first
+    pandas/pyarrow calls, numba compilation) are paid at boot instead of by
+    the first client.
+    """
+    try:
+        df = read_project_csv(io.BytesIO(WARMUP_CSV))
+        analyze_project_df(df, use_llm=False, use_autogen=False)
+        optimize_resources(df)
+        simulate_project_risk(df, 100)
+        if NUMBA_AVAILABLE:
+            # The tiny project stays on the NumPy path, so compile the kernel
+            # directly; the distribution is a runtime argument, one compile covers all
+            ones = np.ones(1)
+            _mc_kernel(ones, ones, ones, ones, ones, ones, 0, 1, 0)
+        print("🔥 API warm-up complete")
+    except Exception as e:
+        print(f"⚠️ API warm-up failed: {e}")
+ 
+ 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Create the CPU-work semaphores on the serving event loop and warm up the
+    analysis engine before serving (disable with RISKMGMT_API_WARMUP=0).
+    """
+    app.state.cpu_semaphore = asyncio.Semaphore(CPU_CONCURRENCY)
+    app.state.simulation_semaphore = asyncio.Semaphore(1) if NUMBA_AVAILABLE else None
+    try:
+        if os.getenv("RISKMGMT_API_WARMUP", "1") != "0":
+            await run_in_threadpool(warm_up)
+        yield
+    finally:
+        # Bound to this loop; the next lifespan (e.g. another TestClient) makes its own
+        del app.state.cpu_semaphore
+        del app.state.simulation_semaphore
+ 
+ 
+async def no_result() -> None:
+    """Placeholder for a disabled sub-analysis in asyncio.gather."""
+    return None
+ 
+ 
+def analyze_upload_chunked(upload: CSVUpload, **options) -> Dict[str, Any]:
+    """
+    Low-memory analysis: aggregate metrics over chunks of the upload instead
+    of parsing it into one DataFrame. Blocking; run it in the thread pool.
+    """
+    source = upload.data if upload.data is not None else upload.file.file
+    source.seek(0)
+    return analyze_project_chunks(parse_project_csv(source, chunksize=CSV_CHUNK_ROWS), **options)
+ 
+ 
+class HealthCheckLogFilter(logging.Filter):
+    """Drop uvicorn access-log lines for /health so liveness probes don't flood the logs."""
+   
+    def filter(self, record: logging.LogRecord) -> bool:
+        # uvicorn access records carry (client, method, path, http_version, status)
+        args = record.args
+        return not (isinstance(args, tuple) and len(args) >= 3
+                    and str(args[2]).split("?", 1)[0] == "/health")
+ 
+ 
+logging.getLogger("uvicorn.access").addFilter(HealthCheckLogFilter())
  
  
 app = FastAPI(
     title="AI Project Risk & Resource Management API",
     description="RESTful API for project analysis, optimization, and risk simulation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
  
 # Enable CORS for web clients
@@ -61,6 +358,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
  
+# Compress larger JSON responses (metrics, simulation reports) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+ 
  
 class AnalysisRequest(BaseModel):
     """Request model for project analysis."""
@@ -98,24 +398,38 @@ async def root():
     }
  
  
+# (epoch second, ISO string) so frequent probes reuse one formatted timestamp
+_health_timestamp = (0, "")
+ 
+ 
+def health_timestamp() -> str:
+    """Current time in ISO format, formatted at most once per second."""
+    global _health_timestamp
+    now = int(time.time())
+    if now != _health_timestamp[0]:
+        _health_timestamp = (now, datetime.fromtimestamp(now).isoformat())
+    return _health_timestamp[1]
+ 
+ 
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring."""
     return {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": health_timestamp(),
         "version": "1.0.0"
     }
  
  
-@app.post("/analyze", response_model=AnalysisResponse)
+@app.post("/analyze", responses={200: {"model": AnalysisResponse}})
 async def analyze_project_endpoint(
-    file: UploadFile = File(...),
+    upload: CSVUpload = Depends(csv_upload),
     use_llm: bool = True,
     use_autogen: bool = True,
     enable_optimization: bool = False,
     enable_simulation: bool = False,
-    num_simulations: int = 1000
+    num_simulations: int = 1000,
+    low_memory: bool = False
 ):
     """
     Comprehensive project analysis endpoint.
@@ -126,109 +440,124 @@ async def analyze_project_endpoint(
     - Optional: Monte Carlo risk simulation
    
     Args:
-        file: CSV file with project data
+        upload: Validated CSV upload with project data
         use_llm: Enable LLM analysis
         use_autogen: Enable AutoGen multi-agent system
         enable_optimization: Run resource optimization
         enable_simulation: Run Monte Carlo simulation
-        num_simulations: Number of Monte Carlo iterations
+        num_simulations: Number of Monte Carlo iterations (only checked
+            against the /simulate limits when enable_simulation is set)
+        low_memory: Aggregate metrics chunk by chunk (ignored when
+            optimization or simulation needs the full table)
        
     Returns:
         Comprehensive analysis results
     """
+    if enable_simulation and not MIN_SIMULATIONS <= num_simulations <= MAX_SIMULATIONS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"num_simulations must be between {MIN_SIMULATIONS} and {MAX_SIMULATIONS:,}"
+        )
+   
     try:
-        # Validate file type
-        if not file.filename.endswith('.csv'):
-            raise HTTPException(status_code=400, detail="Only CSV files are supported")
+        # Optimization and simulation need the whole table, so low_memory
+        # only streams the upload when neither is requested
+        chunked = low_memory and not (enable_optimization or enable_simulation)
        
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
+        # Identical upload + parameters: serve the stored response (the
+        # chunked path is part of the key: it does not promise identical output)
+        cache_key = ResponseCache.make_key(
+            "analyze", upload.digest,
+            use_llm=use_llm, use_autogen=use_autogen,
+            enable_optimization=enable_optimization,
+            enable_simulation=enable_simulation, num_simulations=num_simulations,
+            low_memory=chunked
+        )
+        cached = cached_json_response(cache_key)
+        if cached is not None:
+            return cached
        
-        try:
-            # Run main analysis
-            analysis_result = analyze_project(
-                tmp_path,
+        # Run main analysis (blocking work runs in the thread pool so the
+        # event loop keeps serving other requests)
+        if chunked:
+            df = None
+            analysis = run_in_threadpool(
+                analyze_upload_chunked,
+                upload,
                 use_llm=use_llm,
                 use_autogen=use_autogen
             )
-           
-            # Load DataFrame for optional analyses
-            df = pd.read_csv(tmp_path)
-           
-            # Optional: Resource optimization
-            optimization_result = None
-            if enable_optimization:
-                optimization_result = optimize_resources(df)
-                optimization_result = convert_to_serializable(optimization_result)
-           
-            # Optional: Monte Carlo simulation
-            simulation_result = None
-            if enable_simulation:
-                simulation_result = simulate_project_risk(df, num_simulations)
-                simulation_result = convert_to_serializable(simulation_result)
-           
-            # Convert all results to JSON-serializable format
-            metrics = convert_to_serializable(analysis_result.get('metrics'))
-           
-            return AnalysisResponse(
-                status=analysis_result['status'],
-                timestamp=analysis_result['timestamp'],
-                analysis_results=analysis_result.get('analysis_results'),
-                metrics=metrics,
-                optimization=optimization_result,
-                simulation=simulation_result
+        else:
+            # Parse the upload once; every sub-analysis shares the same DataFrame
+            # (the optimizer also reports task names, so they become required)
+            df = await read_upload_csv(upload, list(PROJECT_CSV_DTYPES) if enable_optimization else None)
+            analysis = run_in_threadpool(
+                analyze_project_df,
+                df,
+                use_llm=use_llm,
+                use_autogen=use_autogen
             )
+       
+        # Optional: Resource optimization and Monte Carlo simulation
+        optimization = (run_cpu_bound(optimize_resources, df, threads=SOLVER_THREADS)
+                        if enable_optimization else no_result())
+        simulation = run_simulation(df, num_simulations) if enable_simulation else no_result()
+       
+        # The sub-analyses only read df, so they run concurrently
+        analysis_result, optimization_result, simulation_result = await asyncio.gather(
+            analysis, optimization, simulation
+        )
+       
+        # Serialized once by orjson; AnalysisResponse documents the shape
+        return cache_json_response(cache_key, {
+            'status': analysis_result['status'],
+            'timestamp': analysis_result['timestamp'],
+            'analysis_results': analysis_result.get('analysis_results'),
+            'metrics': analysis_result.get('metrics'),
+            'optimization': optimization_result,
+            'simulation': simulation_result,
+            'error_message': analysis_result.get('error_message')
+        }, analysis_result['status'])
            
-        finally:
-            # Clean up temporary file
-            os.unlink(tmp_path)
-           
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
  
  
 @app.post("/optimize")
-async def optimize_endpoint(file: UploadFile = File(...)):
+async def optimize_endpoint(upload: CSVUpload = Depends(csv_upload)):
     """
     Resource optimization endpoint.
    
     Upload a project CSV and get optimized resource allocation using Linear Programming.
    
     Args:
-        file: CSV file with project data
+        upload: Validated CSV upload with project data
        
     Returns:
         Optimization results with recommendations
     """
     try:
-        if not file.filename.endswith('.csv'):
-            raise HTTPException(status_code=400, detail="Only CSV files are supported")
+        cache_key = ResponseCache.make_key("optimize", upload.digest)
+        cached = cached_json_response(cache_key)
+        if cached is not None:
+            return cached
        
-        # Save and process file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
-       
-        try:
-            df = pd.read_csv(tmp_path)
-            result = optimize_resources(df)
-            result = convert_to_serializable(result)
-            return JSONResponse(content=result)
-        finally:
-            os.unlink(tmp_path)
+        df = await read_upload_csv(upload, ResourceOptimizer.COLUMNS)
+        result = await run_cpu_bound(optimize_resources, df, threads=SOLVER_THREADS)
+        return cache_json_response(cache_key, result, result.get('status'))
            
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
  
  
 @app.post("/simulate")
 async def simulate_endpoint(
-    file: UploadFile = File(...),
-    num_simulations: int = 1000
+    upload: CSVUpload = Depends(csv_upload),
+    num_simulations: NumSimulations = 1000
 ):
     """
     Monte Carlo risk simulation endpoint.
@@ -236,36 +565,26 @@ async def simulate_endpoint(
     Upload a project CSV and run risk simulation.
    
     Args:
-        file: CSV file with project data
+        upload: Validated CSV upload with project data
         num_simulations: Number of Monte Carlo iterations (default: 1000)
        
     Returns:
         Simulation results with risk assessment
     """
     try:
-        if not file.filename.endswith('.csv'):
-            raise HTTPException(status_code=400, detail="Only CSV files are supported")
-       
-        if num_simulations < 100 or num_simulations > 100000:
-            raise HTTPException(
-                status_code=400,
-                detail="num_simulations must be between 100 and 100,000"
-            )
-       
-        # Save and process file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
+        cache_key = ResponseCache.make_key(
+            "simulate", upload.digest, num_simulations=num_simulations
+        )
+        cached = cached_json_response(cache_key)
+        if cached is not None:
+            return cached
        
-        try:
-            df = pd.read_csv(tmp_path)
-            result = simulate_project_risk(df, num_simulations)
-            result = convert_to_serializable(result)
-            return JSONResponse(content=result)
-        finally:
-            os.unlink(tmp_path)
+        df = await read_upload_csv(upload, RiskSimulator.COLUMNS)
+        result = await run_simulation(df, num_simulations)
+        return cache_json_response(cache_key, result, result.get('status'))
            
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Simulation failed: {str(e)}")
  
@@ -275,6 +594,14 @@ if __name__ == "__main__":
     print("🚀 Starting FastAPI server...")
     print("📖 API Documentation: http://localhost:8000/docs")
     print("🔗 API Root: http://localhost:8000")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # loop/http "auto" pick uvloop and httptools when installed (uvicorn[standard])
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        workers=int(os.getenv("RISKMGMT_API_WORKERS", "1"))
+    )
  
  
@@ -1,16 +1,32 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
-from typing import Optional
-import os
-import tempfile
+import plotly.io as pio
+import numpy as np
+import io
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
  
 # Load environment variables from .env file
 load_dotenv()
  
+# Figures are serialized to JSON on every rerun; orjson (when installed)
+# encodes the per-task arrays far faster than the stdlib encoder
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = 'orjson'
+except ImportError:
+    pass
+ 
+# Optional: numba compiles the scheduling kernel for very large projects
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+ 
 # Import the agent systems
 try:
     from agents_autogen import analyze_project
@@ -18,6 +34,7 @@ try:
 except ImportError:
     from agents_simple import analyze_project
     AGENT_SYSTEM = "Simple Heuristic"
+from agents_simple import read_project_csv
  
  
 # Page Configuration
@@ -29,8 +46,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
  
-# Custom CSS for better styling
-st.markdown("""
+# Custom CSS for better styling. Streamlit only re-sends elements that
+# changed between reruns, so the stylesheet is a constant emitted as-is.
+PAGE_CSS = """
     <style>
     .main-header {
         font-size: 2.5rem;
@@ -44,27 +62,140 @@ st.markdown("""
         margin-top: 2rem;
         margin-bottom: 1rem;
     }
-    .info-box {
-        background-color: #e7f3ff;
+    /* Message boxes share one rule; data-kind only sets the colors */
+    .box {
         padding: 1rem;
         border-radius: 0.5rem;
         border-left: 4px solid #1f77b4;
+        background-color: #e7f3ff;
         margin-bottom: 1rem;
     }
-    .success-box {
+    .box[data-kind="success"] {
         background-color: #d4edda;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border-left: 4px solid #28a745;
+        border-left-color: #28a745;
     }
-    .warning-box {
+    .box[data-kind="warning"] {
         background-color: #fff3cd;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border-left: 4px solid #ffc107;
+        border-left-color: #ffc107;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(PAGE_CSS, unsafe_allow_html=True)
+ 
+ 
+# Risk levels in severity order, and their chart colors
+RISK_LEVELS = ['Low', 'Med', 'High']
+RISK_COLORS = {
+    'High': '#d62728',    # Red
+    'Med': '#ff7f0e',     # Orange
+    'Low': '#2ca02c'      # Green
+}
+ 
+# Above this many tasks the Gantt chart starts as one bar per resource and risk level
+GANTT_DETAIL_LIMIT = 500
+ 
+ 
+def with_risk_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store Risk_Level as an ordered Categorical (Low < Med < High), once at load
+    time, so filters, counts and groupbys on every rerun compare small integer
+    codes instead of strings. Unexpected levels are kept after the known ones.
+    """
+    observed = df['Risk_Level'].dropna().unique().tolist()
+    categories = RISK_LEVELS + sorted(set(map(str, observed)) - set(RISK_LEVELS))
+    return df.assign(Risk_Level=pd.Categorical(df['Risk_Level'], categories=categories, ordered=True))
+ 
+ 
+def _parse_predecessors(predecessors: pd.Series) -> List[List[int]]:
+    """Split the Predecessors column ("1, 2") into lists of task IDs, once per column."""
+    if pd.api.types.is_numeric_dtype(predecessors):
+        # A column holding at most one predecessor per task is read as numbers
+        return [[int(v)] if pd.notna(v) else [] for v in predecessors.tolist()]
+   
+    # Whitespace removal and splitting run over the whole column at once
+    tokens = predecessors.fillna('').astype(str).str.replace(' ', '', regex=False).str.split(',')
+    return [[int(t) for t in row if t] for row in tokens.tolist()]
+ 
+ 
+def _schedule_kernel(durations: np.ndarray, succ_indptr: np.ndarray, succ_indices: np.ndarray,
+                     in_degree: np.ndarray) -> np.ndarray:
+    """
+    Kahn's algorithm over a successor graph in CSR form (row i's successors
+    are succ_indices[succ_indptr[i]:succ_indptr[i + 1]]). Uses only arrays
+    and scalars so it can be compiled by numba; in_degree is consumed.
+    """
+    n = durations.shape[0]
+    start = np.zeros(n, dtype=np.float64)
+    queue = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    for i in range(n):
+        if in_degree[i] == 0:
+            queue[tail] = i
+            tail += 1
+   
+    while head < tail:
+        current = queue[head]
+        head += 1
+        finish = start[current] + durations[current]
+        for k in range(succ_indptr[current], succ_indptr[current + 1]):
+            succ = succ_indices[k]
+            if finish > start[succ]:
+                start[succ] = finish
+            in_degree[succ] -= 1
+            if in_degree[succ] == 0:
+                queue[tail] = succ
+                tail += 1
+   
+    return start
+ 
+ 
+if NUMBA_AVAILABLE:
+    # Compiled to machine code on first use; cache=True keeps it across restarts
+    _schedule_kernel = numba.njit(cache=True)(_schedule_kernel)
+ 
+ 
+def _build_schedule(task_ids: np.ndarray, durations: np.ndarray, preds_list: List[List[int]]) -> np.ndarray:
+    """
+    Earliest start offset (in days) of every task.
+    Tasks are visited in topological order (Kahn's algorithm), so each start
+    is the latest finish among its predecessors. Unknown predecessor IDs are
+    ignored; tasks caught in a dependency cycle keep the latest finish of
+    the predecessors that could be resolved.
+   
+    Args:
+        task_ids: Task IDs in row order
+        durations: Task durations in days, aligned with task_ids
+        preds_list: Predecessor task IDs for each row
+       
+    Returns:
+        Array of start offsets in days, aligned with task_ids
+    """
+    num_tasks = len(task_ids)
+   
+    # Row position of every task ID (the last row wins for duplicated IDs)
+    positions = pd.Series(np.arange(num_tasks), index=task_ids)
+    positions = positions[~positions.index.duplicated(keep='last')]
+   
+    # Edge list (predecessor row -> task row), resolved in one vectorized lookup
+    counts = np.fromiter((len(preds) for preds in preds_list), dtype=np.int64, count=num_tasks)
+    task_rows = np.repeat(np.arange(num_tasks), counts)
+    pred_ids = np.fromiter((pred for preds in preds_list for pred in preds), dtype=np.int64,
+                           count=int(counts.sum()))
+    pred_rows = positions.index.get_indexer(pred_ids)
+    known = pred_rows >= 0
+    pred_rows = positions.to_numpy()[pred_rows[known]]
+    task_rows = task_rows[known]
+   
+    # Successor lists in CSR form: edges grouped by predecessor row
+    order = np.argsort(pred_rows, kind='stable')
+    succ_indices = task_rows[order]
+    succ_indptr = np.zeros(num_tasks + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pred_rows, minlength=num_tasks), out=succ_indptr[1:])
+    in_degree = np.bincount(task_rows, minlength=num_tasks).astype(np.int64)
+   
+    return _schedule_kernel(np.ascontiguousarray(durations, dtype=np.float64), succ_indptr,
+                            succ_indices, in_degree)
  
  
 def calculate_gantt_dates(df: pd.DataFrame) -> pd.DataFrame:
@@ -82,42 +213,42 @@ def calculate_gantt_dates(df: pd.DataFrame) -> pd.DataFrame:
     # Create a copy to avoid modifying original
     gantt_df = df.copy()
    
-    # Initialize start dates dictionary
-    task_dates = {}
-   
     # Base start date (today)
     project_start = datetime.now()
    
-    for idx, row in gantt_df.iterrows():
-        task_id = row['Task_ID']
-        duration = row['Duration_Days']
-        predecessors = row['Predecessors']
-       
-        # Calculate start date based on predecessors
-        if pd.isna(predecessors) or predecessors == '':
-            start_date = project_start
-        else:
-            # Get predecessor task IDs
-            pred_ids = [int(p.strip()) for p in str(predecessors).split(',')]
-            # Start after all predecessors finish
-            pred_finish_dates = [task_dates.get(pid, {}).get('finish', project_start)
-                                for pid in pred_ids if pid in task_dates]
-            start_date = max(pred_finish_dates) if pred_finish_dates else project_start
-       
-        finish_date = start_date + timedelta(days=duration)
-       
-        task_dates[task_id] = {
-            'start': start_date,
-            'finish': finish_date
-        }
+    durations = gantt_df['Duration_Days'].to_numpy(dtype=np.float64)
+    start_offsets = _build_schedule(
+        gantt_df['Task_ID'].to_numpy(),
+        durations,
+        _parse_predecessors(gantt_df['Predecessors'])
+    )
    
-    # Add dates to dataframe
-    gantt_df['Start'] = gantt_df['Task_ID'].map(lambda x: task_dates[x]['start'])
-    gantt_df['Finish'] = gantt_df['Task_ID'].map(lambda x: task_dates[x]['finish'])
+    # Add dates to dataframe (one vectorized conversion per column)
+    gantt_df['Start'] = project_start + pd.to_timedelta(start_offsets, unit='D')
+    gantt_df['Finish'] = project_start + pd.to_timedelta(start_offsets + durations, unit='D')
    
     return gantt_df
  
  
+@st.cache_data
+def load_csv(file_bytes: bytes) -> pd.DataFrame:
+    """
+    Parse an uploaded CSV, cached by file content.
+    Streamlit reruns the whole script on every widget interaction; caching
+    here (and on the chart builders below) means only changed data is
+    re-parsed and re-plotted. Parsing uses the known project column dtypes
+    (and pyarrow when installed) instead of per-column type inference.
+   
+    Args:
+        file_bytes: Raw bytes of the uploaded CSV
+       
+    Returns:
+        DataFrame with project data
+    """
+    return with_risk_categories(read_project_csv(io.BytesIO(file_bytes)))
+ 
+ 
+@st.cache_data
 def create_gantt_chart(df: pd.DataFrame) -> go.Figure:
     """
     Create an interactive Gantt chart using Plotly.
@@ -130,59 +261,83 @@ def create_gantt_chart(df: pd.DataFrame) -> go.Figure:
     Returns:
         Plotly figure object
     """
-    # Calculate dates
-    gantt_df = calculate_gantt_dates(df)
-   
-    # Color mapping for risk levels
-    risk_colors = {
-        'High': '#d62728',    # Red
-        'Med': '#ff7f0e',     # Orange
-        'Low': '#2ca02c'      # Green
-    }
-   
-    gantt_df['Color'] = gantt_df['Risk_Level'].map(risk_colors)
-   
-    # Create Gantt chart using px.timeline
-    fig = px.timeline(
-        gantt_df,
-        x_start='Start',
-        x_end='Finish',
-        y='Task_Name',
-        color='Risk_Level',
-        color_discrete_map=risk_colors,
-        hover_data={
-            'Task_ID': True,
-            'Resource_Name': True,
-            'Duration_Days': True,
-            'Cost_Per_Day': True,
-            'Predecessors': True,
-            'Start': '|%Y-%m-%d',
-            'Finish': '|%Y-%m-%d'
-        },
-        title='Project Schedule - Interactive Gantt Chart'
+    # Calculate dates, then order tasks by start once here rather than on the Plotly side
+    gantt_df = calculate_gantt_dates(df).sort_values('Start', kind='stable')
+   
+    # Horizontal bars: base = start date, length = duration in milliseconds
+    # (what a date axis expects); hover fields are packed once into customdata
+    durations_ms = (gantt_df['Finish'] - gantt_df['Start']).dt.total_seconds().to_numpy() * 1000
+    customdata = np.column_stack([
+        gantt_df['Task_ID'].to_numpy(),
+        gantt_df['Resource_Name'].astype(str).to_numpy(),
+        gantt_df['Duration_Days'].to_numpy(),
+        gantt_df['Cost_Per_Day'].to_numpy(),
+        gantt_df['Predecessors'].fillna('').astype(str).to_numpy(),
+        gantt_df['Start'].dt.strftime('%Y-%m-%d').to_numpy(),
+        gantt_df['Finish'].dt.strftime('%Y-%m-%d').to_numpy()
+    ])
+    hovertemplate = (
+        '<b>%{y}</b><br>'
+        'Task_ID=%{customdata[0]}<br>'
+        'Resource_Name=%{customdata[1]}<br>'
+        'Duration_Days=%{customdata[2]}<br>'
+        'Cost_Per_Day=%{customdata[3]}<br>'
+        'Predecessors=%{customdata[4]}<br>'
+        'Start=%{customdata[5]}<br>'
+        'Finish=%{customdata[6]}'
+        '<extra>%{fullData.name}</extra>'
     )
    
+    # One bar trace per risk level instead of px.timeline's per-figure data processing;
+    # traces are selected by the Categorical's integer codes, in severity order
+    fig = go.Figure()
+    risk = gantt_df['Risk_Level'].astype('category')
+    codes = risk.cat.codes.to_numpy()
+    for code, level in enumerate(risk.cat.categories.astype(str)):
+        mask = codes == code
+        if not mask.any():
+            continue
+        fig.add_trace(go.Bar(
+            name=level,
+            orientation='h',
+            y=gantt_df['Task_Name'].to_numpy()[mask],
+            base=gantt_df['Start'].to_numpy()[mask],
+            x=durations_ms[mask],
+            marker_color=RISK_COLORS.get(level, '#7f7f7f'),
+            customdata=customdata[mask],
+            hovertemplate=hovertemplate
+        ))
+   
+    fig.update_xaxes(type='date')
+   
     # Update layout
     fig.update_layout(
+        title='Project Schedule - Interactive Gantt Chart',
+        barmode='overlay',
         height=600,
         xaxis_title='Timeline',
         yaxis_title='Tasks',
         showlegend=True,
         legend_title_text='Risk Level',
-        hovermode='closest'
+        hovermode='closest',
+        # Keep the user's zoom/pan across reruns instead of resetting the view
+        uirevision='gantt'
     )
    
-    # Update y-axis to show tasks in order
-    fig.update_yaxes(categoryorder='total ascending')
+    # Show tasks in start order, earliest at the top
+    fig.update_yaxes(categoryorder='array', categoryarray=gantt_df['Task_Name'].to_numpy(),
+                     autorange='reversed')
    
     return fig
  
  
-def create_resource_chart(df: pd.DataFrame) -> go.Figure:
+@st.cache_data
+def create_gantt_rollup_chart(df: pd.DataFrame) -> go.Figure:
     """
-    Create resource utilization bar chart.
-   
-    # Aligns with AI4SE Phase 19: Resource Metrics Visualization
+    Create a coarse Gantt chart with one bar per (resource, risk level),
+    spanning that group's earliest start to latest finish. Keeps large
+    projects responsive: the browser draws a few dozen bars instead of
+    one per task.
    
     Args:
         df: DataFrame with project data
@@ -190,15 +345,111 @@ def create_resource_chart(df: pd.DataFrame) -> go.Figure:
     Returns:
         Plotly figure object
     """
-    resource_stats = df.groupby('Resource_Name').agg({
-        'Task_ID': 'count',
-        'Duration_Days': 'sum',
-        'Cost_Per_Day': 'first'
-    }).reset_index()
+    gantt_df = calculate_gantt_dates(df)
+    rollup = gantt_df.groupby(['Resource_Name', 'Risk_Level'], sort=False, observed=True).agg(
+        Start=('Start', 'min'),
+        Finish=('Finish', 'max'),
+        Tasks=('Task_ID', 'size'),
+        Task_Days=('Duration_Days', 'sum')
+    ).reset_index().sort_values('Start', kind='stable')
+   
+    durations_ms = (rollup['Finish'] - rollup['Start']).dt.total_seconds().to_numpy() * 1000
+    customdata = np.column_stack([
+        rollup['Tasks'].to_numpy(),
+        rollup['Task_Days'].to_numpy(),
+        rollup['Start'].dt.strftime('%Y-%m-%d').to_numpy(),
+        rollup['Finish'].dt.strftime('%Y-%m-%d').to_numpy()
+    ])
+    hovertemplate = (
+        '<b>%{y}</b><br>'
+        'Tasks=%{customdata[0]}<br>'
+        'Task_Days=%{customdata[1]}<br>'
+        'Start=%{customdata[2]}<br>'
+        'Finish=%{customdata[3]}'
+        '<extra>%{fullData.name}</extra>'
+    )
    
-    resource_stats.columns = ['Resource', 'Task_Count', 'Total_Days', 'Cost_Per_Day']
-    resource_stats['Total_Cost'] = resource_stats['Total_Days'] * resource_stats['Cost_Per_Day']
+    fig = go.Figure()
+    resources = rollup['Resource_Name'].astype(str).to_numpy()
+    risk = rollup['Risk_Level'].astype('category')
+    codes = risk.cat.codes.to_numpy()
+    for code, level in enumerate(risk.cat.categories.astype(str)):
+        mask = codes == code
+        if not mask.any():
+            continue
+        fig.add_trace(go.Bar(
+            name=level,
+            orientation='h',
+            y=resources[mask],
+            base=rollup['Start'].to_numpy()[mask],
+            x=durations_ms[mask],
+            marker_color=RISK_COLORS.get(level, '#7f7f7f'),
+            opacity=0.7,
+            customdata=customdata[mask],
+            hovertemplate=hovertemplate
+        ))
+   
+    fig.update_xaxes(type='date')
+    fig.update_layout(
+        title='Project Schedule - Summary by Resource',
+        barmode='overlay',
+        height=600,
+        xaxis_title='Timeline',
+        yaxis_title='Resources',
+        showlegend=True,
+        legend_title_text='Risk Level',
+        hovermode='closest',
+        uirevision='gantt-rollup'
+    )
+    fig.update_yaxes(categoryorder='array', categoryarray=pd.unique(resources), autorange='reversed')
    
+    return fig
+ 
+ 
+@st.cache_data
+def _resource_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate the project per resource once for both the chart and the table.
+   
+    Args:
+        df: DataFrame with project data
+       
+    Returns:
+        DataFrame with Resource, Task_Count, Total_Days, Cost_Per_Day, Total_Cost
+    """
+    grouped = df.groupby('Resource_Name', sort=False, observed=True).agg(
+        Task_Count=('Task_ID', 'size'),
+        Total_Days=('Duration_Days', 'sum')
+    )
+   
+    # Daily cost is constant per resource: look it up instead of aggregating it
+    cost_map = df.drop_duplicates('Resource_Name', keep='first').set_index('Resource_Name')['Cost_Per_Day']
+    total_days = grouped['Total_Days'].to_numpy()
+    cost_per_day = cost_map.reindex(grouped.index).to_numpy()
+   
+    # Build the result once with its final column names (no insert/reset_index/rename copies)
+    return pd.DataFrame({
+        'Resource': grouped.index.to_numpy(),
+        'Task_Count': grouped['Task_Count'].to_numpy(),
+        'Total_Days': total_days,
+        'Cost_Per_Day': cost_per_day,
+        'Total_Cost': total_days * cost_per_day
+    })
+ 
+ 
+@st.cache_data
+def create_resource_chart(resource_stats: pd.DataFrame) -> go.Figure:
+    """
+    Create resource utilization bar chart.
+   
+    # Aligns with AI4SE Phase 19: Resource Metrics Visualization
+   
+    Args:
+        resource_stats: Per-resource aggregates from _resource_stats
+       
+    Returns:
+        Plotly figure object
+    """
     fig = go.Figure()
    
     fig.add_trace(go.Bar(
@@ -232,6 +483,7 @@ def create_resource_chart(df: pd.DataFrame) -> go.Figure:
     return fig
  
  
+@st.cache_data
 def create_risk_distribution_chart(df: pd.DataFrame) -> go.Figure:
     """
     Create risk level distribution pie chart.
@@ -244,14 +496,15 @@ def create_risk_distribution_chart(df: pd.DataFrame) -> go.Figure:
     Returns:
         Plotly figure object
     """
-    risk_counts = df['Risk_Level'].value_counts()
-   
-    colors = ['#d62728', '#ff7f0e', '#2ca02c']  # Red, Orange, Green
+    # Category order (Low, Med, High) rather than frequency order
+    risk_counts = df['Risk_Level'].value_counts(sort=False)
+    risk_counts = risk_counts[risk_counts > 0]
    
     fig = go.Figure(data=[go.Pie(
-        labels=risk_counts.index,
+        labels=risk_counts.index.astype(str),
         values=risk_counts.values,
-        marker_colors=colors,
+        marker_colors=[RISK_COLORS.get(str(level), '#7f7f7f') for level in risk_counts.index],
+        sort=False,
         hole=0.3
     )])
    
@@ -263,7 +516,45 @@ def create_risk_distribution_chart(df: pd.DataFrame) -> go.Figure:
     return fig
  
  
-def display_project_metrics(df: pd.DataFrame):
+# Section headings of the agent report; EXECUTIVE RECOMMENDATIONS is listed
+# before RECOMMENDATIONS so the longer heading wins at the same position
+_SECTION_RE = re.compile(r'EXECUTIVE RECOMMENDATIONS|RISK ANALYSIS|RESOURCE OPTIMIZATION|RECOMMENDATIONS')
+ 
+ 
+@st.cache_data
+def split_report_sections(analysis_text: str) -> Dict[str, str]:
+    """
+    Split the agent report into its risk, resource and recommendations sections
+    in a single regex pass.
+   
+    Args:
+        analysis_text: Full analysis report
+       
+    Returns:
+        Dictionary with 'risk', 'resource' and 'recommendations' text ('' if absent)
+    """
+    matches = list(_SECTION_RE.finditer(analysis_text))
+    bounds = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(analysis_text)
+        bounds.setdefault(match.group(), (match.start(), end))
+   
+    def section(name: str, to_end: bool = False) -> str:
+        if name not in bounds:
+            return ''
+        start, end = bounds[name]
+        return analysis_text[start:len(analysis_text) if to_end else end]
+   
+    # Recommendations close the report, so they run to the end of the text
+    recommendations = section('EXECUTIVE RECOMMENDATIONS', to_end=True) or section('RECOMMENDATIONS', to_end=True)
+    return {
+        'risk': section('RISK ANALYSIS'),
+        'resource': section('RESOURCE OPTIMIZATION'),
+        'recommendations': recommendations
+    }
+ 
+ 
+def display_project_metrics(df: pd.DataFrame, high_mask: Optional[np.ndarray] = None):
     """
     Display key project metrics in columns.
    
@@ -271,6 +562,7 @@ def display_project_metrics(df: pd.DataFrame):
    
     Args:
         df: DataFrame with project data
+        high_mask: Boolean array marking High risk tasks (computed if omitted)
     """
     col1, col2, col3, col4 = st.columns(4)
    
@@ -288,14 +580,19 @@ def display_project_metrics(df: pd.DataFrame):
         )
    
     with col3:
-        total_cost = (df['Duration_Days'] * df['Cost_Per_Day']).sum()
+        # Dot product: multiply and sum in one BLAS pass, without a temporary Series
+        total_cost = float(np.dot(df['Duration_Days'].to_numpy(dtype=np.float64),
+                                  df['Cost_Per_Day'].to_numpy(dtype=np.float64)))
         st.metric(
             label="💰 Total Cost",
             value=f"${total_cost:,.2f}"
         )
    
     with col4:
-        high_risk_count = len(df[df['Risk_Level'] == 'High'])
+        if high_mask is None:
+            high_mask = (df['Risk_Level'] == 'High').to_numpy()
+        # Count the mask directly instead of materializing the filtered rows
+        high_risk_count = int(high_mask.sum())
         st.metric(
             label="⚠️ High Risk Tasks",
             value=high_risk_count,
@@ -317,7 +614,7 @@ def main():
     # Sidebar
     st.sidebar.title("📁 Data Upload")
     st.sidebar.markdown("""
-    <div class="info-box">
+    <div class="box" data-kind="info">
     <b>Expected CSV Format:</b><br>
     • Task_ID<br>
     • Task_Name<br>
@@ -341,12 +638,19 @@ def main():
         st.session_state.analysis_results = None
     if 'df' not in st.session_state:
         st.session_state.df = None
+        # Identifies the loaded dataset, so per-dataset results survive reruns
+        st.session_state.df_key = None
    
     # Load data
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
-            st.session_state.df = df
+            # Re-parse only when a different file is uploaded; other reruns
+            # reuse the frame without hashing its bytes again
+            upload_key = (uploaded_file.name, uploaded_file.size, getattr(uploaded_file, 'file_id', None))
+            if st.session_state.df_key != upload_key:
+                st.session_state.df = load_csv(uploaded_file.getvalue())
+                st.session_state.df_key = upload_key
+            df = st.session_state.df
            
             st.sidebar.success("✅ File uploaded successfully!")
            
@@ -361,10 +665,12 @@ def main():
     # Main content area
     if st.session_state.df is not None:
         df = st.session_state.df
+        # High risk rows, found once per rerun for the metrics and the risk tab
+        high_mask = (df['Risk_Level'] == 'High').to_numpy()
        
         # Display project metrics
         st.markdown("## 📊 Project Overview")
-        display_project_metrics(df)
+        display_project_metrics(df, high_mask)
        
         st.markdown("---")
        
@@ -379,28 +685,45 @@ def main():
         with tab1:
             st.markdown("### Interactive Project Timeline")
             st.markdown("""
-            <div class="info-box">
+            <div class="box" data-kind="info">
             <b>Features:</b> Hover over tasks for details. Color-coded by risk level.
             </div>
             """, unsafe_allow_html=True)
            
-            gantt_fig = create_gantt_chart(df)
-            st.plotly_chart(gantt_fig, use_container_width=True)
+            # Large projects start at resource granularity; per-task bars on request
+            detail = 'Task'
+            if len(df) > GANTT_DETAIL_LIMIT:
+                detail = st.select_slider(
+                    "Detail level",
+                    options=['Resource', 'Task'],
+                    value='Resource',
+                    help=f"Projects with more than {GANTT_DETAIL_LIMIT} tasks are summarized per resource and risk level"
+                )
+            # The figure is kept per (dataset, detail level): widget-only reruns skip
+            # both the figure build and st.cache_data's hashing of the whole frame
+            gantt_key = (st.session_state.df_key, detail)
+            if st.session_state.get('gantt_key') != gantt_key:
+                st.session_state.gantt_fig = (create_gantt_chart(df) if detail == 'Task'
+                                              else create_gantt_rollup_chart(df))
+                st.session_state.gantt_key = gantt_key
+            gantt_fig = st.session_state.gantt_fig
+            # theme=None: skip Streamlit's theming pass over the per-task traces
+            st.plotly_chart(gantt_fig, use_container_width=True, theme=None)
        
         with tab2:
             st.markdown("### Resource Workload Analysis")
-            resource_fig = create_resource_chart(df)
+            resource_stats = _resource_stats(df)
+            resource_fig = create_resource_chart(resource_stats)
             st.plotly_chart(resource_fig, use_container_width=True)
            
             # Resource details table
             st.markdown("#### 📋 Detailed Resource Breakdown")
-            resource_detail = df.groupby('Resource_Name').agg({
-                'Task_ID': 'count',
-                'Duration_Days': 'sum',
-                'Cost_Per_Day': 'first'
-            }).reset_index()
-            resource_detail.columns = ['Resource', 'Tasks', 'Total Days', 'Cost/Day']
-            resource_detail['Total Cost'] = resource_detail['Total Days'] * resource_detail['Cost/Day']
+            resource_detail = resource_stats.rename(columns={
+                'Task_Count': 'Tasks',
+                'Total_Days': 'Total Days',
+                'Cost_Per_Day': 'Cost/Day',
+                'Total_Cost': 'Total Cost'
+            })
             st.dataframe(resource_detail, use_container_width=True)
        
         with tab3:
@@ -409,19 +732,18 @@ def main():
             st.plotly_chart(risk_fig, use_container_width=True)
            
             # High risk tasks table
-            high_risk_tasks = df[df['Risk_Level'] == 'High']
-            if len(high_risk_tasks) > 0:
+            if high_mask.any():
+                high_risk_tasks = df.loc[high_mask, ['Task_ID', 'Task_Name', 'Duration_Days',
+                                                     'Resource_Name', 'Predecessors']]
                 st.markdown("#### ⚠️ High Risk Tasks Requiring Attention")
-                st.dataframe(high_risk_tasks[['Task_ID', 'Task_Name', 'Duration_Days',
-                                               'Resource_Name', 'Predecessors']],
-                           use_container_width=True)
+                st.dataframe(high_risk_tasks, use_container_width=True)
             else:
                 st.success("✅ No high-risk tasks identified!")
        
         with tab4:
             st.markdown("### 🤖 AI Multi-Agent Analysis")
             st.markdown("""
-            <div class="info-box">
+            <div class="box" data-kind="info">
             <b>AI Agents:</b><br>
             • <b>Risk Agent:</b> Analyzes dependencies, identifies bottlenecks<br>
             • <b>Resource Agent:</b> Optimizes allocation, balances workload
@@ -439,23 +761,14 @@ def main():
            
             if run_analysis:
                 with st.spinner("🔄 AI Agents are analyzing your project... This may take a moment."):
-                    # Save uploaded file temporarily
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_file:
-                        df.to_csv(tmp_file.name, index=False)
-                        tmp_path = tmp_file.name
-                   
                     try:
-                        # Run CrewAI analysis
+                        # Hand the loaded DataFrame straight to the agents (no temp CSV round-trip)
                         # Aligns with AI4SE Phase 22: Agent Execution & Result Collection
-                        results = analyze_project(tmp_path)
+                        results = analyze_project(df)
                         st.session_state.analysis_results = results
                        
-                        # Clean up temp file
-                        os.unlink(tmp_path)
-                       
                     except Exception as e:
                         st.error(f"❌ Analysis failed: {str(e)}")
-                        os.unlink(tmp_path)
            
             # Display results
             if st.session_state.analysis_results is not None:
@@ -463,7 +776,7 @@ def main():
                
                 if results['status'] == 'success':
                     st.markdown("""
-                    <div class="success-box">
+                    <div class="box" data-kind="success">
                     ✅ <b>Analysis Complete!</b> AI agents have finished analyzing your project.
                     </div>
                     """, unsafe_allow_html=True)
@@ -485,6 +798,7 @@ def main():
                    
                     # Parse and display the analysis report in a structured way
                     analysis_text = results['analysis_results']
+                    sections = split_report_sections(analysis_text)
                    
                     # Create tabs for different sections
                     analysis_tabs = st.tabs(["📊 Overview", "🔴 Risk Analysis", "👥 Resource Optimization", "💡 Recommendations"])
@@ -530,16 +844,7 @@ def main():
                     with analysis_tabs[1]:
                         st.markdown("### 🔴 Risk Analysis")
                        
-                        # Extract risk analysis section
-                        risk_section = ""
-                        if "RISK ANALYSIS" in analysis_text:
-                            risk_start = analysis_text.find("RISK ANALYSIS")
-                            risk_end = analysis_text.find("RESOURCE OPTIMIZATION")
-                            if risk_end == -1:
-                                risk_end = analysis_text.find("EXECUTIVE RECOMMENDATIONS")
-                            if risk_end == -1:
-                                risk_end = len(analysis_text)
-                            risk_section = analysis_text[risk_start:risk_end]
+                        risk_section = sections['risk']
                        
                         if risk_section:
                             # Display in formatted container
@@ -555,17 +860,7 @@ def main():
                     with analysis_tabs[2]:
                         st.markdown("### 👥 Resource Optimization")
                        
-                        # Extract resource optimization section
-                        resource_section = ""
-                        if "RESOURCE OPTIMIZATION" in analysis_text:
-                            resource_start = analysis_text.find("RESOURCE OPTIMIZATION")
-                            resource_end = analysis_text.find("EXECUTIVE RECOMMENDATIONS")
-                            if resource_end == -1:
-                                resource_end = analysis_text.find("═══════════════",
-                                                                 analysis_text.find("RESOURCE OPTIMIZATION") + 100)
-                            if resource_end == -1:
-                                resource_end = len(analysis_text)
-                            resource_section = analysis_text[resource_start:resource_end]
+                        resource_section = sections['resource']
                        
                         if resource_section:
                             # Display in formatted container
@@ -581,15 +876,7 @@ def main():
                     with analysis_tabs[3]:
                         st.markdown("### 💡 Executive Recommendations")
                        
-                        # Extract recommendations section
-                        recommendations_section = ""
-                        if "EXECUTIVE RECOMMENDATIONS" in analysis_text or "RECOMMENDATIONS" in analysis_text:
-                            rec_start = analysis_text.find("EXECUTIVE RECOMMENDATIONS")
-                            if rec_start == -1:
-                                rec_start = analysis_text.find("RECOMMENDATIONS")
-                           
-                            if rec_start != -1:
-                                recommendations_section = analysis_text[rec_start:]
+                        recommendations_section = sections['recommendations']
                        
                         if recommendations_section:
                             # Display in formatted container
@@ -607,7 +894,7 @@ def main():
     else:
         # Welcome screen when no file is uploaded
         st.markdown("""
-        <div class="info-box">
+        <div class="box" data-kind="info">
         <h3>👋 Welcome to the AI Project Risk & Resource Manager!</h3>
         <p>This intelligent system uses <b>Multi-Agent AI</b> powered by CrewAI to:</p>
         <ul>
@@ -624,8 +911,9 @@ def main():
         st.markdown("### 🧪 Try with Sample Data")
         if st.button("📂 Load Sample Project Data", type="secondary"):
             try:
-                sample_df = pd.read_csv("dummy_data.csv")
+                sample_df = with_risk_categories(read_project_csv("dummy_data.csv"))
                 st.session_state.df = sample_df
+                st.session_state.df_key = ('sample', datetime.now().timestamp())
                 st.rerun()
             except FileNotFoundError:
                 st.warning("⚠️ Sample data file not found. Please upload your own CSV file.")
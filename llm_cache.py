@@ -0,0 +1,110 @@
+"""
+LLM Response Cache
+AI-Powered Project Risk & Resource Management
+
+Exact-match cache for agent replies so repeated analyses of the same
+project skip the LLM round-trip entirely.
+
+# Aligns with AI4SE Phase 9: Multi-Agent Architecture
+# Aligns with AI4SE Phase 14: Performance & Scalability
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class LLMResponseCache:
+    """
+    Thread-safe LRU cache for LLM responses.
+    Keys are SHA256 digests of (model, agent name, system message, prompt).
+    When a cache directory is given, entries are also persisted with
+    diskcache so CLI reruns on the same CSV return immediately.
+    """
+
+    def __init__(self, max_size: int = 256, cache_dir: Optional[str] = None):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+
+        if cache_dir:
+            try:
+                import diskcache
+                self._disk = diskcache.Cache(cache_dir)
+            except Exception as e:
+                print(f"⚠️ Disk cache unavailable, using memory only: {e}")
+
+    @staticmethod
+    def make_key(model: str, agent_name: str, system_message: str, prompt: str) -> str:
+        """Build a stable cache key for one agent call."""
+        payload = "\x1f".join(str(part) for part in (model, agent_name, system_message, prompt))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        if self._disk is not None:
+            value = self._disk.get(key)
+            if value is not None:
+                self._store(key, value)
+                return value
+        return None
+
+    def set(self, key: str, value: Optional[str]) -> None:
+        """Cache a response. Empty responses are never cached."""
+        if not value:
+            return
+        self._store(key, value)
+        if self._disk is not None:
+            self._disk.set(key, value)
+
+    def clear(self) -> None:
+        """Drop all cached responses (memory and disk)."""
+        with self._lock:
+            self._entries.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    @property
+    def persistent(self) -> bool:
+        """True when entries are also read from and written to disk."""
+        return self._disk is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache:
+    """
+    Return the process-wide response cache.
+    Set RISKMGMT_CACHE_DIR to persist responses across runs.
+    """
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = LLMResponseCache(
+                max_size=int(os.getenv("RISKMGMT_LLM_CACHE_SIZE", "256")),
+                cache_dir=os.getenv("RISKMGMT_CACHE_DIR") or None,
+            )
+        return _response_cache
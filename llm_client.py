@@ -1,11 +1,38 @@
 import os
-from typing import Optional
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional
 from dotenv import load_dotenv
-from openai import OpenAI
+from llm_cache import LLMResponseCache, get_response_cache
  
 # Load environment variables from .env file
 load_dotenv()
  
+# The OpenAI SDK takes ~0.3 s to import; it is loaded on first client creation
+OpenAI = None
+AsyncOpenAI = None
+ 
+HF_BASE_URL = "https://router.huggingface.co/v1"
+ 
+ 
+def _openai_class():
+    """Return the OpenAI client class, importing the SDK on first use."""
+    global OpenAI
+    if OpenAI is None:
+        from openai import OpenAI as openai_class
+        OpenAI = openai_class
+    return OpenAI
+ 
+ 
+def _async_openai_class():
+    """Return the AsyncOpenAI client class, importing the SDK on first use."""
+    global AsyncOpenAI
+    if AsyncOpenAI is None:
+        from openai import AsyncOpenAI as async_openai_class
+        AsyncOpenAI = async_openai_class
+    return AsyncOpenAI
+ 
  
 class LLMClient:
     """
@@ -13,31 +40,49 @@ class LLMClient:
     - Uses env var HF_API_TOKEN.
     - Defaults to a free instruct model if none provided.
     - Returns None on failure so callers can gracefully fall back.
+    - Deterministic (temperature 0) completions are served from the shared
+      response cache when the same request is repeated.
     """
  
-    def __init__(self, model: Optional[str] = None, timeout: int = 60):
+    def __init__(self, model: Optional[str] = None, timeout: int = 60,
+                 cache: Optional[LLMResponseCache] = None):
         self.api_token = os.getenv("HF_API_TOKEN")
         # Use provided model, or HF_MODEL env var, or default to a free model
         self.model = model or os.getenv("HF_MODEL") or "meta-llama/Meta-Llama-3-8B-Instruct"
         self.timeout = timeout
+        self.cache = cache if cache is not None else get_response_cache()
        
         # Create OpenAI client pointing to HuggingFace
         if self.api_token:
-            self.client = OpenAI(
-                base_url="https://router.huggingface.co/v1",
+            self.client = _openai_class()(
+                base_url=HF_BASE_URL,
                 api_key=self.api_token,
                 timeout=self.timeout
             )
         else:
             self.client = None
+        # Async client for agenerate, created on first use
+        self.aclient = None
  
     def available(self) -> bool:
         return bool(self.api_token)
  
+    def _cache_key(self, prompt: str, max_tokens: int, temperature: float) -> Optional[str]:
+        """Cache key for a request, or None when sampling makes replies non-deterministic."""
+        if temperature != 0:
+            return None
+        return LLMResponseCache.make_key(self.model, "LLMClient", f"max_tokens={max_tokens}", prompt)
+ 
     def generate(self, prompt: str, max_tokens: int = 512, temperature: float = 0.7) -> Optional[str]:
         if not self.available():
             return None
  
+        key = self._cache_key(prompt, max_tokens, temperature)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+ 
         try:
             completion = self.client.chat.completions.create(
                 model=self.model,
@@ -50,8 +95,115 @@ class LLMClient:
                 max_tokens=max_tokens,
                 temperature=temperature
             )
-            return completion.choices[0].message.content
+            content = completion.choices[0].message.content
         except Exception:
             return None
  
+        if key is not None:
+            self.cache.set(key, content)
+        return content
+ 
+    def _new_async_client(self):
+        return _async_openai_class()(
+            base_url=HF_BASE_URL,
+            api_key=self.api_token,
+            timeout=self.timeout
+        )
+ 
+    async def _acomplete(self, aclient, prompt: str, max_tokens: int, temperature: float) -> Optional[str]:
+        key = self._cache_key(prompt, max_tokens, temperature)
+        if key is not None:
+            # Disk-backed lookups are file I/O: keep them off the event loop
+            if self.cache.persistent:
+                cached = await asyncio.to_thread(self.cache.get, key)
+            else:
+                cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+ 
+        try:
+            completion = await aclient.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            content = completion.choices[0].message.content
+        except Exception:
+            return None
+ 
+        if key is not None:
+            if self.cache.persistent:
+                await asyncio.to_thread(self.cache.set, key, content)
+            else:
+                self.cache.set(key, content)
+        return content
+ 
+    async def agenerate(self, prompt: str, max_tokens: int = 512, temperature: float = 0.7) -> Optional[str]:
+        """
+        Async version of generate, for callers that already run an event loop.
+        The async client is kept on the instance, so use it from one loop.
+        """
+        if not self.available():
+            return None
+        if self.aclient is None:
+            self.aclient = self._new_async_client()
+        return await self._acomplete(self.aclient, prompt, max_tokens, temperature)
+ 
+    async def _agenerate_many(self, prompts: List[str], max_tokens: int,
+                              temperature: float) -> List[Optional[str]]:
+        # A client scoped to this event loop: its connection pool cannot
+        # outlive the loop that asyncio.run() closes afterwards
+        async with self._new_async_client() as aclient:
+            return list(await asyncio.gather(
+                *(self._acomplete(aclient, prompt, max_tokens, temperature) for prompt in prompts)
+            ))
+ 
+    def generate_many(self, prompts: List[str], max_tokens: int = 512,
+                      temperature: float = 0.7) -> List[Optional[str]]:
+        """
+        Generate completions for several prompts concurrently.
+        Requests are network-bound, so the total wait is roughly the slowest
+        request instead of the sum of all of them.
+ 
+        Args:
+            prompts: Prompts to complete
+            max_tokens: Maximum tokens per completion
+            temperature: Sampling temperature
+ 
+        Returns:
+            One completion per prompt, in order (None where a request failed)
+        """
+        if not self.available() or not prompts:
+            return [None] * len(prompts)
+ 
+        coro = self._agenerate_many(list(prompts), max_tokens, temperature)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+ 
+        # Called from inside a running event loop: asyncio.run() would fail
+        # here, so drive the requests on a worker thread.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
+ 
+ 
+def get_llm_client(model: Optional[str] = None, timeout: int = 60) -> LLMClient:
+    """
+    Return a shared LLMClient, so repeated analyses reuse one HTTP
+    connection pool (and its TLS sessions) instead of reconnecting.
+    Clients are keyed on the token and model in effect at call time.
+    """
+    return _shared_client(model or os.getenv("HF_MODEL"), timeout, os.getenv("HF_API_TOKEN"))
+ 
  
+@lru_cache(maxsize=4)
+def _shared_client(model: Optional[str], timeout: int, api_token: Optional[str]) -> LLMClient:
+    # api_token is only part of the key: LLMClient reads HF_API_TOKEN itself
+    return LLMClient(model=model, timeout=timeout)
@@ -6,11 +6,67 @@ AI-Powered Project Risk & Resource Management
 # Uses PuLP for linear programming optimization
 """
  
+import os
+import math
+import heapq
+from collections import defaultdict
+from functools import lru_cache
 import pandas as pd
-from pulp import LpProblem, LpVariable, LpMinimize, lpSum, LpStatus, value
-from typing import Dict, Any, List, Tuple
+import pulp
+from pulp import LpProblem, LpVariable, LpMinimize, LpAffineExpression, LpStatus, value, HiGHS_CMD, PULP_CBC_CMD
+from typing import Dict, Any, List, Optional, Tuple, Union
 import numpy as np
  
+# Wall-clock limit for one solve; the best solution found so far is used after it
+SOLVER_TIME_LIMIT = 30
+ 
+# Solver classes that accept warmStart; for others it would reach the solver as an unknown option
+WARM_START_SOLVERS = (PULP_CBC_CMD, HiGHS_CMD)
+ 
+MILP_ALGORITHM = 'Linear Programming with Makespan Minimization (PuLP)'
+LPT_ALGORITHM = 'Longest Processing Time list scheduling (4/3-approximation)'
+ 
+ 
+def default_solver(time_limit: int = SOLVER_TIME_LIMIT, warm_start: bool = False,
+                   threads: Optional[int] = None):
+    """
+    Pick the fastest installed MILP solver: HiGHS (in-process through
+    highspy, else the highs executable), falling back to PuLP's bundled CBC.
+   
+    Args:
+        time_limit: Maximum solve time in seconds
+        warm_start: Pass the variables' initial values to the solver as a MIP
+            start (CBC and the highs executable only; PuLP's highspy
+            interface has no MIP-start option, so it solves cold)
+        threads: CBC threads (default: every core); callers running several
+            solves at once pass their share of the cores
+       
+    Returns:
+        A PuLP solver instance
+    """
+    solver_class = _installed_solver()
+    options = {'warmStart': True} if warm_start and solver_class in WARM_START_SOLVERS else {}
+    if solver_class is PULP_CBC_CMD:
+        options['threads'] = threads or os.cpu_count()
+    return solver_class(msg=False, timeLimit=time_limit, **options)
+ 
+ 
+@lru_cache(maxsize=None)
+def _installed_solver() -> type:
+    """
+    Probe for HiGHS once per process; installed solvers do not change while
+    it runs, and the probe would otherwise repeat for every solve.
+   
+    Returns:
+        The PuLP solver class default_solver() should instantiate
+    """
+    highs_api = getattr(pulp, 'HiGHS', None)  # highspy bindings (PuLP >= 2.8)
+    if highs_api is not None and highs_api(msg=False).available():
+        return highs_api
+    if HiGHS_CMD(msg=False).available():
+        return HiGHS_CMD
+    return PULP_CBC_CMD
+ 
  
 class ResourceOptimizer:
     """
@@ -20,84 +76,222 @@ class ResourceOptimizer:
     Goal: Reduce project duration by at least 10% compared to baseline.
     """
    
-    def __init__(self, df: pd.DataFrame):
+    # From this many tasks on, the MILP is replaced by the LPT greedy heuristic
+    HEURISTIC_MIN_TASKS = 40
+    # Columns read by the model and the allocation report
+    COLUMNS = ['Task_ID', 'Task_Name', 'Duration_Days', 'Resource_Name', 'Cost_Per_Day']
+   
+    def __init__(self, df: pd.DataFrame, solver: Optional[pulp.LpSolver] = None,
+                 warm_start_from: Optional['ResourceOptimizer'] = None, threads: Optional[int] = None):
         """
         Initialize optimizer with project data.
        
         Args:
             df: DataFrame with project tasks
+            solver: PuLP solver to use (default_solver() if None); a custom
+                solver only warm-starts if it was created with warmStart=True
+            warm_start_from: Optimizer of a related scenario whose last
+                solution seeds the first solve, if tasks and resources match
+            threads: Solver threads for default_solver() (ignored with a custom solver)
         """
-        self.df = df.copy()
+        # Only the columns the model reads, instead of a deep copy of the whole frame
+        self.df = df[self.COLUMNS]
+        self.solver = solver
+        self.threads = threads
         self.tasks = df['Task_ID'].tolist()
         self.resources = df['Resource_Name'].unique().tolist()
+        self._resource_idx = {r: i for i, r in enumerate(self.resources)}
+        self.warm_start_from = warm_start_from
+        # Assignment (task, resource) -> 0/1 from the last solve, reused as a MIP start
+        self._last_assignment: Optional[Dict[Tuple[Any, Any], int]] = None
+        # (capacity, model) of the last MILP built, so re-solves skip rebuilding it
+        self._model: Optional[Tuple[int, Tuple]] = None
        
-    def optimize_allocation(self) -> Dict[str, Any]:
+    def optimize_allocation(self, report: bool = True, as_frame: bool = False) -> Dict[str, Any]:
         """
         Optimize resource allocation to minimize project completion time.
        
+        Args:
+            report: Render the text recommendations (None when False, for
+                callers that only read the numeric results)
+            as_frame: Return optimized_allocation as a DataFrame (one column
+                per field) instead of a list of record dicts
+       
         Returns:
             Dictionary with optimization results and recommendations
         """
         # Calculate baseline duration (original max workload)
         baseline_duration = self._calculate_baseline_duration()
        
+        # Resource capacity (max tasks per resource): one above an even split
+        max_tasks_per_resource = math.ceil(len(self.tasks) / len(self.resources)) + 1
+       
+        # Many tasks on few resources: greedy LPT is near-optimal and skips branch-and-bound
+        # ('heuristic', not 'success': the schedule is not proven optimal)
+        if len(self.tasks) >= self.HEURISTIC_MIN_TASKS:
+            optimized_allocation = self._lpt_solve(max_tasks_per_resource)
+            status, algorithm = 'heuristic', LPT_ALGORITHM
+        else:
+            optimized_allocation, status = self._milp_solve(max_tasks_per_resource)
+            algorithm = MILP_ALGORITHM
+            if optimized_allocation is None:
+                # Stopped (time limit) before any incumbent: schedule greedily
+                # instead of reporting an empty allocation with zero makespan
+                print("⚠️  Solver found no assignment within its time limit; using the LPT heuristic")
+                optimized_allocation = self._lpt_solve(max_tasks_per_resource)
+                status, algorithm = 'heuristic', LPT_ALGORITHM
+       
+        optimized_duration = self._calculate_optimized_duration(optimized_allocation)
+       
+        improvement = ((baseline_duration - optimized_duration) / baseline_duration) * 100
+       
+        # Records only when a caller (or the report) needs them
+        records = None if as_frame else optimized_allocation.to_dict('records')
+       
+        recommendations = None
+        if report:
+            # Tasks grouped by resource once, for the recommendations report
+            by_resource = defaultdict(list)
+            for item in records if records is not None else optimized_allocation.to_dict('records'):
+                by_resource[item['resource']].append(item)
+            recommendations = self._generate_recommendations(by_resource, improvement, baseline_duration,
+                                                             optimized_duration, algorithm=algorithm)
+       
+        return {
+            'status': status,
+            'algorithm': algorithm,
+            'baseline_duration': baseline_duration,
+            'optimized_duration': optimized_duration,
+            'improvement_percentage': improvement,  # Can be negative if worse
+            'optimized_allocation': optimized_allocation if as_frame else records,
+            'recommendations': recommendations
+        }
+   
+    def _milp_solve(self, max_tasks_per_resource: int) -> Tuple[pd.DataFrame, str]:
+        """
+        Exact assignment with a binary MILP.
+       
+        Returns:
+            Tuple of (allocation frame, 'success' if optimal else 'suboptimal');
+            the frame is None if the solver stopped without any assignment
+        """
+        prob, x, makespan, durations = self._build_model(max_tasks_per_resource)
+       
+        # Start from a previous solution of the same task/resource set, if any:
+        # the solver begins with a feasible incumbent instead of from scratch
+        start = self._warm_start_assignment()
+        if start is not None:
+            for key, var in x.items():
+                var.setInitialValue(start.get(key, 0))
+            makespan.setInitialValue(max(
+                sum(durations[t] * start.get((t, r), 0) for t in self.tasks) for r in self.resources
+            ))
+       
+        # Solve the problem (HiGHS when installed, CBC otherwise)
+        solver = (self.solver if self.solver is not None
+                  else default_solver(warm_start=start is not None, threads=self.threads))
+        prob.solve(solver)
+       
+        solution = {key: value(var) for key, var in x.items()}
+        if any(v is None for v in solution.values()):
+            return None, 'suboptimal'
+        self._last_assignment = {key: int(round(v)) for key, v in solution.items()}
+       
+        status = 'success' if LpStatus[prob.status] == 'Optimal' else 'suboptimal'
+        return self._extract_solution(x), status
+   
+    def _build_model(self, max_tasks_per_resource: int) -> Tuple[LpProblem, Dict, LpVariable, Dict]:
+        """
+        Build the allocation MILP, or return the one built for an earlier solve.
+        The data cannot change after __init__, so re-solves only rebuild the
+        model if the capacity differs.
+       
+        Returns:
+            Tuple of (problem, assignment variables by (task, resource),
+            makespan variable, durations by task)
+        """
+        if self._model is not None and self._model[0] == max_tasks_per_resource:
+            return self._model[1]
+       
         # Create optimization model
         prob = LpProblem("Resource_Allocation_Optimization", LpMinimize)
        
         # Decision variables: x[t,r] = 1 if task t is assigned to resource r
-        x = {}
-        for t in self.tasks:
-            for r in self.resources:
-                x[(t, r)] = LpVariable(f"assign_{t}_{r}", cat='Binary')
+        assign = LpVariable.dicts("assign", (self.tasks, self.resources), cat='Binary')
+        x = {(t, r): assign[t][r] for t in self.tasks for r in self.resources}
        
-        # Makespan variable: represents the project completion time (critical path)
-        makespan = LpVariable("makespan", lowBound=0)
+        # Task durations: every resource takes the same time for a task,
+        # so one coefficient per task is enough
+        durations = dict(zip(self.tasks, self.df['Duration_Days'].tolist()))
        
-        # Task durations (can vary by resource skill)
-        task_durations = {}
-        for idx, row in self.df.iterrows():
-            task_id = row['Task_ID']
-            duration = row['Duration_Days']
-            # Each resource has same duration for simplicity
-            for r in self.resources:
-                task_durations[(task_id, r)] = duration
+        # Makespan variable: represents the project completion time (critical path).
+        # No schedule beats an even split of the total work or the longest task;
+        # starting from that bound tightens the LP relaxation the solver branches on
+        lower_bound = max(sum(durations.values()) / len(self.resources), max(durations.values()))
+        if all(float(d).is_integer() for d in durations.values()):
+            lower_bound = math.ceil(lower_bound)
+        makespan = LpVariable("makespan", lowBound=lower_bound)
        
         # Objective: Minimize makespan (project completion time)
         prob += makespan, "Minimize_Project_Makespan"
        
+        # Constraints are built from (variable, coefficient) pairs with a plain
+        # number on the right: lpSum copies the expression for every term
         # Constraint 1: Each task must be assigned to exactly one resource
         for t in self.tasks:
-            prob += lpSum([x[(t, r)] for r in self.resources]) == 1, f"Task_{t}_Assignment"
+            prob += LpAffineExpression((x[(t, r)], 1) for r in self.resources) == 1, f"Task_{t}_Assignment"
        
         # Constraint 2: Makespan must be >= workload of each resource
         for r in self.resources:
-            prob += (
-                makespan >= lpSum([x[(t, r)] * task_durations[(t, r)] for t in self.tasks]),
-                f"Makespan_{r}"
-            )
+            workload = LpAffineExpression((x[(t, r)], -durations[t]) for t in self.tasks)
+            workload[makespan] = 1
+            prob += workload >= 0, f"Makespan_{r}"
        
         # Constraint 3: Resource capacity (max tasks per resource)
-        max_tasks_per_resource = len(self.tasks) // len(self.resources) + 2
         for r in self.resources:
-            prob += lpSum([x[(t, r)] for t in self.tasks]) <= max_tasks_per_resource, f"Capacity_{r}"
+            prob += LpAffineExpression((x[(t, r)], 1) for t in self.tasks) <= max_tasks_per_resource, f"Capacity_{r}"
        
-        # Solve the problem
-        prob.solve()
-       
-        # Extract results
-        optimized_allocation = self._extract_solution(x)
-        optimized_duration = self._calculate_optimized_duration(optimized_allocation)
+        model = (prob, x, makespan, durations)
+        self._model = (max_tasks_per_resource, model)
+        return model
+   
+    def _lpt_solve(self, max_tasks_per_resource: int) -> pd.DataFrame:
+        """
+        Longest Processing Time list scheduling: tasks in decreasing duration
+        order, each to the least-loaded resource that still has capacity.
+        O(n log n), and within 4/3 of the optimal makespan without the
+        capacity limit.
        
-        improvement = ((baseline_duration - optimized_duration) / baseline_duration) * 100
+        Returns:
+            Allocation frame in task order, as from the MILP
+        """
+        durations = self.df['Duration_Days'].to_numpy()
+        # Min-heap of (current workload, resource index); full resources are dropped
+        heap = [(0, i) for i in range(len(self.resources))]
+        task_counts = [0] * len(self.resources)
+        assigned_to = [0] * len(self.tasks)
+        for pos in np.argsort(-durations, kind='stable').tolist():
+            load, r = heapq.heappop(heap)
+            while task_counts[r] >= max_tasks_per_resource:
+                load, r = heapq.heappop(heap)
+            assigned_to[pos] = r
+            task_counts[r] += 1
+            heapq.heappush(heap, (load + durations[pos], r))
        
-        return {
-            'status': 'success' if LpStatus[prob.status] == 'Optimal' else 'suboptimal',
-            'baseline_duration': baseline_duration,
-            'optimized_duration': optimized_duration,
-            'improvement_percentage': improvement,  # Can be negative if worse
-            'optimized_allocation': optimized_allocation,
-            'recommendations': self._generate_recommendations(optimized_allocation, improvement)
-        }
+        assigned = [(t, self.resources[r]) for t, r in zip(self.tasks, assigned_to)]
+        # Also a valid MIP start if this optimizer later solves exactly
+        self._last_assignment = {key: 1 for key in assigned}
+        return self._allocation_frame(assigned)
+   
+    def _warm_start_assignment(self) -> Optional[Dict[Tuple[Any, Any], int]]:
+        """Last solution of this optimizer, else of warm_start_from if it models the same tasks and resources."""
+        if self._last_assignment is not None:
+            return self._last_assignment
+        source = self.warm_start_from
+        if (source is not None and source._last_assignment is not None
+                and source.tasks == self.tasks and source.resources == self.resources):
+            return source._last_assignment
+        return None
    
     def _calculate_baseline_duration(self) -> float:
         """Calculate baseline project duration from current allocation (max workload)."""
@@ -105,51 +299,56 @@ class ResourceOptimizer:
         resource_workload = self.df.groupby('Resource_Name')['Duration_Days'].sum()
         return resource_workload.max()
    
-    def _extract_solution(self, x: Dict) -> List[Dict]:
+    def _extract_solution(self, x: Dict) -> pd.DataFrame:
         """Extract task-resource assignments from optimization solution."""
-        allocation = []
-        for (t, r), var in x.items():
-            if value(var) == 1:  # Task t is assigned to resource r
-                task_data = self.df[self.df['Task_ID'] == t].iloc[0]
-                allocation.append({
-                    'task_id': t,
-                    'task_name': task_data['Task_Name'],
-                    'resource': r,
-                    'duration': task_data['Duration_Days'],
-                    'cost': task_data['Cost_Per_Day']
-                })
-        return allocation
-   
-    def _calculate_optimized_duration(self, allocation: List[Dict]) -> float:
+        return self._allocation_frame([key for key, var in x.items() if (value(var) or 0) > 0.5])
+   
+    def _allocation_frame(self, assigned: List[Tuple[Any, Any]]) -> pd.DataFrame:
+        """Allocation for assigned (task, resource) pairs, joined with the task details once."""
+        assigned_df = pd.DataFrame(assigned, columns=['task_id', 'resource'])
+        task_data = self.df.drop_duplicates('Task_ID')[['Task_ID', 'Task_Name', 'Duration_Days', 'Cost_Per_Day']]
+        task_data = task_data.rename(columns={
+            'Task_ID': 'task_id',
+            'Task_Name': 'task_name',
+            'Duration_Days': 'duration',
+            'Cost_Per_Day': 'cost'
+        })
+        allocation = assigned_df.merge(task_data, on='task_id', how='left', sort=False)
+        return allocation[['task_id', 'task_name', 'resource', 'duration', 'cost']]
+   
+    def _calculate_optimized_duration(self, allocation: Union[pd.DataFrame, List[Dict]]) -> float:
         """
         Calculate optimized project duration.
         Accounts for parallel execution by resource.
         """
-        # Group by resource
-        resource_workload = {}
-        for item in allocation:
-            r = item['resource']
-            if r not in resource_workload:
-                resource_workload[r] = 0
-            resource_workload[r] += item['duration']
+        if len(allocation) == 0:
+            return 0
+        if not isinstance(allocation, pd.DataFrame):
+            allocation = pd.DataFrame(allocation)
+       
+        # Workload per resource in one weighted bincount over resource codes
+        codes = allocation['resource'].map(self._resource_idx).to_numpy(dtype=np.intp)
+        durations = allocation['duration'].to_numpy()
+        workload = np.bincount(codes, weights=durations, minlength=len(self.resources))
+        if durations.dtype.kind in 'iu':
+            workload = workload.astype(durations.dtype)
        
         # Project duration = max resource workload (critical path)
-        return max(resource_workload.values()) if resource_workload else 0
+        return workload.max().item()
    
-    def _generate_recommendations(self, allocation: List[Dict], improvement: float) -> str:
-        """Generate actionable recommendations based on optimization."""
-       
-        # Group tasks by resource
-        resource_tasks = {}
-        for item in allocation:
-            r = item['resource']
-            if r not in resource_tasks:
-                resource_tasks[r] = []
-            resource_tasks[r].append(item)
+    def _generate_recommendations(self, resource_tasks: Dict[Any, List[Dict]], improvement: float,
+                                  baseline_duration: float, optimized_duration: float,
+                                  algorithm: str = MILP_ALGORITHM) -> str:
+        """
+        Generate actionable recommendations based on optimization.
        
-        # Calculate baseline and optimized durations for display
-        baseline_duration = self._calculate_baseline_duration()
-        optimized_duration = max(sum(t['duration'] for t in tasks) for tasks in resource_tasks.values()) if resource_tasks else 0
+        Args:
+            resource_tasks: Allocation records grouped by resource
+            improvement: Duration improvement over baseline, in percent
+            baseline_duration: Longest resource workload before optimization
+            optimized_duration: Longest resource workload after optimization
+            algorithm: Name of the method that produced the allocation
+        """
        
         recommendations = f"""
 OPTIMIZATION RECOMMENDATIONS
@@ -186,7 +385,7 @@ OPTIMIZATION RECOMMENDATIONS
   5. Implement parallel task execution where dependencies allow
  
 📊 OPTIMIZATION DETAILS:
-  - Algorithm: Linear Programming with Makespan Minimization (PuLP)
+  - Algorithm: {algorithm}
   - Objective: Minimize project critical path (longest resource workload)
   - Constraints: Task-resource assignment, capacity limits, makespan constraints
   - Status: {'✅ Optimal solution found' if improvement >= 0 else '⚠️  Suboptimal solution'}
@@ -200,18 +399,22 @@ OPTIMIZATION RECOMMENDATIONS
         return recommendations
  
  
-def optimize_resources(df: pd.DataFrame) -> Dict[str, Any]:
+def optimize_resources(df: pd.DataFrame, report: bool = True, as_frame: bool = False,
+                       threads: Optional[int] = None) -> Dict[str, Any]:
     """
     Convenience function to run resource optimization.
    
     Args:
         df: DataFrame with project data
+        report: Render the text recommendations
+        as_frame: Return optimized_allocation as a DataFrame
+        threads: Solver threads (default: every core)
        
     Returns:
         Optimization results
     """
-    optimizer = ResourceOptimizer(df)
-    return optimizer.optimize_allocation()
+    optimizer = ResourceOptimizer(df, threads=threads)
+    return optimizer.optimize_allocation(report=report, as_frame=as_frame)
  
  
 if __name__ == "__main__":
@@ -102,7 +102,7 @@ results_list = []
 
 for count in sim_counts:
     print(f"Running {count:,} simulations...")
-    result = simulate_project_risk(df, num_simulations=count)
+    result = simulate_project_risk(df, num_simulations=count, report=False)
     results_list.append(result)
     
     sim_result = result['simulation_result']
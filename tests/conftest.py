@@ -0,0 +1,168 @@
+"""
+Shared pytest fixtures for the test suite
+"""
+ 
+import json
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+ 
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+ 
+# Clock reading used for results cached across tests, so their timestamps compare equal
+FROZEN_NOW = datetime(2024, 1, 1, 9, 0, 0)
+ 
+ 
+class FrozenDatetime(datetime):
+    """datetime whose now() always returns FROZEN_NOW"""
+   
+    @classmethod
+    def now(cls, tz=None):
+        return FROZEN_NOW
+ 
+ 
+class FakeLLM:
+    """Stand-in for LLMClient that answers every prompt with one canned reply"""
+   
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+   
+    def available(self):
+        return True
+   
+    def generate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return self.reply
+ 
+ 
+def _column(value, n, dtype):
+    """A typed ndarray column: lists are converted, scalars are repeated n times"""
+    if isinstance(value, (list, np.ndarray)):
+        return np.asarray(value, dtype=dtype)
+    return np.full(n, value, dtype=dtype)
+ 
+ 
+def build_project_df(n=None, resources=None, risks='Low', preds=None, durations=10, costs=500):
+    """
+    Build a project DataFrame with the CSV schema from NumPy columns.
+   
+    Args:
+        n: Number of tasks; defaults to the length of the first list argument
+        resources: Resource per task; defaults to alternating Alice/Bob
+        risks, preds, durations, costs: Per-task list, or a scalar repeated for every task
+       
+    Returns:
+        DataFrame with Task_ID 1..n and Task_Name 'Task 1'..'Task n'
+    """
+    if n is None:
+        n = next(len(v) for v in (resources, risks, preds, durations, costs)
+                 if isinstance(v, (list, np.ndarray)))
+    if resources is None:
+        resources = np.resize(['Alice', 'Bob'], n)
+    task_ids = np.arange(1, n + 1, dtype=np.int64)
+    return pd.DataFrame({
+        'Task_ID': task_ids,
+        'Task_Name': np.char.add('Task ', task_ids.astype(str)),
+        'Duration_Days': _column(durations, n, np.int64),
+        'Resource_Name': _column(resources, n, object),
+        'Cost_Per_Day': _column(costs, n, np.int64),
+        'Risk_Level': _column(risks, n, object),
+        'Predecessors': _column(preds, n, object)
+    })
+ 
+ 
+def pytest_addoption(parser):
+    parser.addoption("--runslow", action="store_true", default=False,
+                     help="run tests marked slow (real AutoGen / LLM fallback paths)")
+ 
+ 
+def pytest_collection_modifyitems(config, items):
+    """Skip tests marked slow unless --runslow is given"""
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="slow: pass --runslow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+ 
+ 
+@pytest.fixture(autouse=True)
+def fake_openai(monkeypatch):
+    """
+    Replace the OpenAI SDK client classes for every test, so an LLMClient
+    built with a token can never open a real connection.
+    Tests set replies through fake_openai.return_value.
+    """
+    import llm_client
+   
+    fake = MagicMock()
+    monkeypatch.setattr(llm_client, 'OpenAI', fake)
+    monkeypatch.setattr(llm_client, 'AsyncOpenAI', MagicMock())
+    return fake
+ 
+ 
+@pytest.fixture(scope="session")
+def sample_df():
+    """
+    Five-task sample project, built once per session and shared by every test
+    that asks for it. Treat it as read-only: copy before modifying.
+    """
+    return pd.DataFrame({
+        'Task_ID': [1, 2, 3, 4, 5],
+        'Task_Name': ['Task A', 'Task B', 'Task C', 'Task D', 'Task E'],
+        'Duration_Days': [10, 15, 8, 12, 20],
+        'Resource_Name': ['Alice', 'Bob', 'Alice', 'Charlie', 'Bob'],
+        'Cost_Per_Day': [500, 600, 500, 550, 600],
+        'Risk_Level': ['High', 'Med', 'Low', 'High', 'Med'],
+        'Predecessors': [None, '1', '1', '2,3', None]
+    })
+ 
+ 
+@pytest.fixture(scope="session")
+def canned_llm_responses():
+    """Canned LLM replies from tests/fixtures/llm_responses.json, loaded once per run"""
+    with open(FIXTURES_DIR / 'llm_responses.json', encoding='utf-8') as f:
+        return json.load(f)
+ 
+ 
+@pytest.fixture(scope="session")
+def chat_completion():
+    """
+    Build a chat.completions.create result shaped like the OpenAI SDK's,
+    from plain namespaces rather than a MagicMock tree.
+    """
+    def build(content):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    return build
+ 
+ 
+@pytest.fixture
+def fake_llm(monkeypatch, canned_llm_responses):
+    """Route agents_simple's LLM calls to a FakeLLM replying with the canned analysis"""
+    client = FakeLLM(canned_llm_responses['analysis'])
+    monkeypatch.setattr('agents_simple.get_llm_client', lambda: client)
+    return client
+ 
+ 
+@pytest.fixture(scope="session")
+def make_project_df():
+    """The build_project_df builder, for tests that need a custom project"""
+    return build_project_df
+ 
+ 
+@pytest.fixture(scope="module")
+def analysis_noai(sample_csv):
+    """
+    analyze_project result with both AI backends off, computed once per module
+    from that module's sample_csv with the clock frozen at FROZEN_NOW.
+    """
+    from agents_simple import analyze_project
+   
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('agents_simple.datetime', FrozenDatetime)
+        return analyze_project(sample_csv, use_llm=False, use_autogen=False)
@@ -5,32 +5,17 @@ Tests metrics calculation and project analysis
  
 import pytest
 import pandas as pd
-import sys
 import os
+from unittest.mock import patch
  
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import agents_simple
+from agents_simple import calculate_project_metrics, calculate_project_metrics_chunked, analyze_project, analyze_project_df, load_project_metrics, read_project_csv, llm_skip_reason
  
-from agents_simple import calculate_project_metrics, analyze_project
  
- 
-@pytest.fixture
-def sample_df():
-    """Create sample project data matching dummy_data.csv structure"""
-    return pd.DataFrame({
-        'Task_ID': [1, 2, 3, 4, 5],
-        'Task_Name': ['Task A', 'Task B', 'Task C', 'Task D', 'Task E'],
-        'Duration_Days': [10, 15, 8, 12, 20],
-        'Resource_Name': ['Alice', 'Bob', 'Alice', 'Charlie', 'Bob'],
-        'Cost_Per_Day': [500, 600, 500, 550, 600],
-        'Risk_Level': ['High', 'Med', 'Low', 'High', 'Med'],
-        'Predecessors': [None, '1', '1', '2,3', None]
-    })
- 
- 
-@pytest.fixture
-def sample_csv(tmp_path, sample_df):
-    """Create a temporary CSV file"""
-    csv_path = tmp_path / "test_data.csv"
+@pytest.fixture(scope="module")
+def sample_csv(tmp_path_factory, sample_df):
+    """Create a temporary CSV file (written once per module; tests must not modify it)"""
+    csv_path = tmp_path_factory.mktemp("csv") / "test_data.csv"
     sample_df.to_csv(csv_path, index=False)
     return str(csv_path)
  
@@ -67,17 +52,25 @@ def test_calculate_project_metrics_resources(sample_df):
     metrics = calculate_project_metrics(sample_df)
    
     assert len(metrics['resource_stats']) == 3
-    assert 'Total_Cost' in metrics['resource_stats'].columns
+    assert 'Total_Cost' in metrics['resource_stats'][0]
  
  
-def test_analyze_project_without_llm(sample_csv):
-    """Test analysis with LLM disabled"""
-    result = analyze_project(sample_csv, use_llm=False, use_autogen=False)
+def test_resource_total_cost_matches_project_cost(sample_df):
+    """Test per-resource costs add up to the project total"""
+    metrics = calculate_project_metrics(sample_df)
+    stats = pd.DataFrame(metrics['resource_stats']).set_index('Resource')
    
-    assert result['status'] == 'success'
-    assert 'analysis_results' in result
-    assert 'metrics' in result
-    assert 'timestamp' in result
+    assert stats.loc['Alice', 'Task_Count'] == 2
+    assert stats.loc['Alice', 'Total_Cost'] == 10 * 500 + 8 * 500
+    assert stats['Total_Cost'].sum() == metrics['total_cost']
+ 
+ 
+def test_analyze_project_without_llm(analysis_noai):
+    """Test analysis with LLM disabled"""
+    assert analysis_noai['status'] == 'success'
+    assert 'analysis_results' in analysis_noai
+    assert 'metrics' in analysis_noai
+    assert analysis_noai['timestamp'] == '2024-01-01 09:00:00'
  
  
 def test_analyze_project_file_not_found():
@@ -88,13 +81,95 @@ def test_analyze_project_file_not_found():
     assert 'error_message' in result
  
  
-def test_analyze_project_metrics_included(sample_csv):
+def test_analyze_project_metrics_included(analysis_noai):
     """Test that metrics are included in result"""
-    result = analyze_project(sample_csv, use_llm=False, use_autogen=False)
+    assert analysis_noai['status'] == 'success'
+    assert analysis_noai['metrics']['total_tasks'] == 5
+    assert analysis_noai['metrics']['num_resources'] == 3
+ 
+ 
+def test_analyze_project_df_matches_csv(analysis_noai, sample_df):
+    """Test DataFrame input gives the same metrics as the CSV path"""
+    from_df = analyze_project_df(sample_df, use_llm=False, use_autogen=False)
+   
+    assert from_df['status'] == 'success'
+    assert from_df['metrics'] == analysis_noai['metrics']
+ 
+ 
+def test_analyze_project_dispatches_dataframe(sample_df, tmp_path):
+    """Test analyze_project accepts a DataFrame or a Path as well as a str"""
+    csv_path = tmp_path / "project.csv"
+    sample_df.to_csv(csv_path, index=False)
+   
+    from_df = analyze_project(sample_df, use_llm=False, use_autogen=False)
+    from_path = analyze_project(csv_path, use_llm=False, use_autogen=False)
+   
+    assert from_df['status'] == 'success'
+    assert from_path['status'] == 'success'
+    assert from_df['metrics'] == from_path['metrics']
+ 
+ 
+def test_analyze_project_df_invalid_data():
+    """Test DataFrame input without the project columns returns an error dict"""
+    result = analyze_project_df(pd.DataFrame({'a': [1]}), use_llm=False, use_autogen=False)
+   
+    assert result['status'] == 'error'
+    assert 'Analysis failed' in result['error_message']
+ 
+ 
+def test_chunked_metrics_match_full(sample_csv):
+    """Test metrics accumulated over small chunks equal the single-frame result"""
+    full = calculate_project_metrics(read_project_csv(sample_csv))
+    chunked = calculate_project_metrics_chunked(read_project_csv(sample_csv, chunksize=2))
+   
+    assert chunked == full
+ 
+ 
+def test_chunked_metrics_require_data():
+    """Test an empty chunk stream is reported as an error"""
+    with pytest.raises(ValueError):
+        calculate_project_metrics_chunked(iter([]))
+ 
+ 
+def test_load_project_metrics_chunks_large_files(sample_csv, sample_df):
+    """Test files over the size threshold are aggregated chunk by chunk"""
+    agents_simple._load_and_compute.cache_clear()
+    with patch.object(agents_simple, 'POLARS_AVAILABLE', False), \
+         patch.object(agents_simple, 'LARGE_CSV_BYTES', 0), \
+         patch.object(agents_simple, 'calculate_project_metrics_chunked',
+                      wraps=agents_simple.calculate_project_metrics_chunked) as chunked:
+        metrics = load_project_metrics(sample_csv)
+    agents_simple._load_and_compute.cache_clear()
+   
+    chunked.assert_called_once()
+    assert metrics == calculate_project_metrics(sample_df)
+ 
+ 
+def test_llm_skip_reason(sample_df, monkeypatch):
+    """Test small or low-risk projects are routed to the metrics-only report"""
+    metrics = calculate_project_metrics(sample_df)
+    assert llm_skip_reason(metrics) is None
+   
+    assert llm_skip_reason(calculate_project_metrics(sample_df.iloc[:3])) is not None
+   
+    low_risk_df = sample_df.assign(Risk_Level='Low', Predecessors=None)
+    assert llm_skip_reason(calculate_project_metrics(low_risk_df)) is not None
+   
+    monkeypatch.setenv('RISKMGMT_LLM_MIN_TASKS', '10')
+    assert llm_skip_reason(metrics) is not None
+ 
+ 
+@patch('agents_simple.get_llm_client')
+def test_analyze_small_project_skips_llm(mock_llm_class, tmp_path, sample_df):
+    """Test the LLM is never contacted for trivially small projects"""
+    csv_path = str(tmp_path / "small.csv")
+    sample_df.iloc[:2].to_csv(csv_path, index=False)
+   
+    result = analyze_project(csv_path, use_llm=True, use_autogen=True)
    
     assert result['status'] == 'success'
-    assert result['metrics']['total_tasks'] == 5
-    assert result['metrics']['num_resources'] == 3
+    assert 'AI ANALYSIS SKIPPED' in result['analysis_results']
+    mock_llm_class.assert_not_called()
  
  
 def test_metrics_complexity(sample_df):
@@ -104,6 +179,158 @@ def test_metrics_complexity(sample_df):
     assert metrics['complex_task_count'] >= 1
  
  
+def test_metrics_complexity_values(sample_df):
+    """Test per-task complexity counts predecessors"""
+    df = sample_df.copy()
+    df['Predecessors'] = [None, '  ', '1', '1,2', '1, 2, 3']
+    metrics = calculate_project_metrics(df)
+   
+    assert metrics['complex_task_count'] == 2
+ 
+ 
+def test_read_project_csv_dtypes(sample_csv):
+    """Test CSV columns are loaded with the compact schema dtypes"""
+    df = read_project_csv(sample_csv)
+   
+    assert pd.api.types.is_integer_dtype(df['Task_ID'])
+    assert str(df['Resource_Name'].dtype) == 'category'
+    assert str(df['Risk_Level'].dtype) == 'category'
+    assert df['Predecessors'].isna().sum() == 2
+    assert calculate_project_metrics(df)['total_cost'] == calculate_project_metrics(pd.read_csv(sample_csv))['total_cost']
+ 
+ 
+def test_read_project_csv_fractional_durations(tmp_path, sample_df):
+    """Test fractional and blank durations load instead of failing the int cast"""
+    df = sample_df.copy()
+    df['Duration_Days'] = [5.5, 10, None, 12, 20]
+    csv_path = tmp_path / "fractional.csv"
+    df.to_csv(csv_path, index=False)
+   
+    loaded = read_project_csv(csv_path)
+   
+    assert loaded['Duration_Days'].iloc[0] == 5.5
+    assert loaded['Duration_Days'].isna().sum() == 1
+    assert calculate_project_metrics(loaded)['total_duration'] == 47.5
+ 
+ 
+def test_alphanumeric_task_ids(tmp_path, sample_df):
+    """Test task IDs like 'T1' load as text and still analyze and optimize"""
+    from resource_optimizer import optimize_resources
+   
+    df = sample_df.copy()
+    df['Task_ID'] = [f'T{i}' for i in range(1, 6)]
+    df['Predecessors'] = [None, 'T1', 'T1', 'T2,T3', None]
+    csv_path = tmp_path / "text_ids.csv"
+    df.to_csv(csv_path, index=False)
+   
+    loaded = read_project_csv(csv_path)
+   
+    assert loaded['Task_ID'].tolist() == ['T1', 'T2', 'T3', 'T4', 'T5']
+    assert analyze_project(str(csv_path), use_llm=False)['status'] == 'success'
+    assert optimize_resources(loaded)['status'] == 'success'
+ 
+ 
+def test_read_project_csv_without_task_name(tmp_path, sample_df):
+    """Test Task_Name is optional unless asked for, other columns are required"""
+    csv_path = tmp_path / "no_names.csv"
+    sample_df.drop(columns='Task_Name').to_csv(csv_path, index=False)
+   
+    loaded = read_project_csv(csv_path)
+   
+    assert 'Task_Name' not in loaded.columns
+    assert calculate_project_metrics(loaded)['total_tasks'] == 5
+    with pytest.raises(ValueError, match="Task_Name"):
+        read_project_csv(csv_path, columns=['Task_ID', 'Task_Name'])
+   
+    sample_df.drop(columns='Risk_Level').to_csv(csv_path, index=False)
+    with pytest.raises(ValueError, match="Risk_Level"):
+        read_project_csv(csv_path)
+ 
+ 
+def test_polars_metrics_match_pandas(tmp_path, sample_df):
+    """Test the Polars path produces exactly the pandas metrics"""
+    pytest.importorskip("polars")
+    df = sample_df.copy()
+    df['Predecessors'] = [None, '  ', '1', '1,2', '1, 2, 3']
+    csv_path = str(tmp_path / "edge_cases.csv")
+    df.to_csv(csv_path, index=False)
+   
+    expected = calculate_project_metrics(read_project_csv(csv_path))
+   
+    assert agents_simple._calculate_metrics_polars(csv_path) == expected
+ 
+ 
+def test_polars_metrics_match_pandas_on_sample(sample_csv):
+    """Test the Polars path matches pandas on the standard sample project"""
+    pytest.importorskip("polars")
+    expected = calculate_project_metrics(read_project_csv(sample_csv))
+   
+    assert agents_simple._calculate_metrics_polars(sample_csv) == expected
+ 
+ 
+def test_polars_metrics_reject_missing_columns(tmp_path, sample_df):
+    """Test the Polars path raises the same error as read_project_csv"""
+    csv_path = str(tmp_path / "no_risk.csv")
+    sample_df.drop(columns=['Risk_Level']).to_csv(csv_path, index=False)
+   
+    with pytest.raises(ValueError, match="Missing required columns: Risk_Level"):
+        agents_simple._calculate_metrics_polars(csv_path)
+    with pytest.raises(ValueError, match="Missing required columns: Risk_Level"):
+        read_project_csv(csv_path)
+ 
+ 
+def test_load_project_metrics_cached(sample_csv):
+    """Test unchanged CSV files are not re-parsed"""
+    first = load_project_metrics(sample_csv)
+   
+    with patch('agents_simple.calculate_project_metrics') as mock_calc:
+        second = load_project_metrics(sample_csv)
+        mock_calc.assert_not_called()
+   
+    assert second['total_tasks'] == first['total_tasks'] == 5
+ 
+ 
+def test_load_project_metrics_returns_independent_copies(sample_csv):
+    """Test mutating a returned metrics dict cannot corrupt later cache hits"""
+    first = load_project_metrics(sample_csv)
+    first['resource_stats'][0]['Task_Count'] = -1
+    first['resource_stats'].clear()
+   
+    second = load_project_metrics(sample_csv)
+   
+    assert len(second['resource_stats']) == 3
+    assert all(stats['Task_Count'] > 0 for stats in second['resource_stats'])
+ 
+ 
+def test_load_project_metrics_detects_changes(tmp_path, sample_df):
+    """Test editing the CSV invalidates the cached metrics"""
+    # Own file: the shared sample_csv must stay unmodified
+    csv_path = str(tmp_path / "edited.csv")
+    sample_df.to_csv(csv_path, index=False)
+    assert load_project_metrics(csv_path)['total_tasks'] == 5
+   
+    sample_df.iloc[:3].to_csv(csv_path, index=False)
+   
+    assert load_project_metrics(csv_path)['total_tasks'] == 3
+ 
+ 
+def test_load_project_metrics_disk_cache(sample_csv, tmp_path, monkeypatch):
+    """Test metrics persist across processes when a cache dir is set"""
+    monkeypatch.setenv('RISKMGMT_CACHE_DIR', str(tmp_path / 'cache'))
+    agents_simple._load_and_compute.cache_clear()
+   
+    load_project_metrics(sample_csv)
+    assert len(os.listdir(tmp_path / 'cache' / 'metrics')) == 1
+   
+    # Simulate a fresh process: memory cache empty, disk cache warm
+    agents_simple._load_and_compute.cache_clear()
+    with patch('agents_simple.calculate_project_metrics') as mock_calc:
+        metrics = load_project_metrics(sample_csv)
+        mock_calc.assert_not_called()
+   
+    assert metrics['total_tasks'] == 5
+ 
+ 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
  
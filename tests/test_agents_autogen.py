@@ -5,33 +5,53 @@ Tests AutoGen multi-agent system functionality
  
 import pytest
 import pandas as pd
-import sys
-import os
 from unittest.mock import patch, MagicMock, PropertyMock
 import tempfile
  
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+# agents_autogen imports the optional pyautogen package at module level
+agents_autogen = pytest.importorskip("agents_autogen")
+ 
+ 
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Keep cached agent replies from leaking between tests"""
+    from llm_cache import get_response_cache
+    get_response_cache().clear()
+    yield
+    get_response_cache().clear()
+ 
+ 
+@pytest.fixture
+def hf_token(monkeypatch):
+    """Set a fake HF_API_TOKEN for the test"""
+    monkeypatch.setenv('HF_API_TOKEN', 'fake_token')
+ 
+ 
+SAMPLE_DATA = {
+    'Task_ID': [1, 2, 3, 4, 5],
+    'Task_Name': ['Task A', 'Task B', 'Task C', 'Task D', 'Task E'],
+    'Duration_Days': [10, 15, 8, 12, 20],
+    'Resource_Name': ['Alice', 'Bob', 'Alice', 'Charlie', 'Bob'],
+    'Cost_Per_Day': [500, 600, 500, 550, 600],
+    'Risk_Level': ['High', 'Med', 'Low', 'High', 'Med'],
+    'Predecessors': [None, '1', '1', '2,3', None]
+}
+ 
+# Rendered once at import; sample_csv writes these bytes instead of calling to_csv per test
+SAMPLE_CSV_BYTES = pd.DataFrame(SAMPLE_DATA).to_csv(index=False).encode()
  
  
 @pytest.fixture
 def sample_df():
     """Create sample project data"""
-    return pd.DataFrame({
-        'Task_ID': [1, 2, 3, 4, 5],
-        'Task_Name': ['Task A', 'Task B', 'Task C', 'Task D', 'Task E'],
-        'Duration_Days': [10, 15, 8, 12, 20],
-        'Resource_Name': ['Alice', 'Bob', 'Alice', 'Charlie', 'Bob'],
-        'Cost_Per_Day': [500, 600, 500, 550, 600],
-        'Risk_Level': ['High', 'Med', 'Low', 'High', 'Med'],
-        'Predecessors': [None, '1', '1', '2,3', None]
-    })
+    return pd.DataFrame(SAMPLE_DATA)
  
  
 @pytest.fixture
-def sample_csv(tmp_path, sample_df):
+def sample_csv(tmp_path):
     """Create temporary CSV file"""
     csv_path = tmp_path / "test_data.csv"
-    sample_df.to_csv(csv_path, index=False)
+    csv_path.write_bytes(SAMPLE_CSV_BYTES)
     return str(csv_path)
  
  
@@ -55,291 +75,448 @@ def sample_metrics():
     }
  
  
+@pytest.fixture(scope="module")
+def mocked_agents():
+    """ProjectManagementAgents built once with mocked AutoGen agents, shared by read-only tests"""
+    from agents_autogen import ProjectManagementAgents
+   
+    # Patches are only needed while constructing; the instance keeps its mock agents
+    with pytest.MonkeyPatch.context() as mp, \
+         patch('agents_autogen.AssistantAgent'), patch('agents_autogen.UserProxyAgent'):
+        mp.setenv('HF_API_TOKEN', 'fake_token')
+        return ProjectManagementAgents()
+ 
+ 
 def test_agents_autogen_import():
     """Test that agents_autogen module can be imported"""
-    try:
-        from Scripts import agents_autogen
-        assert agents_autogen is not None
-    except ImportError:
-        pytest.skip("AutoGen not installed")
+    assert hasattr(agents_autogen, 'ProjectManagementAgents')
+    assert hasattr(agents_autogen, 'analyze_project')
  
  
-@patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token', 'HF_MODEL': 'test-model'})
+@pytest.mark.usefixtures("hf_token")
 @patch('agents_autogen.AssistantAgent')
 @patch('agents_autogen.UserProxyAgent')
-def test_project_management_agents_initialization(mock_user_proxy, mock_assistant):
+def test_project_management_agents_initialization(mock_user_proxy, mock_assistant, monkeypatch):
     """Test ProjectManagementAgents initialization"""
-    try:
-        from agents_autogen import ProjectManagementAgents
-       
-        agents = ProjectManagementAgents()
-       
-        assert agents is not None
-        assert hasattr(agents, 'llm_config')
-        assert hasattr(agents, 'risk_agent')
-        assert hasattr(agents, 'resource_agent')
-        assert hasattr(agents, 'decision_agent')
-       
-    except ImportError:
-        pytest.skip("AutoGen not installed")
- 
- 
-@patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'})
-@patch('agents_autogen.AssistantAgent')
-def test_create_risk_agent(mock_assistant):
+    from agents_autogen import ProjectManagementAgents
+    monkeypatch.setenv('HF_MODEL', 'test-model')
+   
+    agents = ProjectManagementAgents()
+   
+    assert agents is not None
+    assert hasattr(agents, 'llm_config')
+    assert hasattr(agents, 'risk_agent')
+    assert hasattr(agents, 'resource_agent')
+    assert hasattr(agents, 'decision_agent')
+ 
+ 
+def test_create_risk_agent(mocked_agents):
     """Test risk agent creation"""
-    try:
-        from agents_autogen import ProjectManagementAgents
-       
-        mock_assistant.return_value = MagicMock()
-        agents = ProjectManagementAgents()
-       
-        assert agents.risk_agent is not None
-       
-    except ImportError:
-        pytest.skip("AutoGen not installed")
+    assert mocked_agents.risk_agent is not None
  
  
-@patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'})
-@patch('agents_autogen.AssistantAgent')
-def test_create_resource_agent(mock_assistant):
+def test_create_resource_agent(mocked_agents):
     """Test resource optimizer agent creation"""
-    try:
-        from agents_autogen import ProjectManagementAgents
-       
-        mock_assistant.return_value = MagicMock()
-        agents = ProjectManagementAgents()
-       
-        assert agents.resource_agent is not None
-       
-    except ImportError:
-        pytest.skip("AutoGen not installed")
+    assert mocked_agents.resource_agent is not None
  
  
-@patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'})
-@patch('agents_autogen.AssistantAgent')
-def test_create_decision_agent(mock_assistant):
+def test_create_decision_agent(mocked_agents):
     """Test decision synthesizer agent creation"""
-    try:
-        from agents_autogen import ProjectManagementAgents
-       
-        mock_assistant.return_value = MagicMock()
-        agents = ProjectManagementAgents()
-       
-        assert agents.decision_agent is not None
-       
-    except ImportError:
-        pytest.skip("AutoGen not installed")
+    assert mocked_agents.decision_agent is not None
  
  
-@patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'})
-@patch('agents_autogen.AssistantAgent')
-@patch('agents_autogen.UserProxyAgent')
-def test_llm_config_structure(mock_user_proxy, mock_assistant):
+def test_llm_config_structure(mocked_agents):
     """Test LLM configuration structure"""
-    try:
-        from agents_autogen import ProjectManagementAgents
-       
-        agents = ProjectManagementAgents()
-       
-        assert 'config_list' in agents.llm_config
-        assert len(agents.llm_config['config_list']) > 0
-        assert 'timeout' in agents.llm_config
-       
-    except ImportError:
-        pytest.skip("AutoGen not installed")
+    assert 'config_list' in mocked_agents.llm_config
+    assert len(mocked_agents.llm_config['config_list']) > 0
+    assert 'timeout' in mocked_agents.llm_config
  
  
-@patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'})
-@patch('agents_autogen.AssistantAgent')
-def test_calculate_metrics(mock_assistant, sample_df):
-    """Test _calculate_metrics method"""
-    try:
-        from agents_autogen import ProjectManagementAgents
-       
-        agents = ProjectManagementAgents()
-        metrics = agents._calculate_metrics(sample_df)
-       
-        assert 'total_tasks' in metrics
-        assert 'total_duration' in metrics
-        assert 'total_cost' in metrics
-        assert 'resources' in metrics
-        assert 'high_risk_count' in metrics
-       
-    except ImportError:
-        pytest.skip("AutoGen not installed")
- 
- 
-@patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'})
-@patch('agents_autogen.AssistantAgent')
-def test_prepare_analysis_prompt(mock_assistant, sample_df):
-    """Test _prepare_analysis_prompt method"""
-    try:
-        from agents_autogen import ProjectManagementAgents
-       
-        agents = ProjectManagementAgents()
-        metrics = agents._calculate_metrics(sample_df)
-        prompt = agents._prepare_analysis_prompt(sample_df, metrics)
-       
-        assert isinstance(prompt, str)
-        assert len(prompt) > 0
-        assert 'PROJECT OVERVIEW' in prompt
-        assert 'RISK DISTRIBUTION' in prompt
-       
-    except ImportError:
-        pytest.skip("AutoGen not installed")
- 
- 
-@patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'})
+@pytest.mark.usefixtures("hf_token")
 @patch('agents_autogen.AssistantAgent')
 def test_analyze_with_metrics(mock_assistant, sample_metrics):
     """Test analyze_with_metrics method"""
-    try:
-        from agents_autogen import ProjectManagementAgents
-       
-        # Mock agent responses
-        mock_agent = MagicMock()
-        mock_agent.generate_reply.return_value = "Mocked analysis response"
-        mock_assistant.return_value = mock_agent
-       
-        agents = ProjectManagementAgents()
-        result = agents.analyze_with_metrics(sample_metrics)
-       
-        assert isinstance(result, str)
-        assert len(result) > 0
-       
-    except ImportError:
-        pytest.skip("AutoGen not installed")
- 
- 
-@patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'})
+    from agents_autogen import ProjectManagementAgents
+   
+    # Mock agent responses
+    mock_agent = MagicMock()
+    mock_agent.generate_reply.return_value = "Mocked analysis response"
+    mock_assistant.return_value = mock_agent
+   
+    agents = ProjectManagementAgents()
+    result = agents.analyze_with_metrics(sample_metrics)
+   
+    assert isinstance(result, str)
+    assert len(result) > 0
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
 @patch('agents_autogen.AssistantAgent')
 def test_run_agent_workflow(mock_assistant):
     """Test _run_agent_workflow method"""
-    try:
-        from agents_autogen import ProjectManagementAgents
-       
-        # Mock agent responses
-        mock_agent = MagicMock()
-        mock_agent.generate_reply.return_value = "Agent analysis"
-        mock_assistant.return_value = mock_agent
-       
-        agents = ProjectManagementAgents()
-        result = agents._run_agent_workflow("Test prompt")
-       
-        assert isinstance(result, str)
-        assert "MULTI-AGENT PROJECT ANALYSIS REPORT" in result or "analysis" in result.lower()
-       
-    except ImportError:
-        pytest.skip("AutoGen not installed")
- 
- 
-@patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'})
+    from agents_autogen import ProjectManagementAgents
+   
+    # Mock agent responses
+    mock_agent = MagicMock()
+    mock_agent.generate_reply.return_value = "Agent analysis"
+    mock_assistant.return_value = mock_agent
+   
+    agents = ProjectManagementAgents()
+    result = agents._run_agent_workflow("Test prompt")
+   
+    assert isinstance(result, str)
+    assert "MULTI-AGENT PROJECT ANALYSIS REPORT" in result or "analysis" in result.lower()
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
 @patch('agents_autogen.AssistantAgent')
 def test_analyze_project_success(mock_assistant, sample_csv):
     """Test analyze_project method with successful execution"""
-    try:
-        from agents_autogen import ProjectManagementAgents
-       
-        mock_agent = MagicMock()
-        mock_agent.generate_reply.return_value = "Analysis complete"
-        mock_assistant.return_value = mock_agent
-       
-        agents = ProjectManagementAgents()
-        result = agents.analyze_project(sample_csv)
-       
-        assert 'status' in result
-        assert result['status'] == 'success'
-        assert 'metrics' in result
-        assert 'timestamp' in result
-       
-    except ImportError:
-        pytest.skip("AutoGen not installed")
- 
- 
-@patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'})
+    from agents_autogen import ProjectManagementAgents
+   
+    mock_agent = MagicMock()
+    mock_agent.generate_reply.return_value = "Analysis complete"
+    mock_assistant.return_value = mock_agent
+   
+    agents = ProjectManagementAgents()
+    result = agents.analyze_project(sample_csv)
+   
+    assert 'status' in result
+    assert result['status'] == 'success'
+    assert 'metrics' in result
+    assert 'timestamp' in result
+    assert result['metrics']['num_resources'] == 3
+    assert result['metrics']['complex_task_count'] == 1
+    assert 'Analysis complete' in result['analysis_results']
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
+@patch('agents_autogen.AssistantAgent')
+def test_analyze_project_accepts_dataframe(mock_assistant, sample_df, sample_csv):
+    """Test analyze_project takes a loaded DataFrame without a CSV round-trip"""
+    from agents_autogen import ProjectManagementAgents
+   
+    mock_agent = MagicMock()
+    mock_agent.generate_reply.return_value = "Analysis complete"
+    mock_assistant.return_value = mock_agent
+   
+    agents = ProjectManagementAgents()
+    with patch('agents_autogen.load_project_metrics') as mock_load:
+        result = agents.analyze_project(sample_df)
+   
+    mock_load.assert_not_called()
+    assert result['status'] == 'success'
+    assert result['metrics'] == agents.analyze_project(sample_csv)['metrics']
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
 @patch('agents_autogen.AssistantAgent')
 def test_analyze_project_file_not_found(mock_assistant):
     """Test analyze_project with non-existent file"""
-    try:
-        from agents_autogen import ProjectManagementAgents
-       
-        agents = ProjectManagementAgents()
-        result = agents.analyze_project("nonexistent_file.csv")
-       
-        assert 'status' in result
-        assert result['status'] == 'error'
-        assert 'error_message' in result
-       
-    except ImportError:
-        pytest.skip("AutoGen not installed")
+    from agents_autogen import ProjectManagementAgents
+   
+    agents = ProjectManagementAgents()
+    result = agents.analyze_project("nonexistent_file.csv")
+   
+    assert 'status' in result
+    assert result['status'] == 'error'
+    assert 'error_message' in result
  
  
-@patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'})
+@pytest.mark.usefixtures("hf_token")
 def test_analyze_project_function_with_llm(sample_csv):
     """Test analyze_project convenience function with LLM"""
-    try:
-        from agents_autogen import analyze_project
-       
-        with patch('agents_autogen.ProjectManagementAgents') as mock_agents_class:
-            mock_instance = MagicMock()
-            mock_instance.analyze_project.return_value = {
-                'status': 'success',
-                'analysis_results': 'Mocked results',
-                'metrics': {},
-                'timestamp': '2025-12-23'
-            }
-            mock_agents_class.return_value = mock_instance
-           
-            result = analyze_project(sample_csv, use_llm=True)
-           
-            assert 'status' in result
+    from agents_autogen import analyze_project
+   
+    with patch('agents_autogen.ProjectManagementAgents') as mock_agents_class:
+        mock_instance = MagicMock()
+        mock_instance.analyze_project.return_value = {
+            'status': 'success',
+            'analysis_results': 'Mocked results',
+            'metrics': {},
+            'timestamp': '2025-12-23'
+        }
+        mock_agents_class.return_value = mock_instance
+       
+        result = analyze_project(sample_csv, use_llm=True)
        
-    except ImportError:
-        pytest.skip("AutoGen not installed")
+        assert 'status' in result
  
  
-@patch.dict(os.environ, {}, clear=True)
-def test_analyze_project_function_without_token(sample_csv):
+def test_analyze_project_function_without_token(sample_csv, monkeypatch):
     """Test analyze_project function without API token"""
-    try:
-        from agents_autogen import analyze_project
+    from agents_autogen import analyze_project
+    monkeypatch.delenv('HF_API_TOKEN', raising=False)
+   
+    with patch('agents_simple.analyze_project') as mock_simple:
+        mock_simple.return_value = {'status': 'success'}
        
-        with patch('agents_autogen.simple_analyze') as mock_simple:
-            mock_simple.return_value = {'status': 'success'}
-           
-            result = analyze_project(sample_csv, use_llm=False)
-           
-            # Should work without LLM
-            assert result is not None
+        result = analyze_project(sample_csv, use_llm=False)
        
-    except (ImportError, AttributeError):
-        # If agents_simple import fails in agents_autogen, that's expected
-        pytest.skip("AutoGen fallback not configured")
+        # Should fall back to the metrics-only analysis
+        assert result == {'status': 'success'}
+        mock_simple.assert_called_once_with(sample_csv, use_llm=False)
  
  
  
-@patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'})
+@pytest.mark.usefixtures("hf_token")
 @patch('agents_autogen.AssistantAgent')
 def test_agent_exception_handling(mock_assistant):
     """Test exception handling in agent workflow"""
-    try:
-        from agents_autogen import ProjectManagementAgents
-       
-        # Make agent raise exception
-        mock_agent = MagicMock()
-        mock_agent.generate_reply.side_effect = Exception("Agent failed")
-        mock_assistant.return_value = mock_agent
-       
-        agents = ProjectManagementAgents()
-        result = agents._run_agent_workflow("Test prompt")
-       
-        # Should handle exception gracefully
-        assert isinstance(result, str)
-        assert "unavailable" in result.lower() or "error" in result.lower()
-       
-    except ImportError:
-        pytest.skip("AutoGen not installed")
+    from agents_autogen import ProjectManagementAgents
+   
+    # Make agent raise exception
+    mock_agent = MagicMock()
+    mock_agent.generate_reply.side_effect = Exception("Agent failed")
+    mock_assistant.return_value = mock_agent
+   
+    agents = ProjectManagementAgents()
+    result = agents._run_agent_workflow("Test prompt")
+   
+    # Should handle exception gracefully
+    assert isinstance(result, str)
+    assert "unavailable" in result.lower() or "error" in result.lower()
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
+@patch('agents_autogen.AssistantAgent')
+def test_run_agent_workflow_inside_event_loop(mock_assistant):
+    """Test _run_agent_workflow when called from a running event loop"""
+    import asyncio
+    from agents_autogen import ProjectManagementAgents
+   
+    mock_agent = MagicMock()
+    mock_agent.generate_reply.return_value = "Agent analysis"
+    mock_assistant.return_value = mock_agent
+   
+    agents = ProjectManagementAgents()
+    agents.batched = False
+   
+    async def call_from_loop():
+        return agents._run_agent_workflow("Test prompt")
+   
+    result = asyncio.run(call_from_loop())
+   
+    assert "MULTI-AGENT PROJECT ANALYSIS REPORT" in result
+    assert mock_agent.generate_reply.call_count == 3
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
+@patch('agents_autogen.AssistantAgent')
+def test_run_agent_workflow_uses_cache(mock_assistant):
+    """Test repeated prompts are answered from the response cache"""
+    from agents_autogen import ProjectManagementAgents
+   
+    mock_agent = MagicMock()
+    mock_agent.generate_reply.return_value = "Agent analysis"
+    mock_assistant.return_value = mock_agent
+   
+    agents = ProjectManagementAgents()
+    agents.batched = False
+    first = agents._run_agent_workflow("Test prompt")
+    second = agents._run_agent_workflow("Test prompt")
+   
+    assert "Agent analysis" in first
+    assert "Agent analysis" in second
+    assert mock_agent.generate_reply.call_count == 3
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
+@patch('agents_autogen.AssistantAgent')
+def test_disk_cache_io_runs_off_event_loop(mock_assistant, tmp_path):
+    """Test disk-backed cache lookups and writes run on worker threads"""
+    pytest.importorskip("diskcache")
+    import threading
+    from llm_cache import LLMResponseCache
+    from agents_autogen import ProjectManagementAgents
+   
+    threads = []
+   
+    class RecordingCache(LLMResponseCache):
+        def get(self, key):
+            threads.append(threading.current_thread())
+            return super().get(key)
+       
+        def set(self, key, value):
+            threads.append(threading.current_thread())
+            super().set(key, value)
+   
+    mock_agent = MagicMock()
+    mock_agent.generate_reply.return_value = "Agent analysis"
+    mock_assistant.return_value = mock_agent
+   
+    agents = ProjectManagementAgents()
+    agents.batched = False
+    with patch('agents_autogen.get_response_cache',
+               return_value=RecordingCache(cache_dir=str(tmp_path))):
+        agents._run_agent_workflow("Test prompt")
+   
+    assert len(threads) == 6
+    assert threading.main_thread() not in threads
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
+@patch('agents_autogen.AssistantAgent')
+def test_stream_with_metrics(mock_assistant, sample_metrics):
+    """Test streaming yields the report section by section"""
+    from agents_autogen import ProjectManagementAgents
+   
+    mock_agent = MagicMock()
+    mock_agent.generate_reply.return_value = "Agent analysis"
+    mock_assistant.return_value = mock_agent
+   
+    agents = ProjectManagementAgents()
+    agents.batched = False
+    chunks = list(agents.stream_with_metrics(sample_metrics))
+   
+    assert "MULTI-AGENT PROJECT ANALYSIS REPORT" in chunks[0]
+    assert "RISK ANALYSIS" in chunks[1]
+    assert "RESOURCE OPTIMIZATION" in chunks[2]
+    assert "EXECUTIVE RECOMMENDATIONS" in chunks[3]
+    assert "Multi-Agent Analysis Complete" in chunks[-1]
+    assert len(chunks) == 5
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
+@patch('agents_autogen.AssistantAgent')
+def test_stream_stopped_early(mock_assistant, sample_metrics):
+    """Test closing the stream early skips the remaining agents"""
+    from agents_autogen import ProjectManagementAgents
+   
+    mock_agent = MagicMock()
+    mock_agent.generate_reply.return_value = "Agent analysis"
+    mock_assistant.return_value = mock_agent
+   
+    agents = ProjectManagementAgents()
+    agents.batched = False
+    stream = agents.stream_with_metrics(sample_metrics)
+    header = next(stream)
+    stream.close()
+   
+    assert "MULTI-AGENT PROJECT ANALYSIS REPORT" in header
+    assert mock_agent.generate_reply.call_count < 3
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
+@patch('agents_autogen.AssistantAgent')
+def test_run_agent_workflow_no_results(mock_assistant):
+    """Test empty agent replies produce the unavailable message"""
+    from agents_autogen import ProjectManagementAgents
+   
+    mock_agent = MagicMock()
+    mock_agent.generate_reply.return_value = None
+    mock_assistant.return_value = mock_agent
+   
+    agents = ProjectManagementAgents()
+    result = agents._run_agent_workflow("Test prompt")
+   
+    assert "MULTI-AGENT ANALYSIS UNAVAILABLE" in result
+ 
+ 
+@patch('agents_autogen.AssistantAgent')
+@patch('agents_autogen.UserProxyAgent')
+def test_get_shared_agents_reuses_instance(mock_user_proxy, mock_assistant, monkeypatch):
+    """Test agents are built once and rebuilt when credentials change"""
+    from agents_autogen import get_shared_agents
+   
+    monkeypatch.setenv('HF_API_TOKEN', 'token_a')
+    first = get_shared_agents()
+    assert get_shared_agents() is first
+   
+    monkeypatch.setenv('HF_API_TOKEN', 'token_b')
+    assert get_shared_agents() is not first
+ 
+ 
+BATCHED_REPLY = """###RISK###
+Risk findings
+###RESOURCE###
+Resource findings
+###DECISION###
+Decision findings"""
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
+@patch('agents_autogen.AssistantAgent')
+def test_run_agent_workflow_batched(mock_assistant):
+    """Test a well-formed combined reply needs a single LLM call"""
+    from agents_autogen import ProjectManagementAgents
+   
+    mock_agent = MagicMock()
+    mock_agent.generate_reply.return_value = BATCHED_REPLY
+    mock_assistant.return_value = mock_agent
+   
+    agents = ProjectManagementAgents()
+    result = agents._run_agent_workflow("Test prompt")
+   
+    assert mock_agent.generate_reply.call_count == 1
+    assert "RISK ANALYSIS" in result and "Risk findings" in result
+    assert "RESOURCE OPTIMIZATION" in result and "Resource findings" in result
+    assert "EXECUTIVE RECOMMENDATIONS" in result and "Decision findings" in result
+    assert "###" not in result
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
+@patch('agents_autogen.AssistantAgent')
+def test_run_agent_workflow_batched_fallback(mock_assistant):
+    """Test an incomplete combined reply falls back to the three agents"""
+    from agents_autogen import ProjectManagementAgents
+   
+    created = []
+   
+    def make_agent(**kwargs):
+        agent = MagicMock()
+        agent.name = kwargs['name']
+        agent.generate_reply.return_value = "###RISK###\nOnly risk"
+        created.append(agent)
+        return agent
+   
+    mock_assistant.side_effect = make_agent
+   
+    agents = ProjectManagementAgents()
+    result = agents._run_agent_workflow("Test prompt")
+   
+    assert sum(agent.generate_reply.call_count for agent in created) == 4
+    assert "MULTI-AGENT PROJECT ANALYSIS REPORT" in result
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
+@patch('agents_autogen.AssistantAgent')
+def test_agent_mode_multi(mock_assistant, monkeypatch):
+    """Test RISKMGMT_AGENT_MODE=multi disables the combined call"""
+    from agents_autogen import ProjectManagementAgents
+    monkeypatch.setenv('RISKMGMT_AGENT_MODE', 'multi')
+   
+    agents = ProjectManagementAgents()
+   
+    assert agents.batched is False
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
+@patch('agents_autogen.AssistantAgent')
+def test_warmup_pings_endpoint(mock_assistant, monkeypatch):
+    """Test opt-in warm-up sends a single 1-token request in the background"""
+    from agents_autogen import ProjectManagementAgents
+    monkeypatch.setenv('RISKMGMT_LLM_WARMUP', '1')
+   
+    mock_agent = MagicMock()
+    mock_assistant.return_value = mock_agent
+   
+    agents = ProjectManagementAgents()
+    agents._warmup_thread.join(timeout=5)
+   
+    mock_agent.client.create.assert_called_once()
+    assert mock_agent.client.create.call_args.kwargs['max_tokens'] == 1
+ 
+ 
+@pytest.mark.usefixtures("hf_token")
+@patch('agents_autogen.AssistantAgent')
+def test_warmup_disabled_by_default(mock_assistant):
+    """Test no warm-up request is sent unless enabled"""
+    from agents_autogen import ProjectManagementAgents
+   
+    agents = ProjectManagementAgents()
+   
+    assert agents._warmup_thread is None
  
  
 if __name__ == "__main__":
@@ -5,16 +5,17 @@ Tests LLM integration and report building
  
 import pytest
 import pandas as pd
-from unittest.mock import patch, MagicMock
-import sys
-import os
- 
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
  
 from agents_simple import calculate_project_metrics, analyze_project, build_report
  
  
-@pytest.fixture
+@pytest.fixture(autouse=True)
+def route_small_projects_to_llm(monkeypatch):
+    """The 3-task sample is below the default LLM routing threshold"""
+    monkeypatch.setenv('RISKMGMT_LLM_MIN_TASKS', '1')
+ 
+ 
+@pytest.fixture(scope="module")
 def sample_df():
     return pd.DataFrame({
         'Task_ID': [1, 2, 3],
@@ -27,131 +28,94 @@ def sample_df():
     })
  
  
-@pytest.fixture
-def sample_csv(tmp_path, sample_df):
-    csv_path = tmp_path / "test_data.csv"
+@pytest.fixture(scope="module")
+def sample_csv(tmp_path_factory, sample_df):
+    csv_path = tmp_path_factory.mktemp("csv") / "test_data.csv"
     sample_df.to_csv(csv_path, index=False)
     return str(csv_path)
  
  
-def test_build_report_no_ai(sample_df):
-    """Test report building without AI analysis"""
-    metrics = calculate_project_metrics(sample_df)
-    report = build_report(metrics, None, None)
-   
-    assert 'PROJECT METRICS SUMMARY' in report
-    assert 'Total Tasks: 3' in report
-    assert 'AI ANALYSIS NOT AVAILABLE' in report or 'Metrics Only' in report
- 
- 
-def test_build_report_with_autogen(sample_df):
-    """Test report building with AutoGen analysis"""
-    metrics = calculate_project_metrics(sample_df)
-    autogen_analysis = "Mocked AutoGen Analysis Result"
-    report = build_report(metrics, autogen_analysis, None)
-   
-    assert 'PROJECT METRICS SUMMARY' in report
-    assert autogen_analysis in report
-    assert 'AutoGen Multi-Agent' in report
+@pytest.fixture(scope="module")
+def sample_metrics(sample_df):
+    """Metrics of sample_df, computed once for the read-only report tests"""
+    return calculate_project_metrics(sample_df)
  
  
-def test_build_report_with_simple_llm(sample_df):
-    """Test report building with simple LLM analysis"""
-    metrics = calculate_project_metrics(sample_df)
-    simple_analysis = "Mocked Simple LLM Analysis"
-    report = build_report(metrics, None, simple_analysis)
+@pytest.mark.parametrize("autogen, simple, expected, absent", [
+    (None, None, ['AI ANALYSIS NOT AVAILABLE'], []),
+    ("Mocked AutoGen Analysis Result", None, ["Mocked AutoGen Analysis Result", 'AutoGen Multi-Agent'], []),
+    (None, "Mocked Simple LLM Analysis", ["Mocked Simple LLM Analysis", 'Simple LLM'], []),
+    ("AutoGen analysis complete", "Simple analysis complete",      # AutoGen takes priority
+     ["AutoGen analysis complete"], ["Simple analysis complete"]),
+])
+def test_build_report(sample_metrics, autogen, simple, expected, absent):
+    """Test report building for each combination of AI analyses"""
+    report = build_report(sample_metrics, autogen, simple)
    
     assert 'PROJECT METRICS SUMMARY' in report
-    assert simple_analysis in report
-    assert 'Simple LLM' in report
+    assert f"Total Tasks: {sample_metrics['total_tasks']}" in report
+    assert f"Resources: {sample_metrics['num_resources']}" in report
+    assert all(text in report for text in expected)
+    assert not any(text in report for text in absent)
  
  
-@patch('agents_simple.LLMClient')
-def test_analyze_project_with_llm_mock(mock_llm_class, sample_csv):
+def test_analyze_project_with_llm_mock(fake_llm, sample_csv):
     """Test analysis with mocked LLM"""
-    # Setup mock
-    mock_client = MagicMock()
-    mock_client.available.return_value = True
-    mock_client.generate.return_value = "Mocked LLM Response"
-    mock_llm_class.return_value = mock_client
-   
     result = analyze_project(sample_csv, use_llm=True, use_autogen=False)
    
     assert result['status'] == 'success'
     assert 'analysis_results' in result
+    assert len(fake_llm.prompts) == 1
+    assert fake_llm.reply in result['analysis_results']
  
  
-def test_analyze_project_autogen_error_fallback(sample_csv):
-    """Test fallback when AutoGen fails"""
-    # Test with use_autogen=False to ensure it works without AutoGen
-    result = analyze_project(sample_csv, use_llm=False, use_autogen=False)
+@pytest.mark.parametrize("preds, min_independent, complex_count", [
+    ([None, None, None], 3, 0),                      # no dependencies at all
+    ([None, None, '1,2', '1,2,3', '2,3,4'], 2, 3),   # tasks 3-5 have multiple predecessors
+])
+def test_metrics_predecessor_formats(make_project_df, preds, min_independent, complex_count):
+    """Test dependency and complexity counts across predecessor formats"""
+    metrics = calculate_project_metrics(make_project_df(preds=preds))
    
-    # Should still succeed with metrics only
-    assert result['status'] == 'success'
-    assert 'metrics' in result
+    assert metrics['total_tasks'] == len(preds)
+    assert metrics['num_independent'] >= min_independent
+    assert metrics['num_independent'] + metrics['num_dependencies'] == len(preds)
+    assert metrics['complex_task_count'] == complex_count
  
  
-def test_metrics_with_no_dependencies(sample_df):
-    """Test metrics when no tasks have dependencies"""
-    df_no_deps = sample_df.copy()
-    df_no_deps['Predecessors'] = None
-   
-    metrics = calculate_project_metrics(df_no_deps)
+@pytest.mark.parametrize("blank", [pd.NA, '', '  '])
+def test_blank_predecessors_count_as_none(make_project_df, blank):
+    """Test NaN, empty and whitespace predecessors give the same metrics as None"""
+    baseline = calculate_project_metrics(make_project_df(preds=[None, None, '1']))
+    metrics = calculate_project_metrics(make_project_df(preds=[None, blank, '1']))
    
-    assert metrics['num_dependencies'] == 0
-    assert metrics['num_independent'] == 3
+    assert metrics == baseline
  
  
-def test_metrics_with_all_high_risk(sample_df):
-    """Test metrics when all tasks are high risk"""
-    df_high_risk = sample_df.copy()
-    df_high_risk['Risk_Level'] = 'High'
-   
-    metrics = calculate_project_metrics(df_high_risk)
-   
-    assert metrics['high_risk_count'] == 3
-    assert metrics['med_risk_count'] == 0
-    assert metrics['low_risk_count'] == 0
- 
- 
-def test_metrics_overloaded_resources():
-    """Test detection of overloaded resources"""
-    df = pd.DataFrame({
-        'Task_ID': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
-        'Task_Name': ['T1', 'T2', 'T3', 'T4', 'T5', 'T6', 'T7', 'T8', 'T9', 'T10'],
-        'Duration_Days': [10, 10, 10, 10, 10, 10, 10, 10, 10, 10],
-        'Resource_Name': ['Alice', 'Alice', 'Alice', 'Alice', 'Alice', 'Alice', 'Bob', 'Bob', 'Charlie', 'Charlie'],
-        'Cost_Per_Day': [500, 500, 500, 500, 500, 500, 600, 600, 550, 550],
-        'Risk_Level': ['Low', 'Low', 'Low', 'Low', 'Low', 'Low', 'Low', 'Low', 'Low', 'Low'],
-        'Predecessors': [None, None, None, None, None, None, None, None, None, None]
-    })
+@pytest.mark.parametrize("risks, expected", [
+    (['High', 'High', 'High'], (3, 0, 0)),
+    (['High', 'High', 'Med', 'Med', 'Low', 'Low'], (2, 2, 2)),
+])
+def test_metrics_risk_counts(make_project_df, risks, expected):
+    """Test high/med/low risk counts, all high and all levels represented"""
+    metrics = calculate_project_metrics(make_project_df(risks=risks))
    
-    metrics = calculate_project_metrics(df)
-   
-    # Alice has 6 tasks, Bob has 2, Charlie has 2 - avg is 3.33, overloaded threshold is 5.0
-    # Alice with 6 tasks should be overloaded (6 > 5.0)
-    assert len(metrics['overloaded_resources']) > 0
-    assert metrics['overloaded_resources']['Resource'].iloc[0] == 'Alice'
- 
- 
-def test_metrics_underutilized_resources():
-    """Test detection of underutilized resources"""
-    df = pd.DataFrame({
-        'Task_ID': [1, 2, 3, 4, 5, 6, 7, 8, 9],
-        'Task_Name': ['T1', 'T2', 'T3', 'T4', 'T5', 'T6', 'T7', 'T8', 'T9'],
-        'Duration_Days': [10, 10, 10, 10, 10, 10, 10, 10, 10],
-        'Resource_Name': ['Alice', 'Alice', 'Alice', 'Alice', 'Bob', 'Charlie', 'Charlie', 'Charlie', 'Charlie'],
-        'Cost_Per_Day': [500, 500, 500, 500, 600, 550, 550, 550, 550],
-        'Risk_Level': ['Low', 'Low', 'Low', 'Low', 'Low', 'Low', 'Low', 'Low', 'Low'],
-        'Predecessors': [None, None, None, None, None, None, None, None, None]
-    })
-   
-    metrics = calculate_project_metrics(df)
+    assert (metrics['high_risk_count'], metrics['med_risk_count'], metrics['low_risk_count']) == expected
+    assert metrics['total_tasks'] == len(risks)
+ 
+ 
+@pytest.mark.parametrize("resources, key, flagged", [
+    # Alice 6, Bob 2, Charlie 2 tasks: avg 3.33, Alice above the 5.0 overload threshold
+    (['Alice'] * 6 + ['Bob'] * 2 + ['Charlie'] * 2, 'overloaded_resources', 'Alice'),
+    # Alice 4, Bob 1, Charlie 4 tasks: avg 3.0, Bob below the 1.5 underutilized threshold
+    (['Alice'] * 4 + ['Bob'] + ['Charlie'] * 4, 'underutilized_resources', 'Bob'),
+])
+def test_metrics_resource_load(make_project_df, resources, key, flagged):
+    """Test detection of overloaded and underutilized resources"""
+    metrics = calculate_project_metrics(make_project_df(resources=resources))
    
-    # Alice has 4 tasks, Bob has 1, Charlie has 4 - avg is 3.0, underutilized threshold is 1.5
-    # Bob with 1 task should be underutilized (1 < 1.5)
-    assert len(metrics['underutilized_resources']) > 0
-    assert metrics['underutilized_resources']['Resource'].iloc[0] == 'Bob'
+    assert len(metrics[key]) > 0
+    assert metrics[key][0]['Resource'] == flagged
  
  
 def test_analyze_project_invalid_csv():
@@ -162,23 +126,13 @@ def test_analyze_project_invalid_csv():
     assert 'error_message' in result
  
  
-def test_metrics_total_cost_calculation(sample_df):
+def test_metrics_total_cost_calculation(sample_metrics):
     """Test total cost calculation"""
-    metrics = calculate_project_metrics(sample_df)
-   
     expected_cost = (10*500) + (15*600) + (8*500)  # Duration * Cost_Per_Day
-    assert metrics['total_cost'] == expected_cost
- 
- 
-def test_analyze_project_with_autogen_import_error(sample_csv):
-    """Test handling when AutoGen import fails"""
-    result = analyze_project(sample_csv, use_llm=False, use_autogen=True)
-   
-    # Should still succeed with just metrics
-    assert result['status'] == 'success'
-    assert 'metrics' in result
+    assert sample_metrics['total_cost'] == expected_cost
  
  
+@pytest.mark.slow
 def test_analyze_project_with_llm_enabled(sample_csv):
     """Test project analysis with LLM enabled but no token"""
     result = analyze_project(sample_csv, use_llm=True, use_autogen=False)
@@ -188,32 +142,6 @@ def test_analyze_project_with_llm_enabled(sample_csv):
     assert 'metrics' in result
  
  
-def test_build_report_no_analysis(sample_df):
-    """Test building report with only metrics"""
-    metrics = calculate_project_metrics(sample_df)
-    report = build_report(metrics, None, None)
-   
-    assert 'PROJECT METRICS SUMMARY' in report
-    assert str(metrics['total_tasks']) in report
- 
- 
-def test_calculate_metrics_with_nan_predecessors():
-    """Test metrics calculation with NaN predecessors"""
-    df = pd.DataFrame({
-        'Task_ID': [1, 2, 3],
-        'Task_Name': ['T1', 'T2', 'T3'],
-        'Duration_Days': [5, 5, 5],
-        'Resource_Name': ['Alice', 'Bob', 'Alice'],
-        'Cost_Per_Day': [500, 600, 500],
-        'Risk_Level': ['Low', 'Med', 'High'],
-        'Predecessors': [pd.NA, None, '']
-    })
-   
-    metrics = calculate_project_metrics(df)
-    assert metrics['num_independent'] >= 2
-    assert metrics['complex_task_count'] == 0
- 
- 
 def test_analyze_project_file_error():
     """Test handling when CSV file has read errors"""
     result = analyze_project("nonexistent_file.csv", use_llm=False, use_autogen=False)
@@ -222,106 +150,64 @@ def test_analyze_project_file_error():
     assert 'File not found' in result['error_message'] or 'Analysis failed' in result['error_message']
  
  
-def test_analyze_project_success_path(sample_csv):
-    """Test successful project analysis without LLM"""
-    result = analyze_project(sample_csv, use_llm=False, use_autogen=False)
-   
-    assert result['status'] == 'success'
-    assert 'metrics' in result
-    assert 'analysis_results' in result
-    assert 'timestamp' in result
- 
- 
-def test_calculate_metrics_all_risk_levels():
-    """Test metrics with all different risk levels represented"""
-    df = pd.DataFrame({
-        'Task_ID': [1, 2, 3, 4, 5, 6],
-        'Task_Name': ['T1', 'T2', 'T3', 'T4', 'T5', 'T6'],
-        'Duration_Days': [10, 10, 10, 10, 10, 10],
-        'Resource_Name': ['Alice', 'Bob', 'Alice', 'Bob', 'Alice', 'Bob'],
-        'Cost_Per_Day': [500, 600, 500, 600, 500, 600],
-        'Risk_Level': ['High', 'High', 'Med', 'Med', 'Low', 'Low'],
-        'Predecessors': [None, None, '1', '2', '3', '4']
-    })
-   
-    metrics = calculate_project_metrics(df)
-   
-    assert metrics['high_risk_count'] == 2
-    assert metrics['med_risk_count'] == 2
-    assert metrics['low_risk_count'] == 2
-    assert metrics['total_tasks'] == 6
+def test_analyze_project_success_path(analysis_noai):
+    """Test successful project analysis with metrics only"""
+    assert analysis_noai['status'] == 'success'
+    assert 'metrics' in analysis_noai
+    assert 'analysis_results' in analysis_noai
+    assert 'timestamp' in analysis_noai
  
  
+@pytest.mark.slow
 def test_analyze_project_with_autogen_enabled(sample_csv):
     """Test analysis with autogen enabled but falling back gracefully"""
     result = analyze_project(sample_csv, use_llm=False, use_autogen=True)
    
-    # Should work even if AutoGen not available
+    # Should succeed with just metrics even if AutoGen is unavailable
     assert result['status'] == 'success'
     assert 'metrics' in result
  
  
-def test_build_report_metrics_formatting(sample_df):
-    """Test that report formats metrics correctly"""
-    metrics = calculate_project_metrics(sample_df)
-    report = build_report(metrics, None, None)
-   
-    # Check for key metric values in report
-    assert str(metrics['total_tasks']) in report
-    assert str(metrics['num_resources']) in report
- 
- 
-def test_complex_tasks_detection():
-    """Test detection of tasks with multiple dependencies"""
-    df = pd.DataFrame({
-        'Task_ID': [1, 2, 3, 4, 5],
-        'Task_Name': ['T1', 'T2', 'T3', 'T4', 'T5'],
-        'Duration_Days': [5, 5, 5, 5, 5],
-        'Resource_Name': ['Alice', 'Bob', 'Alice', 'Bob', 'Alice'],
-        'Cost_Per_Day': [500, 600, 500, 600, 500],
-        'Risk_Level': ['Low', 'Low', 'Med', 'High', 'Med'],
-        'Predecessors': [None, None, '1,2', '1,2,3', '2,3,4']
-    })
+@pytest.fixture
+def agents_autogen():
+    """The agents_autogen module; skips the test when pyautogen is not installed"""
+    return pytest.importorskip("agents_autogen")
+ 
+ 
+class StubAgents:
+    """Stand-in for ProjectManagementAgents with a fixed multi-agent reply"""
+    reply = "Mocked AutoGen Analysis"
    
-    metrics = calculate_project_metrics(df)
+    def analyze_with_metrics(self, metrics):
+        return self.reply
+ 
+ 
+class FailingAgents:
+    """Stand-in for ProjectManagementAgents whose construction fails"""
    
-    # Tasks 3, 4, 5 have multiple predecessors (complexity > 1)
-    assert metrics['complex_task_count'] >= 3
+    def __init__(self):
+        raise RuntimeError("AutoGen failed")
  
  
-@patch('agents_autogen.ProjectManagementAgents')
-def test_analyze_with_autogen_success(mock_agents, sample_csv):
+def test_analyze_with_autogen_success(monkeypatch, agents_autogen, sample_csv):
     """Test successful AutoGen analysis"""
-    try:
-        from agents_simple import analyze_project
-       
-        # Mock successful AutoGen analysis
-        mock_instance = MagicMock()
-        mock_instance.analyze_with_metrics.return_value = "Mocked AutoGen Analysis"
-        mock_agents.return_value = mock_instance
-       
-        result = analyze_project(sample_csv, use_llm=False, use_autogen=True)
-       
-        assert result['status'] == 'success'
-    except ImportError:
-        pytest.skip("AutoGen not available")
- 
- 
-@patch('agents_autogen.ProjectManagementAgents')
-def test_analyze_with_autogen_exception(mock_agents, sample_csv):
+    monkeypatch.setattr(agents_autogen, 'ProjectManagementAgents', StubAgents)
+   
+    result = analyze_project(sample_csv, use_llm=False, use_autogen=True)
+   
+    assert result['status'] == 'success'
+    assert StubAgents.reply in result['analysis_results']
+ 
+ 
+def test_analyze_with_autogen_exception(monkeypatch, agents_autogen, sample_csv):
     """Test AutoGen exception handling"""
-    try:
-        from agents_simple import analyze_project
-       
-        # Make AutoGen raise an exception
-        mock_agents.side_effect = Exception("AutoGen failed")
-       
-        result = analyze_project(sample_csv, use_llm=False, use_autogen=True)
-       
-        # Should still succeed with metrics only
-        assert result['status'] == 'success'
-    except ImportError:
-        pytest.skip("AutoGen not available")
+    monkeypatch.setattr(agents_autogen, 'ProjectManagementAgents', FailingAgents)
+   
+    result = analyze_project(sample_csv, use_llm=False, use_autogen=True)
+   
+    # Should still succeed with metrics only
+    assert result['status'] == 'success'
+    assert 'AI ANALYSIS NOT AVAILABLE' in result['analysis_results']
  
  
 def test_analyze_corrupted_csv(tmp_path):
@@ -338,54 +224,23 @@ def test_analyze_corrupted_csv(tmp_path):
     assert 'error_message' in result
  
  
-def test_metrics_with_empty_predecessors():
-    """Test metrics with various empty predecessor formats"""
-    df = pd.DataFrame({
-        'Task_ID': [1, 2, 3, 4],
-        'Task_Name': ['T1', 'T2', 'T3', 'T4'],
-        'Duration_Days': [5, 5, 5, 5],
-        'Resource_Name': ['Alice', 'Bob', 'Alice', 'Bob'],
-        'Cost_Per_Day': [500, 600, 500, 600],
-        'Risk_Level': ['Low', 'Med', 'High', 'Low'],
-        'Predecessors': [None, '', '  ', pd.NA]
-    })
-   
-    metrics = calculate_project_metrics(df)
-   
-    # All should be considered independent
-    assert metrics['num_independent'] >= 2
-    assert metrics['total_tasks'] == 4
- 
- 
-def test_resource_stats_calculation(sample_df):
+def test_resource_stats_calculation(sample_metrics):
     """Test resource statistics calculation"""
-    metrics = calculate_project_metrics(sample_df)
-   
-    assert 'resource_stats' in metrics
-    assert len(metrics['resource_stats']) > 0
-    assert 'avg_tasks_per_resource' in metrics
-    assert metrics['avg_tasks_per_resource'] > 0
-    
-def test_build_report_with_all_data(sample_df):
-    """Test build_report with both AutoGen and simple analysis"""
-    metrics = calculate_project_metrics(sample_df)
-    autogen_result = "AutoGen analysis complete"
-    simple_result = "Simple analysis complete"
-   
-    report = build_report(metrics, autogen_result, simple_result)
-   
-    # Should prioritize AutoGen
-    assert 'PROJECT METRICS SUMMARY' in report
-    assert autogen_result in report
-   
+    assert 'resource_stats' in sample_metrics
+    assert len(sample_metrics['resource_stats']) > 0
+    assert 'avg_tasks_per_resource' in sample_metrics
+    assert sample_metrics['avg_tasks_per_resource'] > 0
+ 
  
-def test_dataframe_in_metrics(sample_df):
-    """Test that metrics include the dataframe"""
+def test_metrics_are_plain_data(sample_df):
+    """Test that metrics hold no DataFrames and leave the input untouched"""
+    columns = list(sample_df.columns)
     metrics = calculate_project_metrics(sample_df)
    
-    assert 'dataframe' in metrics
-    assert isinstance(metrics['dataframe'], pd.DataFrame)
-    assert len(metrics['dataframe']) == len(sample_df)
+    assert 'dataframe' not in metrics
+    assert not any(isinstance(value, pd.DataFrame) for value in metrics.values())
+    assert isinstance(metrics['resource_stats'], list)
+    assert list(sample_df.columns) == columns
  
  
 if __name__ == "__main__":
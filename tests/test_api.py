@@ -4,10 +4,48 @@ Tests FastAPI application structure and endpoints
 """
  
 import pytest
-import sys
+import asyncio
+import io
 import os
+from unittest.mock import patch
  
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+ 
+DATA_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'dummy_data.csv')
+ 
+ 
+def make_upload(path=DATA_CSV, filename='project.csv'):
+    """Build an UploadFile the way FastAPI hands it to endpoints"""
+    from fastapi import UploadFile
+    with open(path, 'rb') as f:
+        return UploadFile(file=io.BytesIO(f.read()), filename=filename)
+ 
+ 
+def make_csv_upload(path=DATA_CSV):
+    """Resolve the shared csv_upload dependency for direct endpoint calls"""
+    from api import csv_upload
+    return asyncio.run(csv_upload(make_upload(path)))
+ 
+ 
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Each test starts without cached API responses"""
+    from api import RESPONSE_CACHE
+    RESPONSE_CACHE.clear()
+    yield
+    RESPONSE_CACHE.clear()
+ 
+ 
+@pytest.fixture(scope="module")
+def app():
+    """The FastAPI application, imported once per module"""
+    return pytest.importorskip("api").app
+ 
+ 
+@pytest.fixture(scope="module")
+def models():
+    """The AnalysisRequest and AnalysisResponse pydantic models"""
+    api = pytest.importorskip("api")
+    return api.AnalysisRequest, api.AnalysisResponse
  
  
 def test_api_imports():
@@ -19,93 +57,637 @@ def test_api_imports():
         pytest.fail(f"Failed to import api: {e}")
  
  
-def test_api_has_fastapi_instance():
+def test_api_has_fastapi_instance(app):
     """Test that app is a FastAPI instance"""
-    from api import app
     from fastapi import FastAPI
     assert isinstance(app, FastAPI)
  
  
-def test_api_routes_exist():
-    """Test that required routes are defined"""
-    from api import app
-   
-    routes = [route.path for route in app.routes]
-   
-    # Check that essential routes exist
-    assert "/" in routes or any("/" in r for r in routes)
-    assert any("health" in r for r in routes)
-    assert any("analyze" in r for r in routes)
+@pytest.fixture(scope="module")
+def routes(app):
+    """Route path -> endpoint name, collected once from the app"""
+    return {route.path: getattr(route, 'name', None) for route in app.routes}
+ 
+ 
+@pytest.mark.parametrize("path", ['/', '/health', '/analyze', '/optimize', '/simulate'])
+def test_api_routes_exist(routes, path):
+    """Test that required routes are defined with a named endpoint"""
+    assert path in routes
+    assert routes[path]
  
  
-def test_api_cors_middleware():
+def test_api_cors_middleware(app):
     """Test that CORS middleware is configured"""
-    from api import app
-   
     # Should have middleware configured
     assert hasattr(app, 'middleware')
  
  
-def test_api_models_defined():
-    """Test that Pydantic models are defined"""
-    try:
-        from api import AnalysisRequest, AnalysisResponse
-        assert AnalysisRequest is not None
-        assert AnalysisResponse is not None
-    except ImportError:
-        # Models might be defined inline
-        pass
+def test_api_gzip_middleware(app):
+    """Test large responses are gzip-compressed for clients that accept it"""
+    import gzip
+    from fastapi.middleware.gzip import GZipMiddleware
+    from starlette.responses import Response
+   
+    middleware = next(m for m in app.user_middleware if m.cls is GZipMiddleware)
+    assert middleware.kwargs['minimum_size'] == 1024
+   
+    body = b'{"values": [' + b'1.5, ' * 1000 + b'1.5]}'
+    sent = []
+   
+    async def run():
+        async def inner(scope, receive, send):
+            await Response(body, media_type='application/json')(scope, receive, send)
+       
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+       
+        async def send(message):
+            sent.append(message)
+       
+        scope = {'type': 'http', 'method': 'GET', 'path': '/', 'headers': [(b'accept-encoding', b'gzip')]}
+        await GZipMiddleware(inner, **middleware.kwargs)(scope, receive, send)
+   
+    asyncio.run(run())
+    headers = dict(sent[0]['headers'])
+    compressed = b''.join(m.get('body', b'') for m in sent[1:])
+   
+    assert headers[b'content-encoding'] == b'gzip'
+    assert gzip.decompress(compressed) == body
  
  
-def test_api_endpoints_defined():
-    """Test that endpoint functions exist"""
-    from api import app
+def test_health_check_access_log_filtered():
+    """Test uvicorn access-log lines for /health are dropped, others kept"""
+    import logging
+    from api import HealthCheckLogFilter
    
-    # Get all route names
-    route_names = [route.name for route in app.routes if hasattr(route, 'name')]
+    def access_record(path):
+        return logging.LogRecord('uvicorn.access', logging.INFO, __file__, 0,
+                                 '%s - "%s %s HTTP/%s" %d',
+                                 ('127.0.0.1:5000', 'GET', path, '1.1', 200), None)
    
-    # Should have multiple endpoints
-    assert len(route_names) > 0
+    log_filter = HealthCheckLogFilter()
+    assert not log_filter.filter(access_record('/health'))
+    assert not log_filter.filter(access_record('/health?probe=1'))
+    assert log_filter.filter(access_record('/analyze'))
+    assert any(isinstance(f, HealthCheckLogFilter) for f in logging.getLogger('uvicorn.access').filters)
  
  
-def test_analysis_request_model():
+def test_health_timestamp_formatted_once_per_second():
+    """Test /health reuses the formatted timestamp within the same second"""
+    import api
+   
+    with patch('api.time.time', return_value=1_700_000_000.2):
+        first = api.health_timestamp()
+        body = asyncio.run(api.health_check())
+    with patch('api.time.time', return_value=1_700_000_001.0):
+        later = api.health_timestamp()
+   
+    assert body['timestamp'] is first
+    assert later != first
+    assert first.startswith('2023-11-1')
+ 
+ 
+def test_api_models_defined(models):
+    """Test that Pydantic models are defined"""
+    AnalysisRequest, AnalysisResponse = models
+    assert AnalysisRequest is not None
+    assert AnalysisResponse is not None
+ 
+ 
+def test_analysis_request_model(models):
     """Test AnalysisRequest model structure"""
-    try:
-        from api import AnalysisRequest
-       
-        # Create instance with defaults
-        request = AnalysisRequest()
-       
-        # Should have expected fields
-        assert hasattr(request, 'use_llm')
-        assert hasattr(request, 'use_autogen')
-    except (ImportError, TypeError):
-        # Model might not be importable or have different structure
-        pass
+    AnalysisRequest, _ = models
+   
+    # Create instance with defaults
+    request = AnalysisRequest()
+   
+    # Should have expected fields
+    assert hasattr(request, 'use_llm')
+    assert hasattr(request, 'use_autogen')
  
  
-def test_analysis_response_model():
+def test_analysis_response_model(models):
     """Test AnalysisResponse model structure"""
-    try:
-        from api import AnalysisResponse
-       
-        # Should be a valid Pydantic model
-        from pydantic import BaseModel
-        assert issubclass(AnalysisResponse, BaseModel)
-    except (ImportError, TypeError):
-        # Model might not be importable
-        pass
+    from pydantic import BaseModel
+    _, AnalysisResponse = models
+   
+    # Should be a valid Pydantic model
+    assert issubclass(AnalysisResponse, BaseModel)
  
  
-def test_api_title_and_description():
-    """Test that API has title and description"""
-    from api import app
+def test_analysis_response_is_documentation_only(app):
+    """Test /analyze documents AnalysisResponse without validating against it"""
+    route = next(r for r in app.routes if getattr(r, 'path', None) == '/analyze')
+    schema = app.openapi()['paths']['/analyze']['post']['responses']['200']
    
+    assert route.response_model is None
+    assert 'AnalysisResponse' in str(schema)
+ 
+ 
+def test_num_simulations_bounds_in_schema(app):
+    """Test /simulate declares its num_simulations limits on the parameter"""
+    paths = app.openapi()['paths']
+    param = next(p for p in paths['/simulate']['post']['parameters'] if p['name'] == 'num_simulations')
+    assert param['schema']['minimum'] == 100
+    assert param['schema']['maximum'] == 100_000
+    assert param['schema']['default'] == 1000
+ 
+ 
+def test_analyze_checks_num_simulations_only_when_simulating():
+    """Test /analyze ignores num_simulations unless the simulation is enabled"""
+    import json
+    from fastapi import HTTPException
+    import api
+   
+    response = asyncio.run(api.analyze_project_endpoint(
+        upload=make_csv_upload(), use_llm=False, use_autogen=False,
+        enable_optimization=False, enable_simulation=False, num_simulations=50
+    ))
+    assert json.loads(response.body)['status'] == 'success'
+   
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(api.analyze_project_endpoint(
+            upload=make_csv_upload(), use_llm=False, use_autogen=False,
+            enable_optimization=False, enable_simulation=True, num_simulations=50
+        ))
+    assert exc_info.value.status_code == 422
+ 
+ 
+def test_api_title_and_description(app):
+    """Test that API has title and description"""
     assert hasattr(app, 'title')
     assert hasattr(app, 'description')
     assert len(app.title) > 0
  
  
+def test_analyze_endpoint_parses_upload_once():
+    """Test /analyze reads the CSV once and shares it with every sub-analysis"""
+    import json
+    import api
+   
+    with patch.object(api, 'read_project_csv', wraps=api.read_project_csv) as read_csv:
+        response = asyncio.run(api.analyze_project_endpoint(
+            upload=make_csv_upload(), use_llm=False, use_autogen=False,
+            enable_optimization=True, enable_simulation=True, num_simulations=100
+        ))
+    body = json.loads(response.body)
+   
+    assert read_csv.call_count == 1
+    assert body['status'] == 'success'
+    assert body['metrics']['total_tasks'] == 21
+    assert body['optimization']['status'] == 'success'
+    assert body['simulation']['status'] == 'success'
+ 
+ 
+def test_analyze_endpoint_low_memory():
+    """Test low_memory analysis streams the upload and skips the full parse"""
+    import json
+    import api
+   
+    full = asyncio.run(api.analyze_project_endpoint(
+        upload=make_csv_upload(), use_llm=False, use_autogen=False
+    ))
+    # The cached full-parse response must not be served for low_memory
+    with patch.object(api, 'read_upload_csv') as read_upload, \
+         patch.object(api, 'analyze_upload_chunked', wraps=api.analyze_upload_chunked) as chunked, \
+         patch.object(api, 'CSV_CHUNK_ROWS', 5):
+        low_memory = asyncio.run(api.analyze_project_endpoint(
+            upload=make_csv_upload(), use_llm=False, use_autogen=False, low_memory=True
+        ))
+   
+    read_upload.assert_not_called()
+    chunked.assert_called_once()
+    assert json.loads(low_memory.body)['metrics'] == json.loads(full.body)['metrics']
+ 
+ 
+def test_analyze_endpoint_runs_sub_analyses_concurrently():
+    """Test analysis, optimization and simulation overlap instead of running in sequence"""
+    import json
+    import threading
+    import api
+   
+    barrier = threading.Barrier(3, timeout=5)
+   
+    def meets_others(result):
+        def run(*args, **kwargs):
+            barrier.wait()
+            return result
+        return run
+   
+    analysis = {'status': 'success', 'timestamp': 'now', 'metrics': {}}
+    with patch.object(api, 'analyze_project_df', meets_others(analysis)), \
+         patch.object(api, 'optimize_resources', meets_others({'status': 'success'})), \
+         patch.object(api, 'simulate_project_risk', meets_others({'status': 'success'})), \
+         patch.object(api.app.state, 'cpu_semaphore', asyncio.Semaphore(2), create=True):
+        response = asyncio.run(api.analyze_project_endpoint(
+            upload=make_csv_upload(), enable_optimization=True,
+            enable_simulation=True, num_simulations=100
+        ))
+    body = json.loads(response.body)
+   
+    assert body['optimization'] == {'status': 'success'}
+    assert body['simulation'] == {'status': 'success'}
+ 
+ 
+def test_analyze_endpoint_low_memory_with_simulation():
+    """Test low_memory still parses the full table when simulation needs it"""
+    import json
+    import api
+    from api import CSVUpload
+   
+    upload = CSVUpload(file=make_upload(), digest='spooled')
+    response = asyncio.run(api.analyze_project_endpoint(
+        upload=upload, use_llm=False, use_autogen=False,
+        enable_simulation=True, num_simulations=100, low_memory=True
+    ))
+    body = json.loads(response.body)
+   
+    assert body['metrics']['total_tasks'] == 21
+    assert body['simulation']['status'] == 'success'
+ 
+ 
+def test_read_upload_csv():
+    """Test uploads are parsed with the project dtypes"""
+    import pandas as pd
+    from api import read_upload_csv
+   
+    df = asyncio.run(read_upload_csv(make_csv_upload()))
+   
+    assert len(df) == 21
+    assert 'Resource_Name' in df.columns
+    assert str(df['Duration_Days'].dtype) == 'float64'
+    assert isinstance(df['Risk_Level'].dtype, pd.CategoricalDtype)
+ 
+ 
+def test_json_response_handles_numpy_and_pandas():
+    """Test orjson response encodes numpy, pandas and dataclass values"""
+    import json
+    import numpy as np
+    import pandas as pd
+    from dataclasses import dataclass
+    from api import json_response
+   
+    @dataclass
+    class Result:
+        mean: float
+   
+    response = json_response({
+        'count': np.int64(3),
+        'values': np.array([1.5, 2.5]),
+        'series': pd.Series([1, 2]),
+        'frame': pd.DataFrame({'a': [1]}),
+        'when': pd.Timestamp('2025-01-01'),
+        'result': Result(mean=np.float64(1.0)),
+        1: 'non-string key'
+    })
+    body = json.loads(response.body)
+   
+    assert response.media_type == 'application/json'
+    assert body['count'] == 3
+    assert body['values'] == [1.5, 2.5]
+    assert body['series'] == [1, 2]
+    assert body['frame'] == [{'a': 1}]
+    assert body['when'].startswith('2025-01-01')
+    assert body['result'] == {'mean': 1.0}
+    assert body['1'] == 'non-string key'
+ 
+ 
+def test_simulate_endpoint_returns_json():
+    """Test /simulate serializes the SimulationResult dataclass"""
+    import json
+    from api import simulate_endpoint
+   
+    response = asyncio.run(simulate_endpoint(upload=make_csv_upload(), num_simulations=100))
+    body = json.loads(response.body)
+   
+    assert body['status'] == 'success'
+    assert body['simulation_result']['mean_duration'] > 0
+ 
+ 
+def test_optimize_endpoint_runs_off_event_loop():
+    """Test the LP solve is dispatched to the thread pool"""
+    import json
+    import threading
+    import api
+   
+    calls = {}
+    real_optimize = api.optimize_resources
+   
+    def recording_optimize(df, **options):
+        calls['thread'] = threading.current_thread()
+        calls['options'] = options
+        return real_optimize(df, **options)
+   
+    with patch.object(api, 'optimize_resources', recording_optimize):
+        response = asyncio.run(api.optimize_endpoint(upload=make_csv_upload()))
+   
+    assert json.loads(response.body)['status'] == 'success'
+    assert calls['thread'] is not threading.main_thread()
+    assert calls['options'] == {'threads': api.SOLVER_THREADS}
+ 
+ 
+def test_upload_digest_is_content_hash():
+    """Test the upload hash depends only on content and leaves the file rewound"""
+    import api
+   
+    upload = make_upload()
+    with patch.object(api, 'UPLOAD_CHUNK_SIZE', 64):
+        chunked, _ = asyncio.run(api.upload_digest(upload))
+    whole, _ = asyncio.run(api.upload_digest(make_upload(filename='other.csv')))
+   
+    assert chunked == whole
+    assert upload.file.tell() == 0
+ 
+ 
+def test_upload_digest_keeps_small_uploads_in_memory():
+    """Test uploads under the limit are buffered while hashing, larger ones are not"""
+    import api
+   
+    with open(DATA_CSV, 'rb') as f:
+        content = f.read()
+   
+    with patch.object(api, 'UPLOAD_CHUNK_SIZE', 64):
+        _, small = asyncio.run(api.upload_digest(make_upload(), keep_limit=len(content)))
+        _, large = asyncio.run(api.upload_digest(make_upload(), keep_limit=len(content) - 1))
+    _, disabled = asyncio.run(api.upload_digest(make_upload()))
+   
+    assert small.read() == content
+    assert large is None
+    assert disabled is None
+ 
+ 
+def test_read_upload_csv_from_spooled_file():
+    """Test large uploads (no in-memory copy) are parsed from the spooled file"""
+    from api import CSVUpload, read_upload_csv
+   
+    df = asyncio.run(read_upload_csv(CSVUpload(file=make_upload(), digest='x')))
+   
+    assert len(df) == 21
+ 
+ 
+def test_response_cache_lru_and_ttl():
+    """Test the response cache evicts least recently used and expired entries"""
+    from api import ResponseCache
+   
+    cache = ResponseCache(max_size=2, ttl=60)
+    cache.set('a', b'1')
+    cache.set('b', b'2')
+    cache.get('a')
+    cache.set('c', b'3')
+   
+    assert cache.get('a') == b'1'
+    assert cache.get('b') is None
+    assert len(cache) == 2
+   
+    with patch('api.time.monotonic', return_value=10 ** 9):
+        assert cache.get('a') is None
+    assert len(cache) == 1
+ 
+ 
+def test_response_cache_key_includes_params():
+    """Test cache keys differ per endpoint and parameter values"""
+    from api import ResponseCache
+   
+    key = ResponseCache.make_key('simulate', 'abc', num_simulations=100)
+   
+    assert key != ResponseCache.make_key('simulate', 'abc', num_simulations=200)
+    assert key != ResponseCache.make_key('optimize', 'abc')
+    assert key == ResponseCache.make_key('simulate', 'abc', num_simulations=100)
+ 
+ 
+def test_repeated_upload_served_from_cache():
+    """Test posting the same CSV twice skips parsing and the solver"""
+    import api
+   
+    first = asyncio.run(api.optimize_endpoint(upload=make_csv_upload()))
+    with patch.object(api, 'read_upload_csv') as read_upload, \
+         patch.object(api, 'optimize_resources') as optimize:
+        second = asyncio.run(api.optimize_endpoint(upload=make_csv_upload()))
+   
+    assert second.body == first.body
+    read_upload.assert_not_called()
+    optimize.assert_not_called()
+ 
+ 
+def test_failed_results_not_cached():
+    """Test error results are recomputed on the next request"""
+    import api
+   
+    with patch.object(api, 'optimize_resources', return_value={'status': 'error'}):
+        asyncio.run(api.optimize_endpoint(upload=make_csv_upload()))
+   
+    assert len(api.RESPONSE_CACHE) == 0
+ 
+ 
+def test_looks_like_csv():
+    """Test uploads are validated by content rather than by filename"""
+    from api import looks_like_csv
+   
+    assert looks_like_csv(b'Task_ID,Task_Name\n1,Design\n')
+    assert looks_like_csv('\ufeffA,B\n1,é'.encode('utf-8')[:-1])
+    assert not looks_like_csv(b'')
+    assert not looks_like_csv(b'%PDF-1.7\x00\x01')
+    assert not looks_like_csv(b'just some text')
+    assert not looks_like_csv(b'\xff\xfe,broken\n' + b'x' * 10)
+ 
+ 
+def test_csv_upload_rejects_non_csv(tmp_path):
+    """Test the shared dependency rejects binary uploads with a 400"""
+    from fastapi import HTTPException
+    from api import csv_upload
+   
+    fake = tmp_path / 'fake.csv'
+    fake.write_bytes(b'\x89PNG\r\n\x1a\n\x00\x00')
+   
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(csv_upload(make_upload(str(fake))))
+    assert exc_info.value.status_code == 400
+ 
+ 
+def test_csv_upload_accepts_any_filename():
+    """Test a valid CSV is accepted and hashed whatever its name"""
+    from api import csv_upload, upload_digest
+   
+    upload = asyncio.run(csv_upload(make_upload(filename='export.txt')))
+   
+    assert upload.digest == asyncio.run(upload_digest(make_upload()))[0]
+ 
+ 
+@pytest.fixture
+def fractional_csv(tmp_path):
+    """A project CSV with fractional durations and no Task_Name column"""
+    path = tmp_path / 'fractional.csv'
+    path.write_bytes(b"Task_ID,Duration_Days,Resource_Name,Cost_Per_Day,Predecessors,Risk_Level\n"
+                     b"1,5.5,Alice,500,,High\n"
+                     b"2,3,Bob,400,1,Low\n")
+    return str(path)
+ 
+ 
+def test_simulate_endpoint_reads_only_simulator_columns(fractional_csv):
+    """Test /simulate accepts fractional durations and a CSV without Task_Name"""
+    import json
+    import api
+   
+    response = asyncio.run(api.simulate_endpoint(upload=make_csv_upload(fractional_csv), num_simulations=100))
+    body = json.loads(response.body)
+   
+    assert body['status'] == 'success'
+    assert body['baseline_duration'] == 8.5
+ 
+ 
+def test_invalid_project_csv_is_bad_request(fractional_csv, tmp_path):
+    """Test missing columns and unparsable values give 400, not 500"""
+    from fastapi import HTTPException
+    import api
+   
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(api.optimize_endpoint(upload=make_csv_upload(fractional_csv)))
+    assert exc_info.value.status_code == 400
+    assert 'Task_Name' in exc_info.value.detail
+   
+    broken = tmp_path / 'broken.csv'
+    broken.write_bytes(b"Task_ID,Duration_Days,Resource_Name,Cost_Per_Day,Predecessors,Risk_Level\n"
+                       b"1,soon,Alice,500,,High\n")
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(api.simulate_endpoint(upload=make_csv_upload(str(broken)), num_simulations=100))
+    assert exc_info.value.status_code == 400
+ 
+ 
+def test_cpu_bound_work_is_bounded():
+    """Test concurrent solves never exceed the CPU semaphore"""
+    import time
+    import threading
+    import api
+   
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+   
+    def solve():
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.02)
+        with lock:
+            state['running'] -= 1
+   
+    async def burst():
+        with patch.object(api.app.state, 'cpu_semaphore', asyncio.Semaphore(2), create=True):
+            await asyncio.gather(*(api.run_cpu_bound(solve) for _ in range(6)))
+   
+    asyncio.run(burst())
+   
+    assert state['peak'] == 2
+ 
+ 
+def test_simulations_run_one_at_a_time_with_numba():
+    """Test the simulation semaphore keeps parallel-kernel runs from overlapping"""
+    import time
+    import threading
+    import api
+   
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+   
+    def simulate(df, num_simulations):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.02)
+        with lock:
+            state['running'] -= 1
+        return {'status': 'success'}
+   
+    async def burst():
+        with patch.object(api, 'simulate_project_risk', simulate), \
+             patch.object(api.app.state, 'cpu_semaphore', asyncio.Semaphore(4), create=True), \
+             patch.object(api.app.state, 'simulation_semaphore', asyncio.Semaphore(1), create=True):
+            await asyncio.gather(*(api.run_simulation(None, 100) for _ in range(3)))
+   
+    asyncio.run(burst())
+   
+    assert state['peak'] == 1
+ 
+ 
+def test_solver_threads_share_the_cores():
+    """Test concurrent solves together use at most the machine's cores"""
+    import api
+   
+    assert api.SOLVER_THREADS >= 1
+    assert api.SOLVER_THREADS * api.CPU_CONCURRENCY <= max(os.cpu_count() or 1, api.CPU_CONCURRENCY)
+ 
+ 
+def test_warm_up_runs_every_engine():
+    """Test the startup warm-up exercises analysis, optimizer and simulator"""
+    import api
+   
+    with patch.object(api, 'analyze_project_df', wraps=api.analyze_project_df) as analyze, \
+         patch.object(api, 'optimize_resources') as optimize, \
+         patch.object(api, 'simulate_project_risk') as simulate:
+        api.warm_up()
+   
+    analyze.assert_called_once()
+    assert len(optimize.call_args[0][0]) == 3
+    simulate.assert_called_once()
+ 
+ 
+def test_warm_up_compiles_numba_kernel():
+    """Test the warm-up calls the JIT kernel when numba is installed"""
+    import api
+   
+    with patch.object(api, 'NUMBA_AVAILABLE', True), \
+         patch.object(api, 'simulate_project_risk'), \
+         patch.object(api, '_mc_kernel', wraps=api._mc_kernel) as kernel:
+        api.warm_up()
+   
+    kernel.assert_called_once()
+    assert kernel.call_args[0][7] == 1
+ 
+ 
+def test_warm_up_failure_does_not_block_startup():
+    """Test a failing warm-up only logs a warning"""
+    import api
+   
+    with patch.object(api, 'optimize_resources', side_effect=RuntimeError("no solver")):
+        api.warm_up()
+ 
+ 
+def test_lifespan_warm_up_toggle(monkeypatch):
+    """Test RISKMGMT_API_WARMUP=0 skips the startup warm-up"""
+    import api
+   
+    async def start(app):
+        async with api.lifespan(app):
+            pass
+   
+    with patch.object(api, 'warm_up') as warm_up:
+        monkeypatch.setenv('RISKMGMT_API_WARMUP', '0')
+        asyncio.run(start(api.app))
+        warm_up.assert_not_called()
+       
+        monkeypatch.setenv('RISKMGMT_API_WARMUP', '1')
+        asyncio.run(start(api.app))
+        warm_up.assert_called_once()
+ 
+ 
+def test_lifespan_owns_cpu_semaphore(monkeypatch):
+    """Test each lifespan creates the CPU semaphore on its own loop and removes it on shutdown"""
+    import api
+    monkeypatch.setenv('RISKMGMT_API_WARMUP', '0')
+   
+    async def serve(app):
+        async with api.lifespan(app):
+            semaphore = app.state.cpu_semaphore
+            assert await api.run_cpu_bound(lambda: 'done') == 'done'
+            return semaphore
+   
+    first = asyncio.run(serve(api.app))
+    second = asyncio.run(serve(api.app))
+   
+    assert first is not second
+    assert not hasattr(api.app.state, 'simulation_semaphore')
+    assert not hasattr(api.app.state, 'cpu_semaphore')
+ 
+ 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
  
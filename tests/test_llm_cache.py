@@ -0,0 +1,100 @@
+"""
+Unit tests for llm_cache.py
+Tests LRU behaviour and disk persistence of the LLM response cache
+"""
+ 
+import pytest
+from unittest.mock import patch
+ 
+import llm_cache
+from llm_cache import LLMResponseCache, get_response_cache
+ 
+ 
+def test_make_key_is_stable():
+    """Test identical inputs produce identical keys"""
+    key1 = LLMResponseCache.make_key("model", "RiskAnalyst", "system", "prompt")
+    key2 = LLMResponseCache.make_key("model", "RiskAnalyst", "system", "prompt")
+    key3 = LLMResponseCache.make_key("model", "ResourceOptimizer", "system", "prompt")
+   
+    assert key1 == key2
+    assert key1 != key3
+    assert len(key1) == 64
+ 
+ 
+def test_get_and_set():
+    """Test basic cache hit and miss"""
+    cache = LLMResponseCache()
+   
+    assert cache.get("missing") is None
+    cache.set("key", "response")
+    assert cache.get("key") == "response"
+    assert len(cache) == 1
+ 
+ 
+def test_empty_responses_not_cached():
+    """Test None and empty replies are never stored"""
+    cache = LLMResponseCache()
+   
+    cache.set("none", None)
+    cache.set("empty", "")
+   
+    assert len(cache) == 0
+ 
+ 
+def test_lru_eviction():
+    """Test least recently used entry is evicted first"""
+    cache = LLMResponseCache(max_size=2)
+   
+    cache.set("a", "A")
+    cache.set("b", "B")
+    cache.get("a")
+    cache.set("c", "C")
+   
+    assert cache.get("a") == "A"
+    assert cache.get("b") is None
+    assert cache.get("c") == "C"
+ 
+ 
+def test_clear():
+    """Test clearing the cache"""
+    cache = LLMResponseCache()
+    cache.set("key", "response")
+    cache.clear()
+   
+    assert cache.get("key") is None
+ 
+ 
+def test_disk_persistence(tmp_path):
+    """Test responses survive a new cache instance with the same directory"""
+    pytest.importorskip("diskcache")
+   
+    first = LLMResponseCache(cache_dir=str(tmp_path))
+    first.set("key", "persisted")
+   
+    second = LLMResponseCache(cache_dir=str(tmp_path))
+    assert second.get("key") == "persisted"
+    assert len(second) == 1
+   
+    second.clear()
+    assert LLMResponseCache(cache_dir=str(tmp_path)).get("key") is None
+ 
+ 
+def test_persistent_flag(tmp_path):
+    """Test persistent reports whether a disk cache is attached"""
+    pytest.importorskip("diskcache")
+   
+    assert not LLMResponseCache().persistent
+    assert LLMResponseCache(cache_dir=str(tmp_path)).persistent
+ 
+ 
+def test_get_response_cache_singleton():
+    """Test the shared cache is created once"""
+    with patch.object(llm_cache, '_response_cache', None):
+        cache1 = get_response_cache()
+        cache2 = get_response_cache()
+       
+        assert cache1 is cache2
+ 
+ 
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
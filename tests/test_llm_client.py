@@ -6,136 +6,248 @@ Tests HuggingFace LLM client functionality
 import pytest
 import sys
 import os
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
  
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from llm_client import LLMClient, get_llm_client
+from llm_cache import LLMResponseCache
  
-from llm_client import LLMClient
  
+@pytest.fixture
+def client_with_token(monkeypatch):
+    """LLMClient built from an environment holding only HF_API_TOKEN"""
+    monkeypatch.delenv('HF_MODEL', raising=False)
+    monkeypatch.setenv('HF_API_TOKEN', 'fake_token_123')
+    return LLMClient()
  
-def test_llm_client_initialization_with_token():
-    """Test LLMClient initialization with token"""
-    with patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token_123'}, clear=True):
-        with patch('llm_client.load_dotenv'):
-            client = LLMClient()
-            assert client is not None
-            # Model can be from env or default
-            assert client.model is not None
-            assert client.timeout == 60
  
+@pytest.fixture
+def client_without_token(monkeypatch):
+    """LLMClient built from an environment without HF_API_TOKEN"""
+    monkeypatch.delenv('HF_API_TOKEN', raising=False)
+    return LLMClient()
  
-def test_llm_client_initialization_without_token():
-    """Test LLMClient initialization without token"""
-    with patch.dict(os.environ, {}, clear=True):
-        with patch('llm_client.load_dotenv'):
-            client = LLMClient()
-            assert client is not None
-            assert client.client is None
  
+def test_llm_client_with_token(client_with_token):
+    """Test a token gives an available client with the default model and timeout"""
+    assert client_with_token.available() is True
+    assert client_with_token.client is not None
+    assert client_with_token.model == "meta-llama/Meta-Llama-3-8B-Instruct"
+    assert client_with_token.timeout == 60
  
-def test_llm_client_custom_model():
+ 
+def test_llm_client_without_token(client_without_token):
+    """Test a missing token disables the client and every generate call returns None"""
+    assert client_without_token.client is None
+    assert client_without_token.available() is False
+    assert client_without_token.generate("Test prompt") is None
+    assert client_without_token.generate_many(['a', 'b']) == [None, None]
+    assert client_without_token.generate_many([]) == []
+ 
+ 
+def test_llm_client_custom_model(monkeypatch):
     """Test LLMClient with custom model"""
-    with patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'}):
-        client = LLMClient(model="custom-model", timeout=120)
-        assert client.model == "custom-model"
-        assert client.timeout == 120
+    monkeypatch.setenv('HF_API_TOKEN', 'fake_token')
+    client = LLMClient(model="custom-model", timeout=120)
+    assert client.model == "custom-model"
+    assert client.timeout == 120
  
  
-def test_llm_client_model_from_env():
+def test_llm_client_model_from_env(monkeypatch):
     """Test LLMClient uses HF_MODEL env variable"""
-    with patch.dict(os.environ, {
-        'HF_API_TOKEN': 'fake_token',
-        'HF_MODEL': 'env-model'
-    }):
-        client = LLMClient()
-        assert client.model == "env-model"
+    monkeypatch.setenv('HF_API_TOKEN', 'fake_token')
+    monkeypatch.setenv('HF_MODEL', 'env-model')
+    client = LLMClient()
+    assert client.model == "env-model"
+ 
+ 
+@pytest.fixture
+def create(fake_openai, monkeypatch):
+    """
+    chat.completions.create on the fake SDK client that an LLMClient built
+    with a token receives; tests set its return_value / side_effect.
+    """
+    monkeypatch.setenv('HF_API_TOKEN', 'fake_token')
+    return fake_openai.return_value.chat.completions.create
+ 
  
+def test_llm_client_generate_success(create, chat_completion, canned_llm_responses):
+    """Test generate method with successful response"""
+    reply = canned_llm_responses['default']
+    create.return_value = chat_completion(reply)
+   
+    client = LLMClient()
+    result = client.generate("Test prompt")
+   
+    assert result == reply
+    create.assert_called_once()
+ 
+ 
+def test_llm_client_generate_with_params(create, chat_completion):
+    """Test generate method with custom parameters"""
+    create.return_value = chat_completion("Response")
+   
+    client = LLMClient()
+    result = client.generate("Test prompt", max_tokens=1000, temperature=0.5)
+   
+    assert result == "Response"
+    assert create.call_args[1]['max_tokens'] == 1000
+    assert create.call_args[1]['temperature'] == 0.5
+ 
+ 
+def test_llm_client_generate_exception_handling(create):
+    """Test generate handles exceptions gracefully"""
+    create.side_effect = Exception("API Error")
+   
+    client = LLMClient()
+    result = client.generate("Test prompt")
+    assert result is None
+ 
+ 
+def test_llm_client_caches_deterministic_requests(create, chat_completion):
+    """Test temperature-0 requests are answered from the cache on repeat"""
+    create.return_value = chat_completion("Cached response")
+   
+    client = LLMClient(cache=LLMResponseCache())
+    assert client.generate("Prompt", temperature=0) == "Cached response"
+    assert client.generate("Prompt", temperature=0) == "Cached response"
+    assert create.call_count == 1
+   
+    # A different token budget is a different request
+    client.generate("Prompt", max_tokens=100, temperature=0)
+    assert create.call_count == 2
+ 
+ 
+def test_llm_client_does_not_cache_sampled_requests(create, chat_completion):
+    """Test requests with temperature > 0 always reach the API"""
+    create.return_value = chat_completion("Sampled response")
+   
+    cache = LLMResponseCache()
+    client = LLMClient(cache=cache)
+    client.generate("Prompt", temperature=0.7)
+    client.generate("Prompt", temperature=0.7)
+   
+    assert create.call_count == 2
+    assert len(cache) == 0
  
-def test_llm_client_availability_with_token():
-    """Test availability when token is set"""
-    with patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token_123'}):
+ 
+def test_openai_sdk_imported_lazily():
+    """Test importing llm_client does not pull in the OpenAI SDK"""
+    import subprocess
+   
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    probe = "import sys, llm_client; print('openai' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", probe], cwd=root,
+                            capture_output=True, text=True, check=True).stdout
+   
+    assert output.strip() == "False"
+ 
+ 
+def test_openai_sdk_loaded_on_first_client(monkeypatch):
+    """Test the SDK class is resolved when a client with a token is created"""
+    import llm_client
+    monkeypatch.setenv('HF_API_TOKEN', 'test_token')
+   
+    with patch.object(llm_client, 'OpenAI', None):
         client = LLMClient()
-        assert client.available() is True
+        assert llm_client.OpenAI is not None
+   
+    assert client.client is not None
  
  
-def test_llm_client_availability_without_token():
-    """Test availability when token is missing"""
-    with patch.dict(os.environ, {}, clear=True):
-        with patch('llm_client.load_dotenv'):
-            client = LLMClient()
-            assert client.available() is False
+def make_async_openai(delays):
+    """AsyncOpenAI stand-in whose completion echoes the prompt after a delay"""
+    import asyncio
+   
+    async def create(**kwargs):
+        prompt = kwargs['messages'][0]['content']
+        await asyncio.sleep(delays.get(prompt, 0))
+        if prompt == 'fail':
+            raise Exception("API Error")
+        message = SimpleNamespace(content=f"answer to {prompt}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+   
+    aclient = MagicMock()
+    aclient.chat.completions.create = create
+    aclient.__aenter__.return_value = aclient
+    return MagicMock(return_value=aclient)
  
  
-@patch('llm_client.OpenAI')
-def test_llm_client_generate_success(mock_openai):
-    """Test generate method with successful response"""
-    # Setup mock
-    mock_client = MagicMock()
-    mock_response = MagicMock()
-    mock_response.choices = [MagicMock()]
-    mock_response.choices[0].message.content = "Mocked LLM response"
-    mock_client.chat.completions.create.return_value = mock_response
-    mock_openai.return_value = mock_client
-   
-    with patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'}):
+def test_llm_client_agenerate(monkeypatch):
+    """Test agenerate awaits the async client and reuses it"""
+    import asyncio
+    monkeypatch.setenv('HF_API_TOKEN', 'fake_token')
+   
+    with patch('llm_client.AsyncOpenAI', make_async_openai({})) as mock_async:
         client = LLMClient()
-        result = client.generate("Test prompt")
        
-        assert result == "Mocked LLM response"
-        mock_client.chat.completions.create.assert_called_once()
+        async def run():
+            return [await client.agenerate("a"), await client.agenerate("fail")]
+       
+        assert asyncio.run(run()) == ["answer to a", None]
+        mock_async.assert_called_once()
  
  
-@patch('llm_client.OpenAI')
-def test_llm_client_generate_with_params(mock_openai):
-    """Test generate method with custom parameters"""
-    mock_client = MagicMock()
-    mock_response = MagicMock()
-    mock_response.choices = [MagicMock()]
-    mock_response.choices[0].message.content = "Response"
-    mock_client.chat.completions.create.return_value = mock_response
-    mock_openai.return_value = mock_client
-   
-    with patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'}):
+def test_llm_client_generate_many_runs_concurrently(monkeypatch):
+    """Test generate_many overlaps requests and keeps results in prompt order"""
+    import time
+    monkeypatch.setenv('HF_API_TOKEN', 'fake_token')
+   
+    delays = {'slow': 0.3, 'fast': 0.1, 'fail': 0.2}
+    with patch('llm_client.AsyncOpenAI', make_async_openai(delays)):
         client = LLMClient()
-        result = client.generate("Test prompt", max_tokens=1000, temperature=0.5)
        
-        assert result == "Response"
-        call_args = mock_client.chat.completions.create.call_args
-        assert call_args[1]['max_tokens'] == 1000
-        assert call_args[1]['temperature'] == 0.5
+        start = time.perf_counter()
+        results = client.generate_many(['slow', 'fast', 'fail'])
+        elapsed = time.perf_counter() - start
+   
+    assert results == ["answer to slow", "answer to fast", None]
+    assert elapsed < 0.55  # sequential requests would take 0.6 s
  
  
-def test_llm_client_generate_without_token():
-    """Test generate returns None without token"""
-    with patch.dict(os.environ, {}, clear=True):
-        with patch('llm_client.load_dotenv'):
-            client = LLMClient()
-            result = client.generate("Test prompt")
-            assert result is None
+def test_llm_client_generate_many_inside_event_loop(monkeypatch):
+    """Test generate_many also works when called from a running event loop"""
+    import asyncio
+    monkeypatch.setenv('HF_API_TOKEN', 'fake_token')
+   
+    with patch('llm_client.AsyncOpenAI', make_async_openai({})):
+        client = LLMClient()
+       
+        async def run():
+            return client.generate_many(['a', 'b'])
+       
+        assert asyncio.run(run()) == ["answer to a", "answer to b"]
  
  
-@patch('llm_client.OpenAI')
-def test_llm_client_generate_exception_handling(mock_openai):
-    """Test generate handles exceptions gracefully"""
-    mock_client = MagicMock()
-    mock_client.chat.completions.create.side_effect = Exception("API Error")
-    mock_openai.return_value = mock_client
+def test_llm_client_generate_many_uses_cache(tmp_path, monkeypatch):
+    """Test concurrent temperature-0 requests are served from the (disk) cache on repeat"""
+    monkeypatch.setenv('HF_API_TOKEN', 'fake_token')
+    with patch('llm_client.AsyncOpenAI', make_async_openai({})):
+        client = LLMClient(cache=LLMResponseCache(cache_dir=str(tmp_path)))
+        assert client.generate_many(['a', 'b'], temperature=0) == ["answer to a", "answer to b"]
    
-    with patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'}):
-        client = LLMClient()
-        result = client.generate("Test prompt")
-        assert result is None
- 
- 
-def test_llm_client_default_values():
-    """Test default model and timeout values"""
-    with patch.dict(os.environ, {'HF_API_TOKEN': 'fake_token'}, clear=True):
-        with patch('llm_client.load_dotenv'):
-            client = LLMClient()
-            # Model can be from env (HF_MODEL) or default
-            assert client.model is not None
-            assert isinstance(client.model, str)
-            assert client.timeout == 60
+    # A fresh in-memory cache over the same directory: hits come from disk, misses still reach the API
+    with patch('llm_client.AsyncOpenAI', make_async_openai({})):
+        client = LLMClient(cache=LLMResponseCache(cache_dir=str(tmp_path)))
+        assert client.generate_many(['a', 'fail', 'b'], temperature=0) == ["answer to a", None, "answer to b"]
+ 
+ 
+def test_get_llm_client_reuses_instance(fake_openai, monkeypatch):
+    """Test the shared client (and its connection pool) is built once per token/model"""
+    import llm_client
+    llm_client._shared_client.cache_clear()
+   
+    monkeypatch.setenv('HF_API_TOKEN', 'token_a')
+    monkeypatch.setenv('HF_MODEL', 'model-a')
+    first = get_llm_client()
+    assert get_llm_client() is first
+    assert first.model == 'model-a'
+    assert fake_openai.call_count == 1
+   
+    monkeypatch.setenv('HF_API_TOKEN', 'token_b')
+    assert get_llm_client() is not first
+   
+    llm_client._shared_client.cache_clear()
  
  
 if __name__ == "__main__":
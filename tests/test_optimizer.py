@@ -4,27 +4,17 @@ Tests PuLP-based linear programming optimization
 """
  
 import pytest
-import pandas as pd
-import sys
 import os
+import pandas as pd
+from unittest.mock import patch
  
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
- 
-from resource_optimizer import ResourceOptimizer
+from resource_optimizer import ResourceOptimizer, default_solver
  
  
-@pytest.fixture
-def sample_df():
-    """Create sample project data"""
-    return pd.DataFrame({
-        'Task_ID': [1, 2, 3, 4, 5],
-        'Task_Name': ['Task A', 'Task B', 'Task C', 'Task D', 'Task E'],
-        'Duration_Days': [10, 15, 8, 12, 20],
-        'Resource_Name': ['Alice', 'Bob', 'Alice', 'Charlie', 'Bob'],
-        'Cost_Per_Day': [500, 600, 500, 550, 600],
-        'Risk_Level': ['High', 'Med', 'Low', 'High', 'Med'],
-        'Predecessors': [None, '1', '1', '2,3', None]
-    })
+@pytest.fixture(scope="module")
+def optimized_sample(sample_df):
+    """One solve of the shared sample project; treat the result as read-only"""
+    return ResourceOptimizer(sample_df).optimize_allocation()
  
  
 def test_optimizer_initialization(sample_df):
@@ -36,10 +26,9 @@ def test_optimizer_initialization(sample_df):
     assert len(optimizer.resources) == 3
  
  
-def test_optimize_basic(sample_df):
+def test_optimize_basic(optimized_sample):
     """Test basic optimization run"""
-    optimizer = ResourceOptimizer(sample_df)
-    result = optimizer.optimize_allocation()
+    result = optimized_sample
    
     assert 'status' in result
     assert 'baseline_duration' in result
@@ -47,19 +36,17 @@ def test_optimize_basic(sample_df):
     assert 'improvement_percentage' in result
  
  
-def test_optimize_duration_improvement(sample_df):
+def test_optimize_duration_improvement(optimized_sample):
     """Test that optimization improves or maintains duration"""
-    optimizer = ResourceOptimizer(sample_df)
-    result = optimizer.optimize_allocation()
+    result = optimized_sample
    
     assert result['optimized_duration'] <= result['baseline_duration']
     assert result['improvement_percentage'] >= 0
  
  
-def test_optimize_result_structure(sample_df):
+def test_optimize_result_structure(optimized_sample):
     """Test result dictionary structure"""
-    optimizer = ResourceOptimizer(sample_df)
-    result = optimizer.optimize_allocation()
+    result = optimized_sample
    
     required_keys = ['status', 'baseline_duration', 'optimized_duration',
                     'improvement_percentage', 'recommendations']
@@ -67,10 +54,9 @@ def test_optimize_result_structure(sample_df):
         assert key in result
  
  
-def test_optimize_recommendations_exist(sample_df):
+def test_optimize_recommendations_exist(optimized_sample):
     """Test that recommendations are generated"""
-    optimizer = ResourceOptimizer(sample_df)
-    result = optimizer.optimize_allocation()
+    result = optimized_sample
    
     # Recommendations is a formatted string report
     assert 'recommendations' in result
@@ -79,17 +65,9 @@ def test_optimize_recommendations_exist(sample_df):
     assert 'OPTIMIZATION RECOMMENDATIONS' in result['recommendations']
  
  
-def test_optimize_single_task():
+def test_optimize_single_task(make_project_df):
     """Test optimization with single task"""
-    df = pd.DataFrame({
-        'Task_ID': [1],
-        'Task_Name': ['Task A'],
-        'Duration_Days': [10],
-        'Resource_Name': ['Alice'],
-        'Cost_Per_Day': [500],
-        'Risk_Level': ['Low'],
-        'Predecessors': [None]
-    })
+    df = make_project_df(resources=['Alice'])
    
     optimizer = ResourceOptimizer(df)
     result = optimizer.optimize_allocation()
@@ -97,17 +75,9 @@ def test_optimize_single_task():
     assert 'status' in result
  
  
-def test_optimize_parallel_tasks():
+def test_optimize_parallel_tasks(make_project_df):
     """Test optimization with parallel tasks (no dependencies)"""
-    df = pd.DataFrame({
-        'Task_ID': [1, 2, 3],
-        'Task_Name': ['Task A', 'Task B', 'Task C'],
-        'Duration_Days': [10, 10, 10],
-        'Resource_Name': ['Alice', 'Bob', 'Charlie'],
-        'Cost_Per_Day': [500, 500, 500],
-        'Risk_Level': ['Low', 'Low', 'Low'],
-        'Predecessors': [None, None, None]
-    })
+    df = make_project_df(resources=['Alice', 'Bob', 'Charlie'])
    
     optimizer = ResourceOptimizer(df)
     result = optimizer.optimize_allocation()
@@ -127,10 +97,10 @@ def test_baseline_duration_calculation(sample_df):
     assert baseline >= 12  # At least Charlie's workload
  
  
-def test_optimized_duration_calculation(sample_df):
+def test_optimized_duration_calculation(sample_df, optimized_sample):
     """Test optimized duration calculation"""
     optimizer = ResourceOptimizer(sample_df)
-    result = optimizer.optimize_allocation()
+    result = optimized_sample
    
     if result['status'] in ['success', 'suboptimal']:
         allocation = result['optimized_allocation']
@@ -138,20 +108,34 @@ def test_optimized_duration_calculation(sample_df):
         assert optimized > 0
  
  
-def test_recommendations_generation(sample_df):
-    """Test recommendations text generation"""
+def test_optimized_duration_is_max_resource_workload(sample_df):
+    """Test the makespan is the largest per-resource sum of durations"""
     optimizer = ResourceOptimizer(sample_df)
-    result = optimizer.optimize_allocation()
+    allocation = [
+        {'resource': 'Alice', 'duration': 10},
+        {'resource': 'Bob', 'duration': 15},
+        {'resource': 'Alice', 'duration': 8},
+        {'resource': 'Charlie', 'duration': 12}
+    ]
+   
+    assert optimizer._calculate_optimized_duration(allocation) == 18
+    assert isinstance(optimizer._calculate_optimized_duration(allocation), int)
+    assert optimizer._calculate_optimized_duration([{'resource': 'Bob', 'duration': 2.5}]) == 2.5
+    assert optimizer._calculate_optimized_duration([]) == 0
+ 
+ 
+def test_recommendations_generation(optimized_sample):
+    """Test recommendations text generation"""
+    result = optimized_sample
    
     assert 'recommendations' in result
     assert isinstance(result['recommendations'], str)
     assert len(result['recommendations']) > 0
  
  
-def test_extract_solution(sample_df):
+def test_extract_solution(optimized_sample):
     """Test solution extraction from optimization"""
-    optimizer = ResourceOptimizer(sample_df)
-    result = optimizer.optimize_allocation()
+    result = optimized_sample
    
     if result['status'] in ['success', 'suboptimal']:
         assert 'optimized_allocation' in result
@@ -159,10 +143,9 @@ def test_extract_solution(sample_df):
         assert len(result['optimized_allocation']) > 0
  
  
-def test_optimization_with_dependencies(sample_df):
+def test_optimization_with_dependencies(optimized_sample):
     """Test that optimization handles task dependencies"""
-    optimizer = ResourceOptimizer(sample_df)
-    result = optimizer.optimize_allocation()
+    result = optimized_sample
    
     # Should complete successfully even with dependencies
     assert result['status'] in ['success', 'suboptimal']
@@ -170,10 +153,9 @@ def test_optimization_with_dependencies(sample_df):
     assert 'optimized_duration' in result
  
  
-def test_optimization_improvement_metric(sample_df):
+def test_optimization_improvement_metric(optimized_sample):
     """Test that improvement percentage is calculated"""
-    optimizer = ResourceOptimizer(sample_df)
-    result = optimizer.optimize_allocation()
+    result = optimized_sample
    
     assert 'improvement_percentage' in result
     assert isinstance(result['improvement_percentage'], (int, float))
@@ -189,17 +171,9 @@ def test_optimize_resources_convenience_function(sample_df):
     assert result['status'] in ['success', 'suboptimal']
  
  
-def test_optimizer_with_many_resources():
+def test_optimizer_with_many_resources(make_project_df):
     """Test optimization with many resources"""
-    df = pd.DataFrame({
-        'Task_ID': list(range(1, 11)),
-        'Task_Name': [f'Task {i}' for i in range(1, 11)],
-        'Duration_Days': [5] * 10,
-        'Resource_Name': [f'Resource_{i%5}' for i in range(10)],
-        'Cost_Per_Day': [500] * 10,
-        'Risk_Level': ['Low'] * 10,
-        'Predecessors': [None] * 10
-    })
+    df = make_project_df(resources=[f'Resource_{i % 5}' for i in range(10)], durations=5)
    
     optimizer = ResourceOptimizer(df)
     result = optimizer.optimize_allocation()
@@ -216,6 +190,218 @@ def test_optimizer_task_resource_mapping(sample_df):
     assert len(optimizer.tasks) == len(sample_df)
  
  
+@pytest.fixture
+def solver_probe():
+    """Run the installed-solver probe afresh inside the test, then forget its answer"""
+    import resource_optimizer
+   
+    resource_optimizer._installed_solver.cache_clear()
+    yield resource_optimizer._installed_solver
+    resource_optimizer._installed_solver.cache_clear()
+ 
+ 
+def test_default_solver_falls_back_to_cbc(solver_probe):
+    """Test CBC is used when no HiGHS build is installed"""
+    import pulp
+   
+    with patch.object(pulp, 'HiGHS', None, create=True), \
+         patch('resource_optimizer.HiGHS_CMD.available', return_value=False):
+        solver = default_solver(time_limit=5)
+   
+    assert isinstance(solver, pulp.PULP_CBC_CMD)
+    assert solver.timeLimit == 5
+ 
+ 
+def test_default_solver_prefers_highs(solver_probe):
+    """Test the HiGHS executable is chosen when it is available"""
+    import pulp
+   
+    with patch.object(pulp, 'HiGHS', None, create=True), \
+         patch('resource_optimizer.HiGHS_CMD.available', return_value=True):
+        solver = default_solver()
+   
+    assert isinstance(solver, pulp.HiGHS_CMD)
+    assert 'threads' not in solver.optionsDict
+ 
+ 
+def test_highspy_solver_is_not_given_warm_start(solver_probe):
+    """Test the in-process HiGHS interface gets no warmStart option it would pass on unknown"""
+    import pulp
+   
+    class HiGHSStandIn:
+        def __init__(self, msg=True, timeLimit=None, **options):
+            self.optionsDict = options
+       
+        def available(self):
+            return True
+   
+    with patch.object(pulp, 'HiGHS', HiGHSStandIn, create=True):
+        solver = default_solver(warm_start=True)
+   
+    assert isinstance(solver, HiGHSStandIn)
+    assert 'warmStart' not in solver.optionsDict
+ 
+ 
+def test_cmd_solvers_keep_warm_start(solver_probe):
+    """Test CBC and the highs executable still receive the MIP start"""
+    import pulp
+   
+    for highs_cmd_available, solver_class in ((True, pulp.HiGHS_CMD), (False, pulp.PULP_CBC_CMD)):
+        solver_probe.cache_clear()
+        with patch.object(pulp, 'HiGHS', None, create=True), \
+             patch('resource_optimizer.HiGHS_CMD.available', return_value=highs_cmd_available):
+            solver = default_solver(warm_start=True)
+        assert isinstance(solver, solver_class)
+        assert solver.optionsDict.get('warmStart') is True
+ 
+ 
+def test_cbc_threads_can_be_limited(solver_probe):
+    """Test callers running several solves can cap CBC's threads"""
+    import pulp
+   
+    with patch.object(pulp, 'HiGHS', None, create=True), \
+         patch('resource_optimizer.HiGHS_CMD.available', return_value=False):
+        assert default_solver(threads=2).optionsDict['threads'] == 2
+        assert default_solver().optionsDict['threads'] == os.cpu_count()
+ 
+ 
+def test_solver_probe_runs_once(solver_probe):
+    """Test repeated default_solver() calls reuse the first availability probe"""
+    with patch('resource_optimizer.HiGHS_CMD.available', return_value=False) as available:
+        default_solver()
+        default_solver(warm_start=True)
+   
+    assert available.call_count <= 1
+    assert solver_probe.cache_info().hits == 1
+ 
+ 
+def test_optimizer_uses_given_solver(sample_df):
+    """Test a solver passed to the constructor is the one used"""
+    import pulp
+   
+    solver = pulp.PULP_CBC_CMD(msg=False)
+    with patch.object(solver, 'actualSolve', wraps=solver.actualSolve) as solve:
+        result = ResourceOptimizer(sample_df, solver=solver).optimize_allocation()
+   
+    solve.assert_called_once()
+    assert result['status'] == 'success'
+ 
+ 
+def test_solve_without_incumbent_falls_back_to_lpt(sample_df):
+    """Test a solver stopped before any assignment does not report a zero makespan"""
+    import pulp
+    from resource_optimizer import LPT_ALGORITHM
+   
+    class NotSolved(pulp.LpSolver):
+        def actualSolve(self, lp, **kwargs):
+            lp.status = pulp.LpStatusNotSolved
+            return lp.status
+   
+    result = ResourceOptimizer(sample_df, solver=NotSolved()).optimize_allocation()
+   
+    assert result['status'] == 'heuristic'
+    assert result['algorithm'] == LPT_ALGORITHM
+    assert len(result['optimized_allocation']) == len(sample_df)
+    assert result['optimized_duration'] > 0
+    assert result['improvement_percentage'] < 100
+ 
+ 
+def test_repeat_solve_warm_starts(sample_df):
+    """Test a second solve passes the previous assignment as a MIP start"""
+    import resource_optimizer
+   
+    optimizer = ResourceOptimizer(sample_df)
+    with patch('resource_optimizer.default_solver', wraps=resource_optimizer.default_solver) as factory:
+        first = optimizer.optimize_allocation()
+        second = optimizer.optimize_allocation()
+   
+    assert [call.kwargs['warm_start'] for call in factory.call_args_list] == [False, True]
+    assert second['optimized_duration'] == first['optimized_duration']
+    assert sum(optimizer._last_assignment.values()) == len(sample_df)
+ 
+ 
+def test_repeat_solve_reuses_model(sample_df):
+    """Test re-solving reuses the built MILP instead of constructing a new one"""
+    optimizer = ResourceOptimizer(sample_df)
+    first = optimizer.optimize_allocation()
+    model = optimizer._model
+   
+    with patch('resource_optimizer.LpProblem') as problem:
+        second = optimizer.optimize_allocation(report=False)
+   
+    problem.assert_not_called()
+    assert optimizer._model is model
+    assert second['optimized_allocation'] == first['optimized_allocation']
+ 
+ 
+def test_warm_start_from_matching_scenario_only(sample_df):
+    """Test warm_start_from is used only when tasks and resources match"""
+    base = ResourceOptimizer(sample_df)
+    base.optimize_allocation()
+   
+    what_if = sample_df.copy()
+    what_if['Duration_Days'] = what_if['Duration_Days'] + 1
+    assert ResourceOptimizer(what_if, warm_start_from=base)._warm_start_assignment() is base._last_assignment
+   
+    fewer_tasks = sample_df.iloc[:4]
+    assert ResourceOptimizer(fewer_tasks, warm_start_from=base)._warm_start_assignment() is None
+   
+    result = ResourceOptimizer(what_if, warm_start_from=base).optimize_allocation()
+    assert result['status'] == 'success'
+ 
+ 
+def test_large_projects_use_lpt_heuristic(make_project_df):
+    """Test many tasks are scheduled greedily, within capacity and near the MILP makespan"""
+    import numpy as np
+    from resource_optimizer import LPT_ALGORITHM, MILP_ALGORITHM
+   
+    rng = np.random.default_rng(0)
+    df = make_project_df(resources=[f'Resource_{i % 4}' for i in range(30)],
+                         durations=rng.integers(1, 20, size=30))
+   
+    exact = ResourceOptimizer(df).optimize_allocation()
+    assert exact['algorithm'] == MILP_ALGORITHM
+   
+    optimizer = ResourceOptimizer(df)
+    optimizer.HEURISTIC_MIN_TASKS = 30
+    greedy = optimizer.optimize_allocation()
+   
+    assert greedy['status'] == 'heuristic'
+    assert greedy['algorithm'] == LPT_ALGORITHM
+    assert LPT_ALGORITHM in greedy['recommendations']
+    assert sorted(item['task_id'] for item in greedy['optimized_allocation']) == list(range(1, 31))
+    tasks_per_resource = pd.Series([item['resource'] for item in greedy['optimized_allocation']]).value_counts()
+    assert tasks_per_resource.max() <= 30 // 4 + 2
+    assert greedy['optimized_duration'] <= exact['optimized_duration'] * 4 / 3
+ 
+ 
+def test_optimize_without_report(sample_df):
+    """Test report=False skips the recommendations text but keeps the numbers"""
+    from resource_optimizer import optimize_resources
+   
+    full = optimize_resources(sample_df)
+    bare = optimize_resources(sample_df, report=False)
+   
+    assert bare['recommendations'] is None
+    assert bare['optimized_duration'] == full['optimized_duration']
+    assert bare['optimized_allocation'] == full['optimized_allocation']
+ 
+ 
+def test_optimize_as_frame(sample_df):
+    """Test as_frame=True returns the allocation as columns matching the records"""
+    from resource_optimizer import optimize_resources
+   
+    records = optimize_resources(sample_df)
+    framed = optimize_resources(sample_df, as_frame=True)
+   
+    allocation = framed['optimized_allocation']
+    assert isinstance(allocation, pd.DataFrame)
+    assert list(allocation.columns) == ['task_id', 'task_name', 'resource', 'duration', 'cost']
+    assert allocation.to_dict('records') == records['optimized_allocation']
+    assert framed['optimized_duration'] == records['optimized_duration']
+    assert framed['recommendations'] == records['recommendations']
+ 
+ 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
  
@@ -4,96 +4,87 @@ Tests Monte Carlo simulation logic
 """
  
 import pytest
-import pandas as pd
 import numpy as np
-import sys
-import os
+from unittest.mock import patch
  
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from risk_simulator import RiskSimulator, simulate_project_risk
  
-from risk_simulator import RiskSimulator
  
- 
-@pytest.fixture
-def sample_df():
-    """Create sample project data"""
-    return pd.DataFrame({
-        'Task_ID': [1, 2, 3, 4, 5],
-        'Task_Name': ['Task A', 'Task B', 'Task C', 'Task D', 'Task E'],
-        'Duration_Days': [10, 15, 8, 12, 20],
-        'Resource_Name': ['Alice', 'Bob', 'Alice', 'Charlie', 'Bob'],
-        'Cost_Per_Day': [500, 600, 500, 550, 600],
-        'Risk_Level': ['High', 'Med', 'Low', 'High', 'Med'],
-        'Predecessors': [None, '1', '1', '2,3', None]
-    })
+@pytest.fixture(scope="module")
+def simulator_factory(sample_df):
+    """
+    Simulators over the shared sample project, one per iteration count.
+    Shared across the module: use them for read-only checks, never modify them.
+    """
+    cache = {}
+   
+    def make(num_simulations=100):
+        if num_simulations not in cache:
+            cache[num_simulations] = RiskSimulator(sample_df, num_simulations=num_simulations)
+        return cache[num_simulations]
+    return make
  
  
-def test_simulator_initialization(sample_df):
+def test_simulator_initialization(simulator_factory):
     """Test RiskSimulator initialization"""
-    simulator = RiskSimulator(sample_df, num_simulations=100)
+    simulator = simulator_factory(100)
    
     assert simulator.df is not None
     assert simulator.num_simulations == 100
     assert 'High' in simulator.risk_multipliers
  
  
-def test_simulate_basic(sample_df):
-    """Test basic simulation run"""
-    simulator = RiskSimulator(sample_df, num_simulations=100)
-    result = simulator.run_simulation()
+def test_simulator_keeps_only_needed_columns(sample_df):
+    """Test the simulator holds just its columns, detached from the caller's frame"""
+    df = sample_df.copy()
+    simulator = RiskSimulator(df, num_simulations=100)
+    assert list(simulator.df.columns) == RiskSimulator.COLUMNS
    
-    assert 'status' in result or 'mean_duration' in result
+    df.loc[0, 'Duration_Days'] = 999
+    assert simulator.df['Duration_Days'].iloc[0] != 999
+ 
  
+@pytest.fixture(scope="module")
+def sim_result(sample_df):
+    """One seeded run on the sample project, shared by the read-only result tests"""
+    return RiskSimulator(sample_df, num_simulations=500, seed=0).run_simulation()
  
-def test_simulate_result_structure(sample_df):
+ 
+def test_simulate_result_structure(sim_result):
     """Test simulation result structure"""
-    simulator = RiskSimulator(sample_df, num_simulations=100)
-    result = simulator.run_simulation()
+    from risk_simulator import SimulationResult
    
-    # Check if using dataclass or dict
-    if 'simulation_result' in result:
-        sim_result = result['simulation_result']
-        assert hasattr(sim_result, 'mean_duration') or 'mean_duration' in sim_result
-    else:
-        assert 'mean_duration' in str(result) or 'percentile_50' in str(result)
+    assert sim_result['status'] == 'success'
+    assert set(sim_result) == {'status', 'simulation_result', 'baseline_duration', 'baseline_cost',
+                               'risk_assessment', 'confidence_level'}
+    assert isinstance(sim_result['simulation_result'], SimulationResult)
+    assert 'RISK ASSESSMENT' in sim_result['risk_assessment']
  
  
-def test_simulate_statistical_validity(sample_df):
+def test_simulate_statistical_validity(sim_result):
     """Test that simulation produces valid statistical results"""
-    simulator = RiskSimulator(sample_df, num_simulations=500)
-    result = simulator.run_simulation()
+    sim = sim_result['simulation_result']
    
-    # Extract values from result
-    if isinstance(result, dict):
-        if 'simulation_result' in result:
-            sim = result['simulation_result']
-            if hasattr(sim, 'mean_duration'):
-                assert sim.mean_duration > 0
-                assert sim.std_duration >= 0
-        else:
-            # Direct dict with keys
-            assert len(str(result)) > 0
- 
- 
-def test_simulator_small_iterations(sample_df):
-    """Test simulator with small number of iterations"""
-    simulator = RiskSimulator(sample_df, num_simulations=50)
-    result = simulator.run_simulation()
+    assert sim.mean_duration > 0
+    assert sim.std_duration >= 0
+    assert sim.percentile_50 <= sim.percentile_75 <= sim.percentile_90 <= sim.percentile_95
+    assert sim.mean_cost > 0
+    assert 0 <= sim.risk_probability <= 1
+    assert 50 <= sim_result['confidence_level'] <= 100
+ 
+ 
+@pytest.mark.parametrize("num_simulations", [50, 2000])
+def test_simulation_iteration_counts(sample_df, num_simulations):
+    """Test small and large iteration counts both complete"""
+    result = RiskSimulator(sample_df, num_simulations=num_simulations).run_simulation()
    
-    assert result is not None
+    assert result['status'] == 'success'
+    assert result['simulation_result'].mean_duration > 0
  
  
-def test_simulator_single_task():
+def test_simulator_single_task(make_project_df):
     """Test simulator with single task"""
-    df = pd.DataFrame({
-        'Task_ID': [1],
-        'Task_Name': ['Task A'],
-        'Duration_Days': [10],
-        'Resource_Name': ['Alice'],
-        'Cost_Per_Day': [500],
-        'Risk_Level': ['Low'],
-        'Predecessors': [None]
-    })
+    df = make_project_df(resources=['Alice'])
    
     simulator = RiskSimulator(df, num_simulations=50)
     result = simulator.run_simulation()
@@ -101,16 +92,124 @@ def test_simulator_single_task():
     assert result is not None
  
  
-def test_simulate_scenario(sample_df):
+def test_simulate_single_scenario(simulator_factory):
     """Test single scenario simulation"""
-    simulator = RiskSimulator(sample_df, num_simulations=100)
-    duration, cost = simulator._simulate_scenario()
+    simulator = simulator_factory(100)
+    durations, costs = simulator._simulate_batch(1)
    
-    assert duration > 0
-    assert cost > 0
+    assert durations.shape == (1,)
+    assert durations[0] > 0
+    assert costs[0] > 0
  
  
-def test_risk_assessment(sample_df):
+def test_batched_simulation_independent_of_batch_size(sample_df):
+    """Test splitting the scenarios into batches does not change results"""
+    whole = RiskSimulator(sample_df, num_simulations=500, seed=42).run_simulation()
+   
+    simulator = RiskSimulator(sample_df, num_simulations=500, seed=42)
+    simulator.SIMULATION_BATCH_ELEMENTS = len(sample_df) * 64
+    batched = simulator.run_simulation()
+   
+    assert batched['simulation_result'] == whole['simulation_result']
+ 
+ 
+def test_seeded_simulation_is_reproducible(sample_df):
+    """Test the same seed gives identical results and unknown risk levels stay fixed"""
+    first = simulate_project_risk(sample_df, num_simulations=200, seed=7)
+    second = simulate_project_risk(sample_df, num_simulations=200, seed=7)
+    assert first['simulation_result'] == second['simulation_result']
+   
+    df = sample_df.copy()
+    df['Risk_Level'] = 'Unknown'
+    durations, _ = RiskSimulator(df, num_simulations=10)._simulate_batch(5)
+    assert (durations == df['Duration_Days'].sum()).all()
+ 
+ 
+def test_mc_kernel_stays_within_bounds():
+    """Test the fused kernel (plain Python without numba) sums each scenario within its bounds"""
+    import risk_simulator
+   
+    base = np.array([10.0, 20.0])
+    task_costs = base * np.array([100.0, 50.0])
+    min_mults = np.array([0.8, 1.0])
+    spans = np.array([0.7, 0.0])
+    shape = np.array([2.0, 3.0])
+    for kind in range(len(risk_simulator.DISTRIBUTIONS)):
+        durations, costs = risk_simulator._mc_kernel(base, task_costs, min_mults, spans,
+                                                     shape if kind == 0 else shape / 4,
+                                                     shape, kind, 50, 3)
+       
+        assert durations.shape == costs.shape == (50,)
+        assert ((durations >= 28.0) & (durations <= 35.0)).all()
+        assert ((costs >= 1800.0) & (costs <= 2500.0)).all()
+ 
+ 
+def test_jit_kernel_used_for_large_unseeded_runs(sample_df):
+    """Test dispatch: compiled kernel for big unseeded runs, NumPy batches otherwise"""
+    import risk_simulator
+   
+    with patch.object(risk_simulator, 'NUMBA_AVAILABLE', True), \
+         patch.object(risk_simulator, '_mc_kernel', wraps=risk_simulator._mc_kernel) as kernel:
+        simulator = RiskSimulator(sample_df, num_simulations=200)
+        simulator.JIT_MIN_ELEMENTS = 0
+        result = simulator.run_simulation()
+        assert kernel.call_count == 1
+        assert result['status'] == 'success'
+        assert result['simulation_result'].mean_duration > 0
+       
+        seeded = RiskSimulator(sample_df, num_simulations=200, seed=1)
+        seeded.JIT_MIN_ELEMENTS = 0
+        seeded.run_simulation()
+        assert kernel.call_count == 1
+ 
+ 
+def test_simulate_batch_expected_mean(sample_df):
+    """Test vectorized scenarios match the analytic mean of the multipliers"""
+    import numpy as np
+   
+    simulator = RiskSimulator(sample_df, num_simulations=100, distribution='uniform')
+    durations, costs = simulator._simulate_batch(20000)
+    expected = sum(
+        d * np.mean(simulator.risk_multipliers[r])
+        for d, r in zip(sample_df['Duration_Days'], sample_df['Risk_Level'])
+    )
+   
+    assert durations.shape == costs.shape == (20000,)
+    assert abs(durations.mean() - expected) / expected < 0.01
+ 
+ 
+def test_pert_and_triangular_expected_means(sample_df):
+    """Test PERT and triangular draws match their analytic means with the mode at 1.0"""
+    pert = RiskSimulator(sample_df, num_simulations=100, seed=3)
+    triangular = RiskSimulator(sample_df, num_simulations=100, seed=3, distribution='triangular')
+    assert pert.distribution == 'pert'
+   
+    bounds = [pert.risk_multipliers[r] for r in sample_df['Risk_Level']]
+    pert_expected = sum(d * (lo + 4.0 + hi) / 6 for d, (lo, hi) in zip(sample_df['Duration_Days'], bounds))
+    tri_expected = sum(d * (lo + 1.0 + hi) / 3 for d, (lo, hi) in zip(sample_df['Duration_Days'], bounds))
+   
+    pert_durations, _ = pert._simulate_batch(20000)
+    tri_durations, _ = triangular._simulate_batch(20000)
+    assert abs(pert_durations.mean() - pert_expected) / pert_expected < 0.01
+    assert abs(tri_durations.mean() - tri_expected) / tri_expected < 0.01
+    # PERT concentrates around the mode, so its spread is the tightest
+    uniform_durations, _ = RiskSimulator(sample_df, seed=3, distribution='uniform')._simulate_batch(20000)
+    assert pert_durations.std() < tri_durations.std() < uniform_durations.std()
+   
+    df = sample_df.copy()
+    df['Risk_Level'] = 'Unknown'
+    for distribution in ('pert', 'triangular'):
+        durations, _ = RiskSimulator(df, distribution=distribution)._simulate_batch(5)
+        assert (durations == df['Duration_Days'].sum()).all()
+ 
+ 
+def test_unknown_distribution_rejected(sample_df):
+    """Test an unsupported distribution name raises ValueError"""
+    with pytest.raises(ValueError):
+        RiskSimulator(sample_df, distribution='normal')
+ 
+ 
+def test_risk_assessment(simulator_factory):
     """Test risk assessment generation"""
     from risk_simulator import SimulationResult
    
@@ -126,63 +225,31 @@ def test_risk_assessment(sample_df):
         risk_probability=0.3
     )
    
-    simulator = RiskSimulator(sample_df, num_simulations=100)
+    simulator = simulator_factory(100)
     assessment = simulator._assess_risk(sim_result, 45.0, 20000.0)
    
     assert isinstance(assessment, str)
     assert len(assessment) > 0
  
  
-def test_high_risk_scenario():
-    """Test simulation with all high-risk tasks"""
-    df = pd.DataFrame({
-        'Task_ID': [1, 2, 3],
-        'Task_Name': ['Task A', 'Task B', 'Task C'],
-        'Duration_Days': [10, 10, 10],
-        'Resource_Name': ['Alice', 'Bob', 'Charlie'],
-        'Cost_Per_Day': [500, 500, 500],
-        'Risk_Level': ['High', 'High', 'High'],
-        'Predecessors': [None, None, None]
-    })
+@pytest.mark.parametrize("risks", [
+    ['High'] * 3,
+    ['Low'] * 3,
+    ['Med'] * 4,
+    ['High', 'Med', 'Low', 'Med'],
+], ids=['high', 'low', 'medium', 'mixed'])
+def test_risk_scenarios(make_project_df, risks):
+    """Test simulation succeeds whatever mix of risk levels the tasks carry"""
+    df = make_project_df(n=len(risks), risks=risks)
    
-    simulator = RiskSimulator(df, num_simulations=100)
-    result = simulator.run_simulation()
+    result = RiskSimulator(df, num_simulations=100).run_simulation()
    
-    assert result is not None
- 
- 
-def test_mixed_risk_levels():
-    """Test simulation with mixed risk levels"""
-    df = pd.DataFrame({
-        'Task_ID': [1, 2, 3, 4],
-        'Task_Name': ['Task A', 'Task B', 'Task C', 'Task D'],
-        'Duration_Days': [10, 10, 10, 10],
-        'Resource_Name': ['Alice', 'Bob', 'Alice', 'Bob'],
-        'Cost_Per_Day': [500, 600, 500, 600],
-        'Risk_Level': ['High', 'Med', 'Low', 'Med'],
-        'Predecessors': [None, None, None, None]
-    })
-   
-    simulator = RiskSimulator(df, num_simulations=100)
-    result = simulator.run_simulation()
-   
-    assert 'status' in result
     assert result['status'] == 'success'
  
  
-def test_simulation_result_structure(sample_df):
-    """Test that simulation result has required fields"""
-    simulator = RiskSimulator(sample_df, num_simulations=100)
-    result = simulator.run_simulation()
-   
-    assert 'status' in result
-    assert 'simulation_result' in result or 'mean_duration' in str(result)
-    assert 'risk_assessment' in result or 'assessment' in str(result).lower()
- 
- 
-def test_risk_multipliers(sample_df):
+def test_risk_multipliers(simulator_factory):
     """Test that risk multipliers are properly defined"""
-    simulator = RiskSimulator(sample_df, num_simulations=50)
+    simulator = simulator_factory(50)
    
     assert 'High' in simulator.risk_multipliers
     assert 'Med' in simulator.risk_multipliers
@@ -194,55 +261,11 @@ def test_risk_multipliers(sample_df):
     assert len(simulator.risk_multipliers['Low']) == 2
  
  
-def test_simulation_with_large_iterations(sample_df):
-    """Test simulation with large number of iterations"""
-    simulator = RiskSimulator(sample_df, num_simulations=2000)
-    result = simulator.run_simulation()
-   
-    assert result['status'] == 'success'
- 
- 
-def test_low_risk_scenario():
-    """Test simulation with all low-risk tasks"""
-    df = pd.DataFrame({
-        'Task_ID': [1, 2, 3],
-        'Task_Name': ['Task A', 'Task B', 'Task C'],
-        'Duration_Days': [10, 10, 10],
-        'Resource_Name': ['Alice', 'Bob', 'Charlie'],
-        'Cost_Per_Day': [500, 500, 500],
-        'Risk_Level': ['Low', 'Low', 'Low'],
-        'Predecessors': [None, None, None]
-    })
-   
-    simulator = RiskSimulator(df, num_simulations=100)
-    result = simulator.run_simulation()
-   
-    assert result is not None
-    assert 'status' in result
- 
- 
-def test_medium_risk_scenario():
-    """Test simulation with all medium-risk tasks"""
-    df = pd.DataFrame({
-        'Task_ID': [1, 2, 3, 4],
-        'Task_Name': ['Task A', 'Task B', 'Task C', 'Task D'],
-        'Duration_Days': [10, 15, 8, 12],
-        'Resource_Name': ['Alice', 'Bob', 'Alice', 'Bob'],
-        'Cost_Per_Day': [500, 600, 500, 600],
-        'Risk_Level': ['Med', 'Med', 'Med', 'Med'],
-        'Predecessors': [None, None, None, None]
-    })
-   
-    simulator = RiskSimulator(df, num_simulations=100)
-    result = simulator.run_simulation()
-   
-    assert result['status'] == 'success'
- 
- 
-def test_cost_calculation_in_simulation(sample_df):
+def test_cost_calculation_in_simulation(simulator_factory):
     """Test that simulation calculates costs correctly"""
-    simulator = RiskSimulator(sample_df, num_simulations=100)
-    duration, cost = simulator._simulate_scenario()
+    simulator = simulator_factory(100)
+    durations, costs = simulator._simulate_batch(1)
+    duration, cost = float(durations[0]), float(costs[0])
    
     assert cost > 0
     assert duration > 0
@@ -250,9 +273,9 @@ def test_cost_calculation_in_simulation(sample_df):
     assert cost > duration  # Since cost_per_day is typically > 1
  
  
-def test_risk_categorization(sample_df):
+def test_risk_categorization(simulator_factory):
     """Test risk categorization logic"""
-    simulator = RiskSimulator(sample_df, num_simulations=50)
+    simulator = simulator_factory(50)
    
     # Test different probability levels
     assert simulator._categorize_risk(0.8) == "HIGH"
@@ -260,7 +283,7 @@ def test_risk_categorization(sample_df):
     assert simulator._categorize_risk(0.2) == "LOW"
  
  
-def test_confidence_calculation(sample_df):
+def test_confidence_calculation(simulator_factory):
     """Test confidence level calculation"""
     from risk_simulator import SimulationResult
    
@@ -276,7 +299,7 @@ def test_confidence_calculation(sample_df):
         risk_probability=0.3
     )
    
-    simulator = RiskSimulator(sample_df, num_simulations=1000)
+    simulator = simulator_factory(1000)
     confidence = simulator._calculate_confidence(sim_result)
    
     assert isinstance(confidence, float)
@@ -293,6 +316,16 @@ def test_simulate_project_risk_convenience_function(sample_df):
     assert result['status'] == 'success'
  
  
+def test_simulation_without_report(sample_df):
+    """Test report=False skips the assessment text but keeps the statistics"""
+    full = simulate_project_risk(sample_df, num_simulations=100, seed=5)
+    bare = simulate_project_risk(sample_df, num_simulations=100, seed=5, report=False)
+   
+    assert bare['risk_assessment'] is None
+    assert bare['simulation_result'] == full['simulation_result']
+    assert bare['confidence_level'] == full['confidence_level']
+ 
+ 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
  